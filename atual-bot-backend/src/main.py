@@ -10,6 +10,18 @@ from src.routes.user import user_bp
 from src.routes.config import config_bp
 from src.routes.content import content_bp
 from src.routes.tracking import tracking_bp
+from src.services.click_buffer import click_buffer
+from src.services.compression import compression
+from src.services.dispatch import dispatcher
+from src.services.link_cache import link_cache
+from src.services.interstitial import interstitial
+from src.services.click_filter import duplicate_clicks
+from src.services.facets import job_facets
+from src.services.idempotency import idempotency_keys
+from src.services.resource_versions import resource_versions
+from src.services.query_plans import check_query_plans_command
+from src.services.search import search_index
+from src.migrations import run_migrations, migrate_command
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
@@ -23,17 +35,81 @@ app.register_blueprint(config_bp, url_prefix='/api')
 app.register_blueprint(content_bp, url_prefix='/api')
 app.register_blueprint(tracking_bp, url_prefix='/')
 
-# Configuração do banco de dados
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+# Configuração do banco de dados (DATABASE_URL troca o SQLite local, ex.: nos testes)
+app.config['SQLALCHEMY_DATABASE_URI'] = (
+    os.environ.get('DATABASE_URL') or f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
-# Criar tabelas
+# Intervalo mínimo entre conferências da versão das configurações (segundos)
+app.config['CONFIG_VERSION_CHECK_INTERVAL'] = 1.0
+
+# Limite de itens por página nas listagens (volumes maiores via /export)
+app.config['MAX_PER_PAGE'] = 100
+
+# Compressão gzip/brotli das respostas acima deste tamanho (bytes)
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_LEVEL'] = 6
+
+# Intervalo mínimo entre leituras das versões dos recursos (ETag/304)
+app.config['RESOURCE_VERSION_CHECK_INTERVAL'] = 1.0
+
+# Buffer de cliques: grava em lote a cada 500 eventos ou 2 segundos
+app.config['CLICK_BUFFER_MAX_SIZE'] = 500
+app.config['CLICK_BUFFER_FLUSH_INTERVAL'] = 2.0
+
+# Cache de resolução dos links do /track
+app.config['LINK_CACHE_MAX_SIZE'] = 2048
+app.config['LINK_CACHE_TTL'] = 300
+app.config['INTERSTITIAL_CACHE_MAX_SIZE'] = 2048
+
+# Contagens das facetas de vagas (limpas a cada escrita em vagas)
+app.config['JOB_FACETS_CACHE_MAX_SIZE'] = 256
+app.config['JOB_FACETS_CACHE_TTL'] = 60
+
+# Worker de envio das publicações (limites por plataforma em
+# src/services/dispatch.py; DISPATCH_ADAPTER_OVERRIDES = {'telegram': 'fake'}
+# troca o envio real pelo adaptador local). Os limites valem por processo,
+# então o worker roda em um único processo dedicado:
+#     flask --app src.main content dispatch-worker
+# Com DISPATCH_WORKER=1 ele roda dentro do servidor (só com um processo web).
+# O worker acha as publicações criadas por outros processos a cada
+# DISPATCH_IDLE_INTERVAL segundos.
+app.config['DISPATCH_WORKER_ENABLED'] = os.environ.get('DISPATCH_WORKER') == '1'
+app.config['DISPATCH_IDLE_INTERVAL'] = 15
+app.config['DISPATCH_MAX_ATTEMPTS'] = 5
+app.config['DISPATCH_RETRY_BASE'] = 30
+app.config['DISPATCH_PLATFORM_LIMITS'] = {}
+app.config['DISPATCH_ADAPTER_OVERRIDES'] = {}
+app.config['DISPATCH_PLATFORM_SETTINGS'] = {
+    'whatsapp': {'gateway_url': os.environ.get('WHATSAPP_GATEWAY_URL', '')}
+}
+
+# Endereço público usado nos links de tracking das mensagens (padrão: o host da requisição)
+app.config['PUBLIC_BASE_URL'] = os.environ.get('PUBLIC_BASE_URL', '')
+
+# Fuso dos horários de /api/publish sem fuso e do silêncio dos grupos
+app.config['SCHEDULER_TIMEZONE'] = 'America/Sao_Paulo'
+
+# Por quanto tempo a resposta de um Idempotency-Key é repetida (segundos)
+app.config['IDEMPOTENCY_KEY_TTL'] = 24 * 60 * 60
+
+# Toques repetidos do mesmo IP no mesmo link dentro desta janela não contam
+app.config['DUPLICATE_CLICK_WINDOW'] = 30
+
+# Comandos de manutenção do banco
+app.cli.add_command(migrate_command)
+app.cli.add_command(check_query_plans_command)
+
+# Criar tabelas e aplicar migrações pendentes
 with app.app_context():
     db.create_all()
+    run_migrations(db.engine)
     
     # Inicializar configurações padrão
     from src.models.config import BotConfig
+    BotConfig.snapshot.check_interval = app.config['CONFIG_VERSION_CHECK_INTERVAL']
     
     # Configurações padrão do bot
     default_configs = {
@@ -65,6 +141,22 @@ with app.app_context():
         existing = BotConfig.query.filter_by(key=key).first()
         if not existing:
             BotConfig.set_config(key, value)
+    
+    # Sequência dos ids reservados em bloco para os links de tracking
+    from src.services.tracking_links import ensure_sequence
+    ensure_sequence()
+    db.session.commit()
+
+click_buffer.init_app(app)
+link_cache.init_app(app)
+interstitial.init_app(app)
+search_index.init_app(app)
+duplicate_clicks.init_app(app)
+job_facets.init_app(app)
+resource_versions.init_app(app)
+compression.init_app(app)
+dispatcher.init_app(app)
+idempotency_keys.init_app(app)
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
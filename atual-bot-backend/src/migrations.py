@@ -0,0 +1,210 @@
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+
+from src.models import db
+from src.models.config import Group
+from src.models.content import JobPost, Publication
+from src.services.search import create_fts_tables, fts5_available
+
+schema_migrations = db.Table(
+    'schema_migrations',
+    db.Column('version', db.Integer, primary_key=True),
+    db.Column('name', db.String(200), nullable=False),
+    db.Column('applied_at', db.DateTime, nullable=False)
+)
+
+# db.create_all() só cria tabelas novas; colunas e índices adicionados a
+# tabelas que já existem entram aqui, cada um com um número de versão.
+MIGRATIONS = []
+
+
+def migration(version, name):
+    """Registra uma função ``fn(conn)`` como a migração ``version``"""
+    def register(fn):
+        MIGRATIONS.append((version, name, fn))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return fn
+    return register
+
+
+def create_indexes(conn, *statements):
+    """Executa o DDL (``CREATE INDEX IF NOT EXISTS``) dos índices de uma migração.
+
+    Cada migração congela a lista dos seus índices: os declarados hoje nos
+    modelos podem usar colunas que só migrações posteriores adicionam.
+    """
+    for statement in statements:
+        conn.exec_driver_sql(statement)
+
+
+def add_columns(conn, model, *names):
+    """ALTER TABLE ADD COLUMN das colunas do modelo que a tabela ainda não tem"""
+    table = model.__table__
+    existing = {column['name'] for column in inspect(conn).get_columns(table.name)}
+    for name in names:
+        if name in existing:
+            continue
+        column_type = table.c[name].type.compile(dialect=conn.dialect)
+        conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {name} {column_type}')
+
+
+@migration(1, 'índices de conteúdo e tracking')
+def _content_and_tracking_indexes(conn):
+    create_indexes(
+        conn,
+        'CREATE INDEX IF NOT EXISTS ix_job_posts_created_at_id ON job_posts (created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_job_posts_job_type_created_at ON job_posts (job_type, created_at)',
+        'CREATE INDEX IF NOT EXISTS ix_job_posts_work_mode_created_at ON job_posts (work_mode, created_at)',
+        'CREATE INDEX IF NOT EXISTS ix_job_posts_experience_level_created_at ON job_posts (experience_level, created_at)',
+        'CREATE INDEX IF NOT EXISTS ix_job_posts_salary_min ON job_posts (salary_min)',
+        'CREATE INDEX IF NOT EXISTS ix_news_posts_created_at_id ON news_posts (created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_news_posts_category_created_at ON news_posts (category, created_at)',
+        'CREATE INDEX IF NOT EXISTS ix_publications_created_at_id ON publications (created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_publications_status_created_at ON publications (status, created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_publications_group_id ON publications (group_id)',
+        'CREATE INDEX IF NOT EXISTS ix_publications_job_post_id ON publications (job_post_id)',
+        'CREATE INDEX IF NOT EXISTS ix_publications_news_post_id ON publications (news_post_id)',
+        'CREATE INDEX IF NOT EXISTS ix_click_tracking_job_post_id ON click_tracking (job_post_id)',
+        'CREATE INDEX IF NOT EXISTS ix_click_tracking_news_post_id ON click_tracking (news_post_id)',
+        'CREATE INDEX IF NOT EXISTS ix_click_tracking_group_id ON click_tracking (group_id)',
+        'CREATE INDEX IF NOT EXISTS ix_click_events_click_tracking_id ON click_events (click_tracking_id)',
+        'CREATE INDEX IF NOT EXISTS ix_click_events_clicked_at ON click_events (clicked_at)'
+    )
+
+
+@migration(2, 'busca textual FTS5 de vagas e notícias')
+def _full_text_search(conn):
+    # Sem FTS5 (ou fora do SQLite) a busca usa o índice em memória
+    if conn.dialect.name == 'sqlite' and fts5_available():
+        create_fts_tables(conn)
+
+
+@migration(3, 'cidade e UF normalizadas das vagas')
+def _job_location_columns(conn):
+    add_columns(conn, JobPost, 'city', 'uf')
+    create_indexes(conn, 'CREATE INDEX IF NOT EXISTS ix_job_posts_uf_created_at ON job_posts (uf, created_at)')
+
+
+@migration(4, 'índice de cobertura das facetas de vagas')
+def _job_facets_index(conn):
+    create_indexes(
+        conn,
+        'CREATE INDEX IF NOT EXISTS ix_job_posts_facets ON job_posts (uf, job_type, work_mode, experience_level, is_published)'
+    )
+
+
+@migration(5, 'fila de envio das publicações')
+def _publication_dispatch_columns(conn):
+    add_columns(conn, Publication, 'attempts', 'next_attempt_at', 'claimed_at')
+    publications = Publication.__table__
+    conn.execute(
+        publications.update()
+        .where(publications.c.next_attempt_at.is_(None))
+        .values(next_attempt_at=publications.c.created_at, attempts=0)
+    )
+    create_indexes(conn, 'CREATE INDEX IF NOT EXISTS ix_publications_status_next_attempt_at ON publications (status, next_attempt_at)')
+
+
+@migration(6, 'agendamento das publicações e janelas dos grupos')
+def _publication_schedule_columns(conn):
+    add_columns(conn, Group, 'quiet_hours_start', 'quiet_hours_end', 'min_post_interval')
+    add_columns(conn, Publication, 'scheduled_for')
+    publications = Publication.__table__
+    conn.execute(
+        publications.update()
+        .where(publications.c.scheduled_for.is_(None))
+        .values(scheduled_for=publications.c.created_at)
+    )
+    create_indexes(
+        conn,
+        'CREATE INDEX IF NOT EXISTS ix_publications_group_id_scheduled_for ON publications (group_id, scheduled_for)'
+    )
+
+
+@migration(7, 'UF e índices de ranking dos grupos')
+def _group_ranking(conn):
+    add_columns(conn, Group, 'uf')
+    create_indexes(
+        conn,
+        'CREATE INDEX IF NOT EXISTS ix_groups_ranking ON groups (is_active, activity_score, member_count)',
+        'CREATE INDEX IF NOT EXISTS ix_groups_platform_ranking ON groups (platform, is_active, activity_score, member_count)',
+        'CREATE INDEX IF NOT EXISTS ix_groups_uf_ranking ON groups (uf, platform, is_active, activity_score, member_count)'
+    )
+
+
+@migration(8, 'cliques por conteúdo e grupo')
+def _content_click_rollup_index(conn):
+    create_indexes(
+        conn,
+        'CREATE INDEX IF NOT EXISTS ix_click_rollups_daily_content '
+        'ON click_rollups_daily (content_type, content_id, group_id, bucket, clicks)'
+    )
+
+
+@migration(9, 'campanha e envio único por conteúdo e grupo')
+def _publication_campaigns(conn):
+    # Publicações antigas ficam sem campanha (NULL), fora dos índices únicos
+    add_columns(conn, Publication, 'campaign')
+    create_indexes(
+        conn,
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_publications_job_group_campaign '
+        'ON publications (job_post_id, group_id, campaign) '
+        'WHERE job_post_id IS NOT NULL AND campaign IS NOT NULL',
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_publications_news_group_campaign '
+        'ON publications (news_post_id, group_id, campaign) '
+        'WHERE news_post_id IS NOT NULL AND campaign IS NOT NULL'
+    )
+
+
+@migration(10, 'ranking dos grupos por UF em todas as plataformas')
+def _group_uf_ranking(conn):
+    create_indexes(
+        conn,
+        'CREATE INDEX IF NOT EXISTS ix_groups_uf_active_ranking ON groups (uf, is_active, activity_score, member_count)'
+    )
+
+
+def applied_versions(engine):
+    with engine.connect() as conn:
+        return {row.version for row in conn.execute(schema_migrations.select())}
+
+
+def run_migrations(engine):
+    """Aplica as migrações pendentes, cada uma em sua transação.
+
+    A versão é registrada antes de aplicar: se outro processo estiver
+    migrando ao mesmo tempo, o INSERT espera o lock e falha com
+    IntegrityError, e a migração é pulada. Retorna as versões aplicadas.
+    """
+    schema_migrations.create(engine, checkfirst=True)
+    done = applied_versions(engine)
+
+    applied = []
+    for version, name, fn in MIGRATIONS:
+        if version in done:
+            continue
+        try:
+            with engine.begin() as conn:
+                conn.execute(schema_migrations.insert().values(
+                    version=version, name=name, applied_at=datetime.utcnow()
+                ))
+                fn(conn)
+        except IntegrityError:
+            continue
+        applied.append(version)
+    return applied
+
+
+@click.command('db-migrate')
+@with_appcontext
+def migrate_command():
+    """Aplica as migrações pendentes do banco"""
+    applied = run_migrations(db.engine)
+    if applied:
+        print(f"Migrações aplicadas: {', '.join(str(version) for version in applied)}")
+    else:
+        print("Banco já está na última versão")
@@ -4,6 +4,8 @@ db = SQLAlchemy()
 
 # Importar todos os modelos para garantir que sejam registrados
 from .user import User
-from .config import BotConfig, AIProvider, SocialAccount, Group
-from .content import JobPost, NewsPost, Publication, ClickTracking
-
+from .config import BotConfig, BotConfigVersion, ResourceVersion, AIProvider, SocialAccount, Group
+from .content import JobPost, NewsPost, Publication, ClickTracking, ClickEvent, IdSequence
+from .analytics import ClickRollupHourly, ClickRollupDaily
+from .dedup import ContentFingerprint, FingerprintBand
+from .idempotency import IdempotencyKey
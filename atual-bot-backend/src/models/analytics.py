@@ -0,0 +1,35 @@
+from src.models import db
+
+class ClickRollupHourly(db.Model):
+    __tablename__ = 'click_rollups_hourly'
+    __table_args__ = (
+        db.UniqueConstraint('bucket', 'content_type', 'content_id', 'group_id', name='uq_click_rollups_hourly_key'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    bucket = db.Column(db.DateTime, nullable=False)  # Início da hora
+    content_type = db.Column(db.String(10), nullable=False, default='')  # job, news ou '' (sem conteúdo)
+    content_id = db.Column(db.Integer, nullable=False, default=0)  # 0 quando não há conteúdo
+    group_id = db.Column(db.Integer, nullable=False, default=0)  # 0 quando o link não é de um grupo
+    clicks = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<ClickRollupHourly {self.bucket} {self.content_type}:{self.content_id} = {self.clicks}>'
+
+class ClickRollupDaily(db.Model):
+    __tablename__ = 'click_rollups_daily'
+    __table_args__ = (
+        db.UniqueConstraint('bucket', 'content_type', 'content_id', 'group_id', name='uq_click_rollups_daily_key'),
+        # Cliques de um conteúdo por grupo (links por grupo das publicações)
+        db.Index('ix_click_rollups_daily_content', 'content_type', 'content_id', 'group_id', 'bucket', 'clicks'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    bucket = db.Column(db.DateTime, nullable=False)  # Início do dia (UTC)
+    content_type = db.Column(db.String(10), nullable=False, default='')
+    content_id = db.Column(db.Integer, nullable=False, default=0)
+    group_id = db.Column(db.Integer, nullable=False, default=0)
+    clicks = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<ClickRollupDaily {self.bucket} {self.content_type}:{self.content_id} = {self.clicks}>'
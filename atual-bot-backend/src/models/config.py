@@ -1,8 +1,70 @@
-from flask_sqlalchemy import SQLAlchemy
+from src.models import db
 from datetime import datetime
 import json
+import threading
+import time
 
-db = SQLAlchemy()
+class BotConfigVersion(db.Model):
+    __tablename__ = 'bot_config_version'
+    
+    # Linha única (id=1) incrementada a cada set_config
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<BotConfigVersion {self.version}>'
+
+class ResourceVersion(db.Model):
+    __tablename__ = 'resource_versions'
+    
+    # Uma linha por recurso da API (jobs, groups...), incrementada a cada escrita
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    
+    def __repr__(self):
+        return f'<ResourceVersion {self.name}: {self.version}>'
+
+class ConfigSnapshot:
+    """Cópia em memória de todas as configurações, já decodificadas.
+
+    A versão no banco é conferida no máximo a cada ``check_interval``
+    segundos com uma consulta de uma linha; só quando ela muda (set_config
+    em qualquer processo) a tabela inteira é recarregada.
+    """
+    
+    def __init__(self, check_interval=1.0):
+        self.check_interval = check_interval
+        self.values = {}
+        self.version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+    
+    def current(self):
+        """Retorna o dicionário de configurações, recarregando se preciso"""
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return self.values
+        
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.check_interval:
+                version = db.session.query(BotConfigVersion.version).filter_by(id=1).scalar() or 0
+                if version != self.version:
+                    # Versão lida antes das linhas: uma escrita no meio só causa outro reload
+                    self.values = {config.key: _decode(config.value) for config in BotConfig.query.all()}
+                    self.version = version
+                self._checked_at = time.monotonic()
+        return self.values
+    
+    def expire(self):
+        """Força a conferência da versão na próxima leitura"""
+        self._checked_at = 0.0
+
+def _decode(value):
+    try:
+        # Tenta fazer parse JSON se for um objeto/array
+        return json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        # Se não for JSON válido, retorna como string
+        return value
 
 class BotConfig(db.Model):
     __tablename__ = 'bot_config'
@@ -17,18 +79,23 @@ class BotConfig(db.Model):
     def __repr__(self):
         return f'<BotConfig {self.key}: {self.value}>'
     
+    snapshot = ConfigSnapshot()
+    
     @staticmethod
     def get_config(key, default=None):
         """Obtém uma configuração pelo key"""
-        config = BotConfig.query.filter_by(key=key).first()
-        if config:
-            try:
-                # Tenta fazer parse JSON se for um objeto/array
-                return json.loads(config.value)
-            except (json.JSONDecodeError, TypeError):
-                # Se não for JSON válido, retorna como string
-                return config.value
-        return default
+        return BotConfig.snapshot.current().get(key, default)
+    
+    @staticmethod
+    def get_all_configs():
+        """Obtém todas as configurações decodificadas"""
+        return dict(BotConfig.snapshot.current())
+    
+    @staticmethod
+    def get_version():
+        """Versão atual das configurações vista por este processo"""
+        BotConfig.snapshot.current()
+        return BotConfig.snapshot.version
     
     @staticmethod
     def set_config(key, value, description=None):
@@ -54,7 +121,15 @@ class BotConfig(db.Model):
             )
             db.session.add(config)
         
+        # Incrementa a versão na mesma transação para os outros processos
+        bumped = BotConfigVersion.query.filter_by(id=1).update(
+            {BotConfigVersion.version: BotConfigVersion.version + 1}
+        )
+        if not bumped:
+            db.session.add(BotConfigVersion(id=1, version=1))
+        
         db.session.commit()
+        BotConfig.snapshot.expire()
         return config
 
 class AIProvider(db.Model):
@@ -90,16 +165,27 @@ class SocialAccount(db.Model):
 
 class Group(db.Model):
     __tablename__ = 'groups'
+    __table_args__ = (
+        # Ranking por engajamento (top_k do /api/publish), por filtro usado
+        db.Index('ix_groups_ranking', 'is_active', 'activity_score', 'member_count'),
+        db.Index('ix_groups_platform_ranking', 'platform', 'is_active', 'activity_score', 'member_count'),
+        db.Index('ix_groups_uf_ranking', 'uf', 'platform', 'is_active', 'activity_score', 'member_count'),
+        db.Index('ix_groups_uf_active_ranking', 'uf', 'is_active', 'activity_score', 'member_count'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     platform = db.Column(db.String(50), nullable=False)  # whatsapp, facebook, telegram
     group_id = db.Column(db.String(500), nullable=False)  # ID único do grupo na plataforma
     link = db.Column(db.String(1000), nullable=True)
+    uf = db.Column(db.String(2), nullable=True)  # Estado do público do grupo
     member_count = db.Column(db.Integer, default=0)
     activity_score = db.Column(db.Float, default=0.0)  # Score de engajamento calculado pela IA
     is_active = db.Column(db.Boolean, default=True)
     auto_discovered = db.Column(db.Boolean, default=False)  # Se foi descoberto automaticamente
+    quiet_hours_start = db.Column(db.Integer, nullable=True)  # Hora local (0-23) em que os envios param
+    quiet_hours_end = db.Column(db.Integer, nullable=True)  # Hora local (0-23) em que os envios voltam
+    min_post_interval = db.Column(db.Integer, default=0)  # Minutos mínimos entre dois envios ao grupo
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
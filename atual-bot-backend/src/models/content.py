@@ -1,16 +1,38 @@
-from flask_sqlalchemy import SQLAlchemy
+from src.models import db
 from datetime import datetime
 import json
 
-db = SQLAlchemy()
+
+def serialize_field(obj, field):
+    """Valor de uma coluna pronto para JSON (datas em ISO, tags como lista)"""
+    value = getattr(obj, field)
+    if field == 'tags':
+        return json.loads(value) if value else []
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
 
 class JobPost(db.Model):
     __tablename__ = 'job_posts'
+    __table_args__ = (
+        # Índices casados com os filtros e a ordenação de GET /api/jobs
+        db.Index('ix_job_posts_created_at_id', 'created_at', 'id'),
+        db.Index('ix_job_posts_job_type_created_at', 'job_type', 'created_at'),
+        db.Index('ix_job_posts_work_mode_created_at', 'work_mode', 'created_at'),
+        db.Index('ix_job_posts_experience_level_created_at', 'experience_level', 'created_at'),
+        db.Index('ix_job_posts_salary_min', 'salary_min'),
+        db.Index('ix_job_posts_uf_created_at', 'uf', 'created_at'),
+        # Cobre o GROUP BY de GET /api/jobs/facets
+        db.Index('ix_job_posts_facets', 'uf', 'job_type', 'work_mode', 'experience_level', 'is_published'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(500), nullable=False)
     company = db.Column(db.String(200), nullable=True)
     location = db.Column(db.String(200), nullable=True)
+    city = db.Column(db.String(200), nullable=True)  # Cidade extraída de location
+    uf = db.Column(db.String(2), nullable=True)  # Sigla do estado (estados_brasil)
     salary = db.Column(db.String(100), nullable=True)
     salary_min = db.Column(db.Float, nullable=True)  # Para filtros numéricos
     salary_max = db.Column(db.Float, nullable=True)
@@ -32,30 +54,28 @@ class JobPost(db.Model):
     def __repr__(self):
         return f'<JobPost {self.title} - {self.company}>'
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'company': self.company,
-            'location': self.location,
-            'salary': self.salary,
-            'salary_min': self.salary_min,
-            'salary_max': self.salary_max,
-            'description': self.description,
-            'requirements': self.requirements,
-            'job_type': self.job_type,
-            'work_mode': self.work_mode,
-            'experience_level': self.experience_level,
-            'source_url': self.source_url,
-            'source_name': self.source_name,
-            'tracking_url': self.tracking_url,
-            'is_published': self.is_published,
-            'published_at': self.published_at.isoformat() if self.published_at else None,
-            'created_at': self.created_at.isoformat()
-        }
+    # Colunas exibidas nas listagens (sem descrição e requisitos)
+    SUMMARY_FIELDS = (
+        'id', 'title', 'company', 'location', 'city', 'uf', 'salary', 'salary_min', 'salary_max',
+        'job_type', 'work_mode', 'experience_level', 'source_name', 'tracking_url',
+        'is_published', 'published_at', 'created_at'
+    )
+    FIELDS = (
+        'id', 'title', 'company', 'location', 'city', 'uf', 'salary', 'salary_min', 'salary_max',
+        'description', 'requirements', 'job_type', 'work_mode', 'experience_level',
+        'source_url', 'source_name', 'tracking_url', 'is_published', 'published_at', 'created_at'
+    )
+    
+    def to_dict(self, fields=None):
+        """Serializa a vaga; ``fields`` restringe às colunas pedidas"""
+        return {field: serialize_field(self, field) for field in fields or self.FIELDS}
 
 class NewsPost(db.Model):
     __tablename__ = 'news_posts'
+    __table_args__ = (
+        db.Index('ix_news_posts_created_at_id', 'created_at', 'id'),
+        db.Index('ix_news_posts_category_created_at', 'category', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(500), nullable=False)
@@ -77,25 +97,44 @@ class NewsPost(db.Model):
     def __repr__(self):
         return f'<NewsPost {self.title}>'
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'summary': self.summary,
-            'content': self.content,
-            'source_url': self.source_url,
-            'source_name': self.source_name,
-            'tracking_url': self.tracking_url,
-            'category': self.category,
-            'tags': json.loads(self.tags) if self.tags else [],
-            'is_published': self.is_published,
-            'published_at': self.published_at.isoformat() if self.published_at else None,
-            'original_published_at': self.original_published_at.isoformat() if self.original_published_at else None,
-            'created_at': self.created_at.isoformat()
-        }
+    # Colunas exibidas nas listagens (sem o corpo da notícia e as tags)
+    SUMMARY_FIELDS = (
+        'id', 'title', 'summary', 'source_name', 'tracking_url', 'category',
+        'is_published', 'published_at', 'original_published_at', 'created_at'
+    )
+    FIELDS = (
+        'id', 'title', 'summary', 'content', 'source_url', 'source_name', 'tracking_url',
+        'category', 'tags', 'is_published', 'published_at', 'original_published_at', 'created_at'
+    )
+    
+    def to_dict(self, fields=None):
+        """Serializa a notícia; ``fields`` restringe às colunas pedidas"""
+        return {field: serialize_field(self, field) for field in fields or self.FIELDS}
 
 class Publication(db.Model):
     __tablename__ = 'publications'
+    __table_args__ = (
+        db.Index('ix_publications_created_at_id', 'created_at', 'id'),
+        db.Index('ix_publications_status_created_at', 'status', 'created_at', 'id'),
+        db.Index('ix_publications_group_id', 'group_id'),
+        db.Index('ix_publications_job_post_id', 'job_post_id'),
+        db.Index('ix_publications_news_post_id', 'news_post_id'),
+        db.Index('ix_publications_status_next_attempt_at', 'status', 'next_attempt_at'),
+        db.Index('ix_publications_group_id_scheduled_for', 'group_id', 'scheduled_for'),
+        # Um envio por conteúdo, grupo e campanha (índices parciais: só uma
+        # das colunas de conteúdo é preenchida, e envios sem campanha não
+        # são deduplicados)
+        db.Index(
+            'uq_publications_job_group_campaign', 'job_post_id', 'group_id', 'campaign', unique=True,
+            sqlite_where=db.text('job_post_id IS NOT NULL AND campaign IS NOT NULL'),
+            postgresql_where=db.text('job_post_id IS NOT NULL AND campaign IS NOT NULL')
+        ),
+        db.Index(
+            'uq_publications_news_group_campaign', 'news_post_id', 'group_id', 'campaign', unique=True,
+            sqlite_where=db.text('news_post_id IS NOT NULL AND campaign IS NOT NULL'),
+            postgresql_where=db.text('news_post_id IS NOT NULL AND campaign IS NOT NULL')
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable=False)
@@ -103,17 +142,29 @@ class Publication(db.Model):
     news_post_id = db.Column(db.Integer, db.ForeignKey('news_posts.id'), nullable=True)
     message_content = db.Column(db.Text, nullable=False)
     platform_message_id = db.Column(db.String(200), nullable=True)  # ID da mensagem na plataforma
-    status = db.Column(db.String(50), default='pending')  # pending, sent, failed
+    status = db.Column(db.String(50), default='pending')  # pending, sending, sent, failed
     error_message = db.Column(db.Text, nullable=True)
     sent_at = db.Column(db.DateTime, nullable=True)
+    scheduled_for = db.Column(db.DateTime, default=datetime.utcnow)  # Horário planejado do envio
+    attempts = db.Column(db.Integer, default=0)  # Tentativas de envio já feitas
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)  # Quando pode ser enviada (de novo)
+    claimed_at = db.Column(db.DateTime, nullable=True)  # Reservada pelo worker de envio (status sending)
+    campaign = db.Column(db.String(250), nullable=True)  # Chave de deduplicação (campanha ou Idempotency-Key)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    group = db.relationship('Group', lazy=True)
+    
     def __repr__(self):
         content_type = 'job' if self.job_post_id else 'news'
         return f'<Publication {content_type} to group {self.group_id}>'
 
 class ClickTracking(db.Model):
     __tablename__ = 'click_tracking'
+    __table_args__ = (
+        db.Index('ix_click_tracking_job_post_id', 'job_post_id'),
+        db.Index('ix_click_tracking_news_post_id', 'news_post_id'),
+        db.Index('ix_click_tracking_group_id', 'group_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     tracking_id = db.Column(db.String(100), unique=True, nullable=False)
@@ -129,3 +180,30 @@ class ClickTracking(db.Model):
     def __repr__(self):
         return f'<ClickTracking {self.tracking_id}>'
 
+
+class IdSequence(db.Model):
+    __tablename__ = 'id_sequences'
+    
+    # Próximo id livre de cada tabela cujos ids são reservados em bloco
+    name = db.Column(db.String(50), primary_key=True)
+    next_value = db.Column(db.Integer, nullable=False, default=1)
+    
+    def __repr__(self):
+        return f'<IdSequence {self.name}: {self.next_value}>'
+
+class ClickEvent(db.Model):
+    __tablename__ = 'click_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    click_tracking_id = db.Column(db.Integer, db.ForeignKey('click_tracking.id'), nullable=False, index=True)
+    # Colunas desnormalizadas do link para agregações sem JOIN
+    job_post_id = db.Column(db.Integer, nullable=True)
+    news_post_id = db.Column(db.Integer, nullable=True)
+    group_id = db.Column(db.Integer, nullable=True)
+    ip_address = db.Column(db.String(45), nullable=True)
+    user_agent = db.Column(db.String(500), nullable=True)
+    referrer = db.Column(db.String(1000), nullable=True)
+    clicked_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<ClickEvent {self.click_tracking_id} em {self.clicked_at}>'
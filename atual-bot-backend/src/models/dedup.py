@@ -0,0 +1,34 @@
+from src.models import db
+from datetime import datetime
+
+class ContentFingerprint(db.Model):
+    __tablename__ = 'content_fingerprints'
+    __table_args__ = (
+        db.UniqueConstraint('content_type', 'content_id', name='uq_content_fingerprints_content'),
+        db.Index('ix_content_fingerprints_exact_hash', 'content_type', 'exact_hash'),
+        db.Index('ix_content_fingerprints_duplicate_of', 'content_type', 'duplicate_of'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    content_type = db.Column(db.String(10), nullable=False)  # job ou news
+    content_id = db.Column(db.Integer, nullable=False)
+    exact_hash = db.Column(db.String(40), nullable=False)  # SHA-1 dos campos normalizados
+    simhash = db.Column(db.BigInteger, nullable=False)  # SimHash de 64 bits (com sinal)
+    duplicate_of = db.Column(db.Integer, nullable=True)  # Id do original do cluster
+    distance = db.Column(db.Integer, nullable=True)  # Bits diferentes do SimHash do original
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ContentFingerprint {self.content_type}:{self.content_id}>'
+
+class FingerprintBand(db.Model):
+    """Faixa de 16 bits do SimHash (buckets LSH para achar candidatos)"""
+    __tablename__ = 'fingerprint_bands'
+    
+    content_type = db.Column(db.String(10), primary_key=True)
+    band = db.Column(db.Integer, primary_key=True)  # 0 a 3
+    value = db.Column(db.Integer, primary_key=True)  # 16 bits do SimHash
+    content_id = db.Column(db.Integer, primary_key=True)
+    
+    def __repr__(self):
+        return f'<FingerprintBand {self.content_type} {self.band}:{self.value} -> {self.content_id}>'
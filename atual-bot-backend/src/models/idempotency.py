@@ -0,0 +1,19 @@
+from src.models import db
+from datetime import datetime
+
+class IdempotencyKey(db.Model):
+    """Resposta de uma requisição enviada com o cabeçalho Idempotency-Key"""
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.Index('ix_idempotency_keys_created_at', 'created_at'),
+    )
+    
+    scope = db.Column(db.String(50), primary_key=True)  # Endpoint (ex.: publish)
+    key = db.Column(db.String(200), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)  # SHA-256 do corpo da requisição
+    status_code = db.Column(db.Integer, nullable=False)
+    response_body = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<IdempotencyKey {self.scope}:{self.key}>'
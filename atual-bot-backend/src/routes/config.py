@@ -1,25 +1,19 @@
 from flask import Blueprint, request, jsonify
 from src.models.config import db, BotConfig, AIProvider, SocialAccount, Group
+from src.services.normalization import location_parser
+from src.services.resource_versions import conditional
 from datetime import datetime
-import json
 
 config_bp = Blueprint('config', __name__)
 
 @config_bp.route('/config', methods=['GET'])
+@conditional('config')
 def get_all_configs():
     """Obtém todas as configurações"""
     try:
-        configs = BotConfig.query.all()
-        result = {}
-        for config in configs:
-            try:
-                result[config.key] = json.loads(config.value)
-            except (json.JSONDecodeError, TypeError):
-                result[config.key] = config.value
-        
         return jsonify({
             'success': True,
-            'data': result
+            'data': BotConfig.get_all_configs()
         })
     except Exception as e:
         return jsonify({
@@ -28,6 +22,7 @@ def get_all_configs():
         }), 500
 
 @config_bp.route('/config/<key>', methods=['GET'])
+@conditional('config')
 def get_config(key):
     """Obtém uma configuração específica"""
     try:
@@ -66,6 +61,7 @@ def set_config(key):
         }), 500
 
 @config_bp.route('/ai-providers', methods=['GET'])
+@conditional('ai_providers')
 def get_ai_providers():
     """Lista todos os provedores de IA"""
     try:
@@ -153,6 +149,7 @@ def create_ai_provider():
         }), 500
 
 @config_bp.route('/social-accounts', methods=['GET'])
+@conditional('social_accounts')
 def get_social_accounts():
     """Lista todas as contas sociais"""
     try:
@@ -234,6 +231,7 @@ def create_social_account():
         }), 500
 
 @config_bp.route('/groups', methods=['GET'])
+@conditional('groups')
 def get_groups():
     """Lista todos os grupos"""
     try:
@@ -246,10 +244,14 @@ def get_groups():
                 'platform': group.platform,
                 'group_id': group.group_id,
                 'link': group.link,
+                'uf': group.uf,
                 'member_count': group.member_count,
                 'activity_score': group.activity_score,
                 'is_active': group.is_active,
                 'auto_discovered': group.auto_discovered,
+                'quiet_hours_start': group.quiet_hours_start,
+                'quiet_hours_end': group.quiet_hours_end,
+                'min_post_interval': group.min_post_interval or 0,
                 'created_at': group.created_at.isoformat()
             })
         
@@ -295,7 +297,9 @@ def create_group():
             member_count=data.get('member_count', 0),
             activity_score=data.get('activity_score', 0.0),
             is_active=data.get('is_active', True),
-            auto_discovered=data.get('auto_discovered', False)
+            auto_discovered=data.get('auto_discovered', False),
+            uf=group_uf(data.get('uf')),
+            **send_window_fields(data)
         )
         
         db.session.add(group)
@@ -311,6 +315,12 @@ def create_group():
                 'group_id': group.group_id
             }
         })
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -334,6 +344,10 @@ def update_group(group_id):
             group.member_count = data['member_count']
         if 'activity_score' in data:
             group.activity_score = data['activity_score']
+        if 'uf' in data:
+            group.uf = group_uf(data['uf'])
+        for field, value in send_window_fields(data).items():
+            setattr(group, field, value)
         
         db.session.commit()
         
@@ -341,6 +355,12 @@ def update_group(group_id):
             'success': True,
             'message': 'Grupo atualizado com sucesso'
         })
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -367,3 +387,27 @@ def delete_group(group_id):
             'error': str(e)
         }), 500
 
+def send_window_fields(data):
+    """Campos da janela de envio do grupo presentes em ``data``, validados"""
+    fields = {}
+    for field in ('quiet_hours_start', 'quiet_hours_end'):
+        if field in data:
+            value = data[field]
+            if value is not None and (not isinstance(value, int) or not 0 <= value <= 23):
+                raise ValueError(f'{field} deve ser uma hora entre 0 e 23')
+            fields[field] = value
+    if 'min_post_interval' in data:
+        value = data['min_post_interval'] or 0
+        if not isinstance(value, int) or value < 0:
+            raise ValueError('min_post_interval deve ser um número de minutos não negativo')
+        fields['min_post_interval'] = value
+    return fields
+
+def group_uf(value):
+    """Sigla do estado a partir da sigla ou do nome (None se vazio)"""
+    if not value:
+        return None
+    _, uf = location_parser().parse(value)
+    if not uf:
+        raise ValueError(f'UF inválida: {value}')
+    return uf
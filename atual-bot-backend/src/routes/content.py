@@ -1,66 +1,98 @@
-from flask import Blueprint, request, jsonify
-from src.models.content import db, JobPost, NewsPost, Publication, ClickTracking
+from flask import Blueprint, current_app, request, jsonify
+from src.models.content import db, JobPost, NewsPost, Publication
 from src.models.config import Group
-from datetime import datetime
-import uuid
+from src.models.dedup import ContentFingerprint
+from src.services.bulk_ingest import bulk_ingest
+from src.services.click_analytics import click_breakdown
+from src.services.dedup import FINGERPRINT_FIELDS, duplicate_clusters, duplicate_filter, post_fields, register_fingerprints
+from src.services.tracking_links import create_tracking_link, tracking_path
+from src.services.dispatch import apply_status_reports, dispatcher
+from src.services.facets import job_facets
+from src.services.normalization import normalize_job, normalize_job_rows
+from src.services.pagination import page_size, paginate_request
+from src.services.projections import project, requested_fields
+from src.services.idempotency import IDEMPOTENCY_HEADER, idempotent
+from src.services.link_cache import link_cache
+from src.services.publications import (
+    MAX_CAMPAIGN_LENGTH, active_groups, campaign_key, create_publications, describe_plan,
+    discard_unused_links, drop_published, mint_group_links, plan_publications
+)
+from src.services.resource_versions import bump, conditional, resource_versions
+from src.services.scheduling import local_timezone, parse_send_time
+from src.services.search import search_index
+from src.services.streaming import stream_export
+from src.services.targeting import RECENT_DAYS, select_top_groups
+from sqlalchemy.orm import joinedload
+from datetime import datetime, timedelta
+import click
+import io
 import json
 
 content_bp = Blueprint('content', __name__)
 
+# Buffer de leitura do corpo NDJSON das importações em lote
+NDJSON_BUFFER_SIZE = 64 * 1024
+
 @content_bp.route('/jobs', methods=['GET'])
+@conditional('jobs')
 def get_jobs():
-    """Lista todas as vagas"""
+    """Lista as vagas (projeção resumida por padrão, ou ``fields=``)"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        
-        # Filtros
-        location = request.args.get('location')
-        salary_min = request.args.get('salary_min', type=float)
-        job_type = request.args.get('job_type')
-        work_mode = request.args.get('work_mode')
-        experience_level = request.args.get('experience_level')
-        
-        query = JobPost.query
-        
-        # Aplicar filtros
-        if location:
-            query = query.filter(JobPost.location.ilike(f'%{location}%'))
-        if salary_min:
-            query = query.filter(JobPost.salary_min >= salary_min)
-        if job_type:
-            query = query.filter(JobPost.job_type == job_type)
-        if work_mode:
-            query = query.filter(JobPost.work_mode == work_mode)
-        if experience_level:
-            query = query.filter(JobPost.experience_level == experience_level)
-        
-        # Ordenar por mais recentes
-        query = query.order_by(JobPost.created_at.desc())
-        
-        # Paginação
-        jobs = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        fields = requested_fields(JobPost, request.args.get('fields'))
+        query = project(build_jobs_query(request.args), JobPost, fields)
+        
+        # Paginação (page/per_page ou cursor com after)
+        jobs, pagination = paginate_request(query, JobPost, request.args)
         
         result = {
-            'jobs': [job.to_dict() for job in jobs.items],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': jobs.total,
-                'pages': jobs.pages,
-                'has_next': jobs.has_next,
-                'has_prev': jobs.has_prev
-            }
+            'jobs': [job.to_dict(fields) for job in jobs],
+            'pagination': pagination
         }
         
         return jsonify({
             'success': True,
             'data': result
         })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@content_bp.route('/jobs/export', methods=['GET'])
+@conditional('jobs')
+def export_jobs():
+    """Exporta as vagas filtradas em streaming (JSON, ou NDJSON com format=ndjson)"""
+    try:
+        fields = requested_fields(JobPost, request.args.get('fields', 'all'))
+        query = project(build_jobs_query(request.args), JobPost, fields)
+        
+        return stream_export(query, lambda job: job.to_dict(fields), 'jobs', request.args.get('format'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@content_bp.route('/jobs/facets', methods=['GET'])
+@conditional('jobs')
+def get_job_facets():
+    """Contagens por UF, tipo, modalidade, nível e publicação (mesmos filtros de /jobs)"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': job_facets.counts(request.args, build_jobs_query)
+        })
     except Exception as e:
         return jsonify({
             'success': False,
@@ -96,26 +128,29 @@ def create_job():
             source_name=data.get('source_name')
         )
         
-        # Gerar URL de tracking se tiver URL original
-        if job.source_url:
-            tracking_id = str(uuid.uuid4())
-            job.tracking_url = f"/track/{tracking_id}"
-            
-            # Criar registro de tracking
-            tracking = ClickTracking(
-                tracking_id=tracking_id,
-                original_url=job.source_url,
-                job_post_id=job.id
-            )
-            db.session.add(tracking)
+        # Cidade, UF e faixa salarial extraídas do texto
+        normalize_job(job)
         
         db.session.add(job)
+        db.session.flush()
+        
+        # Gerar URL de tracking (código curto) se tiver URL original
+        if job.source_url:
+            tracking = create_tracking_link(job.source_url, job_post_id=job.id)
+            job.tracking_url = tracking_path(tracking.tracking_id)
+        
+        # Impressão digital: marca se já existe uma vaga igual ou quase igual
+        duplicate_of = register_fingerprints('job', [(job.id, post_fields('job', job))])[job.id]
+        
         db.session.commit()
         
+        data = job.to_dict()
+        data['duplicate_of'] = duplicate_of
+        
         return jsonify({
             'success': True,
             'message': 'Vaga criada com sucesso',
-            'data': job.to_dict()
+            'data': data
         })
     except Exception as e:
         db.session.rollback()
@@ -124,51 +159,71 @@ def create_job():
             'error': str(e)
         }), 500
 
-@content_bp.route('/news', methods=['GET'])
-def get_news():
-    """Lista todas as notícias"""
+@content_bp.route('/jobs/bulk', methods=['POST'])
+def bulk_jobs():
+    """Importa vagas em lote a partir de NDJSON (um objeto JSON por linha)"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        
-        # Filtros
-        category = request.args.get('category')
-        source = request.args.get('source')
-        
-        query = NewsPost.query
+        # O corpo é lido linha a linha (com buffer), sem carregar o lote inteiro
+        result = bulk_ingest('job', io.BufferedReader(request.stream, NDJSON_BUFFER_SIZE))
         
-        # Aplicar filtros
-        if category:
-            query = query.filter(NewsPost.category == category)
-        if source:
-            query = query.filter(NewsPost.source_name.ilike(f'%{source}%'))
+        return jsonify({
+            'success': True,
+            'data': result
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@content_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@conditional('jobs')
+def get_job(job_id):
+    """Retorna a vaga completa"""
+    try:
+        job = JobPost.query.get(job_id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Vaga não encontrada'
+            }), 404
         
-        # Ordenar por mais recentes
-        query = query.order_by(NewsPost.created_at.desc())
+        return jsonify({
+            'success': True,
+            'data': job.to_dict()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@content_bp.route('/news', methods=['GET'])
+@conditional('news')
+def get_news():
+    """Lista as notícias (projeção resumida por padrão, ou ``fields=``)"""
+    try:
+        fields = requested_fields(NewsPost, request.args.get('fields'))
+        query = project(build_news_query(request.args), NewsPost, fields)
         
-        # Paginação
-        news = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        # Paginação (page/per_page ou cursor com after)
+        news, pagination = paginate_request(query, NewsPost, request.args)
         
         result = {
-            'news': [article.to_dict() for article in news.items],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': news.total,
-                'pages': news.pages,
-                'has_next': news.has_next,
-                'has_prev': news.has_prev
-            }
+            'news': [article.to_dict(fields) for article in news],
+            'pagination': pagination
         }
         
         return jsonify({
             'success': True,
             'data': result
         })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -199,25 +254,63 @@ def create_news():
             original_published_at=datetime.fromisoformat(data['original_published_at']) if data.get('original_published_at') else None
         )
         
-        # Gerar URL de tracking
-        tracking_id = str(uuid.uuid4())
-        news.tracking_url = f"/track/{tracking_id}"
+        db.session.add(news)
+        db.session.flush()
+        
+        # Gerar URL de tracking (código curto)
+        tracking = create_tracking_link(news.source_url, news_post_id=news.id)
+        news.tracking_url = tracking_path(tracking.tracking_id)
         
-        # Criar registro de tracking
-        tracking = ClickTracking(
-            tracking_id=tracking_id,
-            original_url=news.source_url,
-            news_post_id=news.id
-        )
+        # Impressão digital: marca se já existe uma notícia igual ou quase igual
+        duplicate_of = register_fingerprints('news', [(news.id, post_fields('news', news))])[news.id]
         
-        db.session.add(news)
-        db.session.add(tracking)
         db.session.commit()
         
+        data = news.to_dict()
+        data['duplicate_of'] = duplicate_of
+        
         return jsonify({
             'success': True,
             'message': 'Notícia criada com sucesso',
-            'data': news.to_dict()
+            'data': data
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@content_bp.route('/news/export', methods=['GET'])
+@conditional('news')
+def export_news():
+    """Exporta as notícias filtradas em streaming (JSON, ou NDJSON com format=ndjson)"""
+    try:
+        fields = requested_fields(NewsPost, request.args.get('fields', 'all'))
+        query = project(build_news_query(request.args), NewsPost, fields)
+        
+        return stream_export(query, lambda article: article.to_dict(fields), 'news', request.args.get('format'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@content_bp.route('/news/bulk', methods=['POST'])
+def bulk_news():
+    """Importa notícias em lote a partir de NDJSON (um objeto JSON por linha)"""
+    try:
+        # O corpo é lido linha a linha (com buffer), sem carregar o lote inteiro
+        result = bulk_ingest('news', io.BufferedReader(request.stream, NDJSON_BUFFER_SIZE))
+        
+        return jsonify({
+            'success': True,
+            'data': result
         })
     except Exception as e:
         db.session.rollback()
@@ -226,19 +319,51 @@ def create_news():
             'error': str(e)
         }), 500
 
+@content_bp.route('/news/<int:article_id>', methods=['GET'])
+@conditional('news')
+def get_article(article_id):
+    """Retorna a notícia completa"""
+    try:
+        article = NewsPost.query.get(article_id)
+        if not article:
+            return jsonify({
+                'success': False,
+                'error': 'Notícia não encontrada'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': article.to_dict()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @content_bp.route('/publish', methods=['POST'])
+@idempotent('publish')
 def publish_content():
-    """Publica conteúdo em grupos selecionados"""
+    """Publica conteúdo nos grupos de group_ids ou nos melhores grupos de target.
+    
+    Com ``campaign`` (ou, sem ela, o cabeçalho Idempotency-Key) o conteúdo
+    vai uma vez por grupo naquela campanha; sem nenhum dos dois o envio não
+    é deduplicado. Repetir a requisição com o mesmo Idempotency-Key devolve
+    a resposta original.
+    """
     try:
         data = request.get_json()
         content_type = data.get('content_type')  # 'job' ou 'news'
         content_id = data.get('content_id')
         group_ids = data.get('group_ids', [])
+        target = data.get('target')  # {"top_k", "platform", "uf", "exclude_recent_days"}
+        dry_run = bool(data.get('dry_run'))
+        campaign = data.get('campaign')
         
-        if not all([content_type, content_id, group_ids]):
+        if not all([content_type, content_id]) or not (group_ids or target):
             return jsonify({
                 'success': False,
-                'error': 'Tipo de conteúdo, ID e grupos são obrigatórios'
+                'error': 'Tipo de conteúdo, ID e grupos (group_ids ou target) são obrigatórios'
             }), 400
         
         # Verificar se o conteúdo existe
@@ -258,43 +383,87 @@ def publish_content():
                 'error': 'Conteúdo não encontrado'
             }), 404
         
-        # Criar publicações para cada grupo
-        publications = []
-        for group_id in group_ids:
-            group = Group.query.get(group_id)
-            if not group or not group.is_active:
-                continue
-            
-            # Gerar mensagem formatada
-            if content_type == 'job':
-                message = self._format_job_message(content)
-            else:
-                message = self._format_news_message(content)
-            
-            publication = Publication(
-                group_id=group_id,
-                job_post_id=content_id if content_type == 'job' else None,
-                news_post_id=content_id if content_type == 'news' else None,
-                message_content=message,
-                status='pending'
+        # Horários pedidos (padrão: agora) e distribuição ao longo do tempo
+        tz = local_timezone(current_app.config.get('SCHEDULER_TIMEZONE'))
+        schedule = data.get('schedule') or []
+        slots = [parse_send_time(value, tz) for value in (schedule if isinstance(schedule, list) else [schedule])]
+        spread_minutes = data.get('spread_minutes') or 0
+        if not isinstance(spread_minutes, (int, float)) or spread_minutes < 0:
+            raise ValueError('spread_minutes deve ser um número não negativo')
+        if campaign is not None and (not isinstance(campaign, str) or len(campaign) > MAX_CAMPAIGN_LENGTH):
+            raise ValueError(f'campaign deve ser um texto de até {MAX_CAMPAIGN_LENGTH} caracteres')
+        dedupe_key = campaign_key(campaign, request.headers.get(IDEMPOTENCY_HEADER))
+        
+        # Grupos de destino: os informados ou os melhores pelo ranking
+        if target:
+            if not isinstance(target, dict):
+                raise ValueError('target deve ser um objeto')
+            recent_days = target.get('exclude_recent_days', RECENT_DAYS)
+            if not isinstance(recent_days, int) or recent_days < 0:
+                raise ValueError('exclude_recent_days deve ser um inteiro não negativo')
+            groups = select_top_groups(
+                target.get('top_k'), target.get('platform'), target.get('uf'),
+                content_type, content.id, recent_days
             )
-            
-            db.session.add(publication)
-            publications.append(publication)
+            skipped = []
+        else:
+            groups, skipped = active_groups(group_ids)
+        
+        rows = plan_publications(content_type, content, groups, slots, timedelta(minutes=spread_minutes), tz, dedupe_key)
+        
+        # Envios já feitos nesta campanha ficam de fora (busca no índice único)
+        rows, duplicate_group_ids = drop_published(content_type, content, rows)
         
-        # Marcar conteúdo como publicado
-        content.is_published = True
-        content.published_at = datetime.utcnow()
+        # Dry run: mostra o plano sem gravar nada
+        if dry_run:
+            return jsonify({
+                'success': True,
+                'data': {
+                    'dry_run': True,
+                    'publications_planned': len(rows),
+                    'skipped_group_ids': skipped,
+                    'duplicate_group_ids': duplicate_group_ids,
+                    'plan': describe_plan(groups, rows)
+                }
+            })
+        
+        # Um link de tracking por grupo e todas as publicações de uma vez
+        links = mint_group_links(content_type, content, rows, current_app.config.get('PUBLIC_BASE_URL') or request.host_url)
+        created = create_publications(rows)
+        # Linhas que outra requisição gravou no meio tempo: sem links órfãos
+        discard_unused_links(links, created)
+        created_groups = {group_id for _, group_id, _ in created}
+        duplicate_group_ids += [
+            group_id for group_id in dict.fromkeys(row['group_id'] for row in rows) if group_id not in created_groups
+        ]
+        
+        # Marcar conteúdo como publicado (se algum envio foi de fato criado)
+        if created:
+            content.is_published = True
+            content.published_at = datetime.utcnow()
         
         db.session.commit()
+        resource_versions.expire()
+        send_times = [scheduled_for for _, _, scheduled_for in created]
+        dispatcher.schedule(send_times)
         
         return jsonify({
             'success': True,
-            'message': f'Conteúdo agendado para publicação em {len(publications)} grupos',
+            'message': f"Conteúdo agendado para publicação em {len(created_groups)} grupos",
             'data': {
-                'publications_created': len(publications)
+                'publications_created': len(created),
+                'skipped_group_ids': skipped,
+                'duplicate_group_ids': duplicate_group_ids,
+                'first_send_at': min(send_times).isoformat() if send_times else None,
+                'last_send_at': max(send_times).isoformat() if send_times else None
             }
         })
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -303,28 +472,21 @@ def publish_content():
         }), 500
 
 @content_bp.route('/publications', methods=['GET'])
+@conditional('publications', 'groups', 'jobs', 'news')
 def get_publications():
     """Lista todas as publicações"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        status = request.args.get('status')
-        
-        query = Publication.query
-        
-        if status:
-            query = query.filter(Publication.status == status)
-        
-        query = query.order_by(Publication.created_at.desc())
-        
-        publications = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
+        # Grupo e título do conteúdo vêm no mesmo SELECT, não um por linha
+        query = build_publications_query(request.args).options(
+            joinedload(Publication.group).load_only(Group.name, Group.platform),
+            joinedload(Publication.job_post).load_only(JobPost.title),
+            joinedload(Publication.news_post).load_only(NewsPost.title)
         )
         
+        publications, pagination = paginate_request(query, Publication, request.args)
+        
         result = []
-        for pub in publications.items:
+        for pub in publications:
             pub_data = {
                 'id': pub.id,
                 'group_id': pub.group_id,
@@ -333,6 +495,7 @@ def get_publications():
                 'status': pub.status,
                 'error_message': pub.error_message,
                 'sent_at': pub.sent_at.isoformat() if pub.sent_at else None,
+                'scheduled_for': pub.scheduled_for.isoformat() if pub.scheduled_for else None,
                 'created_at': pub.created_at.isoformat(),
                 'content_type': 'job' if pub.job_post_id else 'news',
                 'content_title': pub.job_post.title if pub.job_post else (pub.news_post.title if pub.news_post else None)
@@ -343,69 +506,90 @@ def get_publications():
             'success': True,
             'data': {
                 'publications': result,
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': publications.total,
-                    'pages': publications.pages,
-                    'has_next': publications.has_next,
-                    'has_prev': publications.has_prev
-                }
+                'pagination': pagination
             }
         })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@content_bp.route('/publications/status/bulk', methods=['POST'])
+def report_publication_statuses():
+    """Recebe em lote os resultados de envio dos workers externos.
+    
+    Corpo: lista de {id, status, platform_message_id, error_message, sent_at};
+    tudo é gravado em uma única transação.
+    """
+    try:
+        result = apply_status_reports(db.session.connection(), request.get_json())
+        db.session.commit()
+        resource_versions.expire()
+        
+        return jsonify({
+            'success': True,
+            'data': result
+        })
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 @content_bp.route('/analytics/clicks', methods=['GET'])
+@conditional('clicks', 'groups', daily=True)
 def get_click_analytics():
     """Obtém analytics de cliques"""
     try:
         # Parâmetros de filtro
         days = request.args.get('days', 30, type=int)
         content_type = request.args.get('content_type')  # 'job' ou 'news'
+        content_id = request.args.get('content_id', type=int)  # com content_type: cliques por grupo de um conteúdo
         
-        # Query base
-        query = ClickTracking.query
-        
-        # Filtrar por período
-        from datetime import timedelta
-        start_date = datetime.utcnow() - timedelta(days=days)
-        query = query.filter(ClickTracking.clicked_at >= start_date)
-        
-        # Filtrar por tipo de conteúdo
-        if content_type == 'job':
-            query = query.filter(ClickTracking.job_post_id.isnot(None))
-        elif content_type == 'news':
-            query = query.filter(ClickTracking.news_post_id.isnot(None))
-        
-        clicks = query.all()
-        
-        # Estatísticas básicas
-        total_clicks = len(clicks)
-        
-        # Cliques por dia
-        clicks_by_day = {}
-        for click in clicks:
-            day = click.clicked_at.date().isoformat()
-            clicks_by_day[day] = clicks_by_day.get(day, 0) + 1
+        return jsonify({
+            'success': True,
+            'data': click_breakdown(days, content_type, content_id)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@content_bp.route('/duplicates', methods=['GET'])
+@conditional('jobs', 'news')
+def get_duplicates():
+    """Lista os clusters de vagas ou notícias quase duplicadas"""
+    try:
+        content_type = request.args.get('content_type', 'job')
+        if content_type not in FINGERPRINT_FIELDS:
+            return jsonify({
+                'success': False,
+                'error': 'Tipo de conteúdo inválido'
+            }), 400
         
-        # Cliques por grupo
-        clicks_by_group = {}
-        for click in clicks:
-            if click.group_id:
-                group_name = click.group.name if click.group else f"Grupo {click.group_id}"
-                clicks_by_group[group_name] = clicks_by_group.get(group_name, 0) + 1
+        page = request.args.get('page', 1, type=int)
+        per_page = page_size(request.args)
+        clusters, pagination = duplicate_clusters(content_type, page, per_page)
         
         return jsonify({
             'success': True,
             'data': {
-                'total_clicks': total_clicks,
-                'period_days': days,
-                'clicks_by_day': clicks_by_day,
-                'clicks_by_group': clicks_by_group
+                'clusters': clusters,
+                'pagination': pagination
             }
         })
     except Exception as e:
@@ -414,40 +598,149 @@ def get_click_analytics():
             'error': str(e)
         }), 500
 
-def _format_job_message(job):
-    """Formata mensagem de vaga para publicação"""
-    message = f"""💼 *NOVA VAGA DE EMPREGO*
+@content_bp.cli.command('fingerprint-backfill')
+@click.option('--batch-size', type=int, default=1000, help='Posts por transação')
+def fingerprint_backfill_command(batch_size):
+    """Gera as impressões digitais dos posts que ainda não têm"""
+    for content_type, (model, head, body) in FINGERPRINT_FIELDS.items():
+        columns = [getattr(model, column) for column in head + body]
+        missing = ~ContentFingerprint.query.filter(
+            ContentFingerprint.content_type == content_type,
+            ContentFingerprint.content_id == model.id
+        ).exists()
+        
+        processed = 0
+        duplicates = 0
+        last_id = 0
+        while True:
+            rows = db.session.query(model.id, *columns).filter(model.id > last_id, missing).order_by(model.id).limit(batch_size).all()
+            if not rows:
+                break
+            
+            results = register_fingerprints(content_type, [(row[0], dict(zip(head + body, row[1:]))) for row in rows])
+            db.session.commit()
+            
+            processed += len(rows)
+            duplicates += sum(1 for duplicate_of in results.values() if duplicate_of)
+            last_id = rows[-1][0]
+        
+        print(f"{content_type}: {processed} impressões geradas, {duplicates} duplicados")
 
-📋 *{job.title}*
-🏢 {job.company or 'Empresa não informada'}
-📍 {job.location or 'Localização não informada'}"""
+@content_bp.cli.command('normalize-jobs')
+@click.option('--batch-size', type=int, default=1000, help='Vagas por transação')
+def normalize_jobs_command(batch_size):
+    """Recalcula cidade, UF e faixa salarial das vagas existentes"""
+    columns = ('location', 'salary', 'salary_min', 'salary_max', 'city', 'uf')
+    updated_columns = ('salary_min', 'salary_max', 'city', 'uf')
+    table = JobPost.__table__
+    update = table.update().where(table.c.id == db.bindparam('job_id'))
     
-    if job.salary:
-        message += f"\n💰 {job.salary}"
+    processed = 0
+    changed = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(JobPost.id, *(getattr(JobPost, column) for column in columns)).filter(
+            JobPost.id > last_id
+        ).order_by(JobPost.id).limit(batch_size).all()
+        if not rows:
+            break
+        
+        originals = [dict(zip(columns, row[1:]), job_id=row[0]) for row in rows]
+        normalized = normalize_job_rows([dict(row) for row in originals])
+        
+        # Um UPDATE em lote (executemany) só com as linhas que mudaram
+        updates = [
+            dict({column: row[column] for column in updated_columns}, job_id=row['job_id'])
+            for row, original in zip(normalized, originals) if row != original
+        ]
+        if updates:
+            db.session.execute(update, updates)
+            bump(db.session.connection(), 'jobs')
+            # UPDATE Core: não passa pelos eventos do ORM que limpam o cache de links
+            link_cache.invalidate_on_commit(db.session, contents=[('job', row['job_id']) for row in updates])
+        db.session.commit()
+        
+        processed += len(rows)
+        changed += len(updates)
+        last_id = rows[-1][0]
     
-    if job.work_mode:
-        message += f"\n🏠 {job.work_mode}"
+    print(f"{processed} vagas processadas, {changed} atualizadas")
+
+@content_bp.cli.command('dispatch')
+@click.option('--timeout', type=float, default=None, help='Tempo máximo em segundos')
+def dispatch_command(timeout):
+    """Envia agora as publicações pendentes já vencidas"""
+    dispatcher.drain(timeout)
+    stats = dispatcher.stats()
+    print(f"Enviadas: {stats['sent']}, falhas: {stats['failed']}, reagendadas: {stats['retried']}")
+
+@content_bp.cli.command('dispatch-worker')
+def dispatch_worker_command():
+    """Roda o worker de envio em primeiro plano (um único processo)"""
+    print("Worker de envio iniciado (Ctrl+C para parar)")
+    dispatcher.run_forever()
+    stats = dispatcher.stats()
+    print(f"Enviadas: {stats['sent']}, falhas: {stats['failed']}, reagendadas: {stats['retried']}")
+
+def build_jobs_query(args):
+    """Monta a query de listagem de vagas a partir da query string"""
+    # Filtros
+    q = args.get('q')
+    location = args.get('location')
+    salary_min = args.get('salary_min', type=float)
+    job_type = args.get('job_type')
+    work_mode = args.get('work_mode')
+    experience_level = args.get('experience_level')
+    uf = args.get('uf')
+    hide_duplicates = args.get('hide_duplicates', '').lower() in ('1', 'true')
     
-    if job.job_type:
-        message += f"\n📄 {job.job_type}"
+    query = JobPost.query
     
-    message += f"\n\n👉 *Clique aqui para se candidatar:*\n{job.tracking_url or job.source_url}"
+    # Aplicar filtros
+    if uf:
+        query = query.filter(JobPost.uf == uf.upper())
+    if salary_min:
+        query = query.filter(JobPost.salary_min >= salary_min)
+    if job_type:
+        query = query.filter(JobPost.job_type == job_type)
+    if work_mode:
+        query = query.filter(JobPost.work_mode == work_mode)
+    if experience_level:
+        query = query.filter(JobPost.experience_level == experience_level)
+    if hide_duplicates:
+        query = query.filter(duplicate_filter('job', JobPost))
     
-    return message
-
-def _format_news_message(news):
-    """Formata mensagem de notícia para publicação"""
-    message = f"""📰 *NOTÍCIA MUNDIAL*
+    # Ordenar por mais recentes (ou por relevância quando há busca)
+    query = query.order_by(JobPost.created_at.desc())
+    return search_index.filter('job', query, q=q, location=location)
 
-📋 *{news.title}*"""
-    
-    if news.summary:
-        message += f"\n\n📝 {news.summary[:200]}{'...' if len(news.summary) > 200 else ''}"
+def build_news_query(args):
+    """Monta a query de listagem de notícias a partir da query string"""
+    # Filtros
+    q = args.get('q')
+    category = args.get('category')
+    source = args.get('source')
+    hide_duplicates = args.get('hide_duplicates', '').lower() in ('1', 'true')
     
-    if news.source_name:
-        message += f"\n\n🏢 Fonte: {news.source_name}"
+    query = NewsPost.query
     
-    message += f"\n\n👉 *Leia mais:*\n{news.tracking_url or news.source_url}"
+    # Aplicar filtros
+    if category:
+        query = query.filter(NewsPost.category == category)
+    if hide_duplicates:
+        query = query.filter(duplicate_filter('news', NewsPost))
     
-    return message
+    # Ordenar por mais recentes (ou por relevância quando há busca)
+    query = query.order_by(NewsPost.created_at.desc())
+    return search_index.filter('news', query, q=q, source_name=source)
 
+def build_publications_query(args):
+    """Monta a query de listagem de publicações a partir da query string"""
+    status = args.get('status')
+    
+    query = Publication.query
+    
+    if status:
+        query = query.filter(Publication.status == status)
+    
+    return query.order_by(Publication.created_at.desc())
@@ -0,0 +1,157 @@
+import json
+from datetime import datetime
+
+from src.models.content import db, JobPost, NewsPost, ClickTracking
+from src.services.dedup import register_fingerprints
+from src.services.facets import job_facets
+from src.services.normalization import normalize_job_rows
+from src.services.resource_versions import MODEL_RESOURCES, bump, resource_versions
+from src.services.search import SEARCH_FIELDS, search_index
+from src.services.tracking_links import allocate_ids, encode_code, tracking_path
+
+# Linhas por transação (um INSERT multi-linha de posts e um de links)
+CHUNK_SIZE = 500
+
+JOB_COLUMNS = (
+    'title', 'company', 'location', 'salary', 'salary_min', 'salary_max', 'description',
+    'requirements', 'job_type', 'work_mode', 'experience_level', 'source_url', 'source_name'
+)
+NEWS_COLUMNS = ('title', 'summary', 'content', 'source_url', 'source_name', 'category')
+
+
+def _number(record, key):
+    value = record.get(key)
+    if value is None or (isinstance(value, (int, float)) and not isinstance(value, bool)):
+        return value
+    raise ValueError(f"'{key}' deve ser numérico")
+
+
+def job_row(record):
+    """Valida um registro de vaga e retorna a linha a inserir"""
+    if not isinstance(record, dict):
+        raise ValueError('Cada linha deve ser um objeto JSON')
+    if not record.get('title'):
+        raise ValueError('Título é obrigatório')
+
+    row = {column: record.get(column) for column in JOB_COLUMNS}
+    row['salary_min'] = _number(record, 'salary_min')
+    row['salary_max'] = _number(record, 'salary_max')
+    return row
+
+
+def news_row(record):
+    """Valida um registro de notícia e retorna a linha a inserir"""
+    if not isinstance(record, dict):
+        raise ValueError('Cada linha deve ser um objeto JSON')
+    if not record.get('title') or not record.get('source_url'):
+        raise ValueError('Título e URL da fonte são obrigatórios')
+
+    row = {column: record.get(column) for column in NEWS_COLUMNS}
+    tags = record.get('tags', [])
+    if not isinstance(tags, list):
+        raise ValueError("'tags' deve ser uma lista")
+    row['tags'] = json.dumps(tags)
+    published = record.get('original_published_at')
+    row['original_published_at'] = datetime.fromisoformat(published) if published else None
+    return row
+
+
+# tipo -> (modelo, validação, coluna do post em ClickTracking, normalização do bloco)
+BULK_TYPES = {
+    'job': (JobPost, job_row, 'job_post_id', normalize_job_rows),
+    'news': (NewsPost, news_row, 'news_post_id', None)
+}
+
+
+def bulk_ingest(content_type, lines, chunk_size=CHUNK_SIZE):
+    """Importa NDJSON (um registro por linha) em transações de ``chunk_size``.
+
+    As linhas são lidas e validadas à medida que chegam; linhas inválidas
+    entram em ``errors`` com o número da linha sem interromper o lote. Se um
+    bloco falhar no banco, só as linhas daquele bloco são reportadas. Posts
+    marcados como quase duplicados são listados em ``duplicates``.
+    """
+    model, build_row, link_column, normalize = BULK_TYPES[content_type]
+    result = {'received': 0, 'created': 0, 'ids': [], 'duplicates': [], 'errors': []}
+
+    chunk = []
+    for line_number, raw in enumerate(lines, 1):
+        if not raw.strip():
+            continue
+        result['received'] += 1
+        try:
+            chunk.append((line_number, build_row(json.loads(raw))))
+        except ValueError as e:
+            result['errors'].append({'line': line_number, 'error': str(e)})
+
+        if len(chunk) >= chunk_size:
+            _insert_chunk(content_type, model, link_column, normalize, chunk, result)
+            chunk = []
+
+    if chunk:
+        _insert_chunk(content_type, model, link_column, normalize, chunk, result)
+    return result
+
+
+def _insert_chunk(content_type, model, link_column, normalize, chunk, result):
+    rows = [row for _, row in chunk]
+    try:
+        if normalize:
+            normalize(rows)
+
+        # Os ids dos links são reservados antes, então o tracking_url já
+        # entra no INSERT dos posts e os links saem em um único INSERT
+        linked = [row for row in rows if row.get('source_url')]
+        link_ids = allocate_ids(len(linked))
+        for row in rows:
+            row['tracking_url'] = None
+        for row, link_id in zip(linked, link_ids):
+            row['tracking_url'] = tracking_path(encode_code(link_id))
+
+        # INSERT Core (sem o ORM) multi-linha. O RETURNING não garante a
+        # ordem, mas os ids autoincrementais crescem na ordem das linhas do
+        # INSERT; ordenados, casam com ``rows`` (sort_by_parameter_order
+        # faria um comando por linha no SQLite)
+        table = model.__table__
+        post_ids = sorted(db.session.execute(table.insert().returning(table.c.id), rows).scalars())
+
+        linked_posts = [(row, post_id) for row, post_id in zip(rows, post_ids) if row.get('source_url')]
+        links = [
+            {
+                'id': link_id,
+                'tracking_id': encode_code(link_id),
+                'original_url': row['source_url'],
+                link_column: post_id
+            }
+            for link_id, (row, post_id) in zip(link_ids, linked_posts)
+        ]
+        if links:
+            db.session.execute(ClickTracking.__table__.insert(), links)
+
+        duplicates = register_fingerprints(content_type, list(zip(post_ids, rows)))
+        bump(db.session.connection(), MODEL_RESOURCES[model])
+
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        result['errors'].extend({'line': line_number, 'error': str(e)} for line_number, _ in chunk)
+        return
+
+    result['created'] += len(post_ids)
+    result['ids'].extend(post_ids)
+    result['duplicates'].extend(
+        {'line': line_number, 'id': post_id, 'duplicate_of': duplicates[post_id]}
+        for (line_number, _), post_id in zip(chunk, post_ids) if duplicates[post_id]
+    )
+
+    # O INSERT em massa não passa pelos eventos do ORM; o FTS5 se atualiza
+    # pelos triggers, mas o índice em memória, as facetas e as versões não
+    resource_versions.expire()
+    if content_type == 'job':
+        job_facets.record_inserts(rows)
+    if search_index.backend == 'memory':
+        weights = SEARCH_FIELDS[content_type][2]
+        search_index.apply_changes([
+            (content_type, post_id, {column: row.get(column) for column in weights})
+            for row, post_id in zip(rows, post_ids)
+        ])
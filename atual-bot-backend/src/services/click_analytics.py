@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, union_all
+
+from src.models import db
+from src.models.analytics import ClickRollupDaily, ClickRollupHourly
+from src.models.config import Group
+from src.services.click_rollups import day_bucket, hour_bucket
+
+
+def aggregate_clicks(start, content_type=None, by_group=False, content_id=None):
+    """Executa ``aggregate_clicks_query`` e retorna as linhas"""
+    return db.session.execute(aggregate_clicks_query(start, content_type, by_group, content_id)).all()
+
+
+def aggregate_clicks_query(start, content_type=None, by_group=False, content_id=None):
+    """Agrega os cliques a partir de ``start`` em uma única consulta.
+
+    Os dias completos vêm dos rollups diários e o dia parcial do início da
+    janela dos rollups horários (UNION ALL), então ``start`` é respeitado
+    com precisão de uma hora. Cada linha traz o bucket (dia ou hora), o
+    total e os totais de vagas e notícias (agregação condicional); com
+    ``by_group`` a agregação também é por grupo, com o nome vindo de um
+    LEFT JOIN em ``groups``. Com ``content_id`` (e ``content_type``), só os
+    cliques daquele conteúdo.
+    """
+    full_days = day_bucket(start)
+    if full_days < start:
+        full_days += timedelta(days=1)
+
+    statement = _rollup_query(ClickRollupDaily, content_type, by_group, content_id).filter(
+        ClickRollupDaily.bucket >= full_days
+    ).statement
+    if hour_bucket(start) < full_days:
+        statement = union_all(statement, _rollup_query(ClickRollupHourly, content_type, by_group, content_id).filter(
+            ClickRollupHourly.bucket >= hour_bucket(start),
+            ClickRollupHourly.bucket < full_days
+        ).statement)
+    return statement
+
+
+def _rollup_query(rollup, content_type, by_group, content_id):
+    columns = [
+        rollup.bucket.label('bucket'),
+        func.sum(rollup.clicks).label('clicks'),
+        func.sum(case((rollup.content_type == 'job', rollup.clicks), else_=0)).label('job_clicks'),
+        func.sum(case((rollup.content_type == 'news', rollup.clicks), else_=0)).label('news_clicks')
+    ]
+    group_by = [rollup.bucket]
+
+    if by_group:
+        columns += [rollup.group_id.label('group_id'), Group.name.label('group_name')]
+        group_by += [rollup.group_id, Group.name]
+
+    query = db.session.query(*columns)
+    if by_group:
+        query = query.outerjoin(Group, Group.id == rollup.group_id)
+
+    if content_type in ('job', 'news'):
+        query = query.filter(rollup.content_type == content_type)
+        if content_id is not None:
+            query = query.filter(rollup.content_id == content_id)
+
+    return query.group_by(*group_by)
+
+
+def click_breakdown(days, content_type=None, content_id=None):
+    """Total, cliques por dia e por grupo dos últimos ``days`` dias"""
+    rows = aggregate_clicks(datetime.utcnow() - timedelta(days=days), content_type, by_group=True, content_id=content_id)
+
+    total_clicks = 0
+    clicks_by_day = {}
+    clicks_by_group = {}
+    for row in rows:
+        total_clicks += row.clicks
+        day = row.bucket.date().isoformat()
+        clicks_by_day[day] = clicks_by_day.get(day, 0) + row.clicks
+        if row.group_id:
+            group_name = row.group_name or f"Grupo {row.group_id}"
+            clicks_by_group[group_name] = clicks_by_group.get(group_name, 0) + row.clicks
+
+    return {
+        'total_clicks': total_clicks,
+        'period_days': days,
+        'clicks_by_day': clicks_by_day,
+        'clicks_by_group': clicks_by_group
+    }
+
+
+def click_summary(days=30, recent_days=7):
+    """Totais dos últimos ``days`` dias e cliques por dia dos ``recent_days`` mais recentes"""
+    now = datetime.utcnow()
+    recent_start = day_bucket(now - timedelta(days=recent_days))
+
+    total_clicks = 0
+    job_clicks = 0
+    news_clicks = 0
+    clicks_by_day = {}
+    for row in aggregate_clicks(now - timedelta(days=days)):
+        total_clicks += row.clicks
+        job_clicks += row.job_clicks
+        news_clicks += row.news_clicks
+        if row.bucket >= recent_start:
+            day = row.bucket.date().isoformat()
+            clicks_by_day[day] = clicks_by_day.get(day, 0) + row.clicks
+
+    return {
+        f'total_clicks_{days}d': total_clicks,
+        f'job_clicks_{days}d': job_clicks,
+        f'news_clicks_{days}d': news_clicks,
+        f'clicks_by_day_{recent_days}d': clicks_by_day
+    }
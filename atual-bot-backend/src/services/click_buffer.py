@@ -0,0 +1,143 @@
+import atexit
+import threading
+from datetime import datetime
+
+from src.models.content import ClickEvent
+from src.services.click_rollups import apply_rollups
+from src.services.link_cache import link_cache
+from src.services.resource_versions import bump
+
+
+class ClickEventBuffer:
+    """Fila em memória de cliques gravados em lote por uma thread de fundo.
+
+    O handler de redirecionamento apenas enfileira o evento; a thread de
+    fundo grava tudo com um único INSERT multi-linha quando a fila atinge
+    ``max_size`` ou quando ``flush_interval`` segundos se passam, somando o
+    lote às tabelas de rollup na mesma transação.
+
+    Um lote que falha volta para a fila e é tentado de novo no próximo
+    flush; se falhar outra vez, os eventos são gravados um a um, para que
+    uma linha ruim (ex.: link apagado) não descarte os outros cliques.
+    """
+
+    def __init__(self, max_size=500, flush_interval=2.0):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self._events = []
+        self._retry = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._engine = None
+        self.written = 0
+        self.failed = 0
+
+    def init_app(self, app):
+        self.max_size = app.config.get('CLICK_BUFFER_MAX_SIZE', self.max_size)
+        self.flush_interval = app.config.get('CLICK_BUFFER_FLUSH_INTERVAL', self.flush_interval)
+
+        from src.models import db
+        with app.app_context():
+            self._engine = db.engine
+
+        self._thread = threading.Thread(target=self._run, name='click-buffer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def enqueue(self, link, ip_address=None, user_agent=None, referrer=None, clicked_at=None):
+        """Enfileira um clique no link informado (não toca no banco)"""
+        event = {
+            'click_tracking_id': link.id,
+            'job_post_id': link.job_post_id,
+            'news_post_id': link.news_post_id,
+            'group_id': link.group_id,
+            'ip_address': (ip_address or '')[:45],
+            'user_agent': (user_agent or '')[:500],
+            'referrer': (referrer or '')[:1000],
+            'clicked_at': clicked_at or datetime.utcnow()
+        }
+        with self._lock:
+            self._events.append(event)
+            pending = len(self._events)
+
+        if pending >= self.max_size:
+            self._wakeup.set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._events) + len(self._retry)
+
+    def flush(self, requeue=True):
+        """Grava imediatamente todos os eventos pendentes.
+
+        Com ``requeue`` falso (no encerramento) um lote que falha vai direto
+        para a gravação um a um, sem esperar o próximo flush.
+        """
+        with self._flush_lock:
+            if self._engine is None:
+                return 0
+            with self._lock:
+                retry, self._retry = self._retry, []
+                events = retry + self._events
+                self._events = []
+
+            if not events:
+                return 0
+
+            try:
+                with self._engine.begin() as conn:
+                    self._write(conn, events)
+            except Exception as e:
+                print(f"Erro ao gravar cliques: {e}")
+                if requeue and not retry:
+                    with self._lock:
+                        self._retry = events
+                    return 0
+                return self._write_each(events)
+
+            self.written += len(events)
+            return len(events)
+
+    def _write_each(self, events):
+        """Grava cada evento na sua transação, descartando só os que falham"""
+        written = 0
+        for event in events:
+            try:
+                with self._engine.begin() as conn:
+                    self._write(conn, [event])
+            except Exception as e:
+                self.failed += 1
+                print(f"Clique descartado: {e}")
+                # O link pode ter sido apagado: o próximo clique volta a consultar o banco
+                link_cache.invalidate_links([event['click_tracking_id']])
+            else:
+                written += 1
+
+        self.written += written
+        return written
+
+    def _write(self, conn, events):
+        conn.execute(ClickEvent.__table__.insert(), events)
+        # Rollups e versão do recurso 'clicks' na mesma transação dos eventos
+        apply_rollups(conn, events)
+        bump(conn, 'clicks')
+
+    def close(self):
+        """Para a thread de fundo e grava o que restou na fila"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush(requeue=False)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+click_buffer = ClickEventBuffer()
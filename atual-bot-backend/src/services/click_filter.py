@@ -0,0 +1,94 @@
+import re
+import threading
+import time
+from functools import lru_cache
+
+# Robôs que buscam o link só para montar a prévia da mensagem nos grupos
+PREVIEW_BOT_PATTERN = re.compile(
+    r'WhatsApp/|TelegramBot|facebookexternalhit|Facebot|meta-externalagent|'
+    r'Twitterbot|Slackbot|LinkedInBot|Discordbot|SkypeUriPreview|Googlebot|'
+    r'bingbot|Applebot|redditbot|Pinterestbot|vkShare|Embedly|Iframely',
+    re.IGNORECASE
+)
+
+
+class PreviewBotClassifier:
+    """Identifica crawlers de prévia de link pelo User-Agent"""
+
+    def __init__(self):
+        self.short_circuited = 0
+
+    def is_preview_bot(self, user_agent):
+        if not user_agent or not _matches_preview_bot(user_agent):
+            return False
+        self.short_circuited += 1
+        return True
+
+    def stats(self):
+        return {'short_circuited': self.short_circuited}
+
+
+@lru_cache(maxsize=1024)
+def _matches_preview_bot(user_agent):
+    # Poucos User-Agents distintos respondem pela maior parte do tráfego
+    return PREVIEW_BOT_PATTERN.search(user_agent) is not None
+
+
+class DuplicateClickFilter:
+    """Descarta toques repetidos do mesmo IP no mesmo link dentro da janela.
+
+    Usa duas gerações de conjuntos de hashes: a atual e a anterior. Uma
+    chave vista em qualquer uma delas é duplicada, então a janela efetiva
+    fica entre ``window`` e ``2 * window`` segundos, sem varrer nada para
+    expirar entradas. ``max_entries`` antecipa a rotação sob tráfego alto.
+    """
+
+    def __init__(self, window=30, max_entries=100000):
+        self.window = window
+        self.max_entries = max_entries
+        self._current = set()
+        self._previous = set()
+        self._rotated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.short_circuited = 0
+
+    def init_app(self, app):
+        self.window = app.config.get('DUPLICATE_CLICK_WINDOW', self.window)
+        self.max_entries = app.config.get('DUPLICATE_CLICK_MAX_ENTRIES', self.max_entries)
+
+    def is_duplicate(self, ip_address, link_id):
+        """Registra o clique e diz se ele repete um clique recente"""
+        key = hash((ip_address, link_id))
+        with self._lock:
+            now = time.monotonic()
+            if now - self._rotated_at >= self.window or len(self._current) >= self.max_entries:
+                self._previous = self._current
+                self._current = set()
+                self._rotated_at = now
+
+            if key in self._current or key in self._previous:
+                self.short_circuited += 1
+                return True
+
+            self._current.add(key)
+            return False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'short_circuited': self.short_circuited,
+                'window': self.window,
+                'entries': len(self._current) + len(self._previous)
+            }
+
+
+preview_bots = PreviewBotClassifier()
+duplicate_clicks = DuplicateClickFilter()
+
+
+def client_ip(request):
+    """IP do cliente, considerando o primeiro endereço do X-Forwarded-For"""
+    forwarded_for = request.environ.get('HTTP_X_FORWARDED_FOR')
+    if forwarded_for:
+        return forwarded_for.split(',')[0].strip()
+    return request.remote_addr
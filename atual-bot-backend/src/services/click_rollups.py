@@ -0,0 +1,99 @@
+from collections import Counter
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models.analytics import ClickRollupHourly, ClickRollupDaily
+from src.models.content import ClickEvent
+from src.services.resource_versions import bump
+
+ROLLUP_KEY = ('bucket', 'content_type', 'content_id', 'group_id')
+
+# Tamanho dos lotes lidos de click_events no rebuild
+REBUILD_CHUNK_SIZE = 10000
+
+
+def hour_bucket(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(moment):
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _rollup_key(event):
+    if event['job_post_id']:
+        content_type, content_id = 'job', event['job_post_id']
+    elif event['news_post_id']:
+        content_type, content_id = 'news', event['news_post_id']
+    else:
+        content_type, content_id = '', 0
+    return content_type, content_id, event['group_id'] or 0
+
+
+def aggregate(events):
+    """Agrupa eventos de clique em contagens (horárias, diárias)"""
+    hourly = Counter()
+    daily = Counter()
+    for event in events:
+        key = _rollup_key(event)
+        hourly[(hour_bucket(event['clicked_at']),) + key] += 1
+        daily[(day_bucket(event['clicked_at']),) + key] += 1
+    return hourly, daily
+
+
+def apply_rollups(conn, events):
+    """Soma os eventos às tabelas de rollup (na transação de ``conn``)"""
+    hourly, daily = aggregate(events)
+    _upsert(conn, ClickRollupHourly.__table__, hourly)
+    _upsert(conn, ClickRollupDaily.__table__, daily)
+
+
+def _upsert(conn, table, counts):
+    if not counts:
+        return
+
+    if conn.dialect.name == 'postgresql':
+        stmt = postgresql.insert(table)
+    else:
+        stmt = sqlite.insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEY),
+        set_={'clicks': table.c.clicks + stmt.excluded.clicks}
+    )
+
+    rows = [dict(zip(ROLLUP_KEY, key), clicks=clicks) for key, clicks in counts.items()]
+    conn.execute(stmt, rows)
+
+
+def rebuild_rollups(engine, since=None):
+    """Recalcula os rollups a partir de click_events.
+
+    Com ``since``, refaz apenas os buckets a partir daquele dia. Roda em uma
+    única transação e lê os eventos em lotes, sem carregar tudo em memória.
+    Retorna o número de eventos processados.
+    """
+    hourly_table = ClickRollupHourly.__table__
+    daily_table = ClickRollupDaily.__table__
+    columns = [ClickEvent.job_post_id, ClickEvent.news_post_id, ClickEvent.group_id, ClickEvent.clicked_at]
+
+    query = select(*columns).order_by(ClickEvent.clicked_at)
+    if since is not None:
+        since = day_bucket(since)
+        query = query.where(ClickEvent.clicked_at >= since)
+
+    processed = 0
+    with engine.begin() as conn:
+        for table in (hourly_table, daily_table):
+            delete = table.delete()
+            if since is not None:
+                delete = delete.where(table.c.bucket >= since)
+            conn.execute(delete)
+
+        result = conn.execution_options(stream_results=True, yield_per=REBUILD_CHUNK_SIZE).execute(query)
+        for chunk in result.mappings().partitions():
+            apply_rollups(conn, chunk)
+            processed += len(chunk)
+        bump(conn, 'clicks')
+
+    return processed
@@ -0,0 +1,113 @@
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele só gzip é oferecido
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/x-ndjson', 'application/javascript', 'text/html', 'text/css', 'text/plain'
+}
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=min(level, 11))
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+ENCODERS = {'gzip': _Gzip}
+if brotli is not None:
+    ENCODERS['br'] = _Brotli
+
+
+def choose_encoding(accept_encodings):
+    """Codificação preferida pelo cliente entre as disponíveis (br antes de gzip)"""
+    best = None
+    best_quality = 0
+    for encoding in ('br', 'gzip'):
+        quality = accept_encodings[encoding]
+        if encoding in ENCODERS and quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_stream(chunks, encoder):
+    """Comprime um iterável de bytes pedaço a pedaço"""
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = encoder.compress(chunk)
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+class Compression:
+    """Compressão gzip/brotli negociada pelo Accept-Encoding.
+
+    Respostas normais acima de ``COMPRESS_MIN_SIZE`` bytes são comprimidas
+    de uma vez; respostas em streaming são comprimidas pedaço a pedaço, sem
+    juntar o corpo em memória. O ETag vira fraco (W/), já que os bytes
+    mudam com a codificação.
+    """
+
+    def __init__(self):
+        self.level = 6
+        self.min_size = 1024
+
+    def init_app(self, app):
+        self.level = app.config.get('COMPRESS_LEVEL', 6)
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+        app.after_request(self.compress_response)
+
+    def compress_response(self, response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, ENCODERS[encoding](self.level))
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            encoder = ENCODERS[encoding](self.level)
+            response.set_data(encoder.compress(data) + encoder.finish())
+
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+compression = Compression()
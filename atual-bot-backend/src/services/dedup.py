@@ -0,0 +1,248 @@
+import hashlib
+
+from sqlalchemy import and_, or_
+
+from src.models.content import db, JobPost, NewsPost
+from src.models.dedup import ContentFingerprint, FingerprintBand
+from src.services.search import tokenize
+
+SIMHASH_BITS = 64
+BANDS = 4
+BAND_BITS = SIMHASH_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+# Com 4 faixas de 16 bits, dois SimHash a até 3 bits de distância têm
+# pelo menos uma faixa idêntica, então os buckets acham todos os candidatos
+MAX_DISTANCE = BANDS - 1
+
+# Peso dos tokens do cabeçalho (título etc.) frente aos bigramas do corpo
+HEAD_WEIGHT = 3
+
+# Tokens curtos ("a", "de", "em") mudam à toa entre fontes e não distinguem posts
+MIN_TOKEN_LENGTH = 3
+
+# Só o início do corpo entra no SimHash (o custo é por token)
+MAX_BODY_TOKENS = 1000
+
+# tipo -> (modelo, campos do cabeçalho, campos do corpo)
+FINGERPRINT_FIELDS = {
+    'job': (JobPost, ('title', 'company', 'location'), ('description', 'requirements')),
+    'news': (NewsPost, ('title',), ('summary', 'content'))
+}
+
+
+# Soma por bit feita em "faixas" de 32 bits de um inteiro grande: cada
+# feature vira um único multiplicar-e-somar em vez de 64 somas em Python
+LANE_BITS = 32
+SPREAD = [sum((byte >> bit & 1) << (bit * LANE_BITS) for bit in range(8)) for byte in range(256)]
+
+
+def _spread(digest):
+    """Espalha os 64 bits do digest, um por faixa (bit i na faixa i)"""
+    return sum(SPREAD[byte] << (index * 8 * LANE_BITS) for index, byte in enumerate(digest))
+
+
+def simhash(head_tokens, body_tokens):
+    """SimHash de 64 bits: tokens do cabeçalho com peso maior e bigramas do corpo"""
+    features = {}
+    for token in head_tokens:
+        features[token] = features.get(token, 0) + HEAD_WEIGHT
+    for first, second in zip(body_tokens, body_tokens[1:]):
+        feature = f'{first} {second}'
+        features[feature] = features.get(feature, 0) + 1
+
+    # Peso das features com cada bit ligado; o bit fica ligado se passar da metade
+    weighted = 0
+    for feature, weight in features.items():
+        weighted += weight * _spread(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest())
+
+    total = sum(features.values())
+    lane_mask = (1 << LANE_BITS) - 1
+    return sum(
+        1 << bit for bit in range(SIMHASH_BITS)
+        if 2 * (weighted >> (bit * LANE_BITS) & lane_mask) > total
+    )
+
+
+def _tokens(fields, columns):
+    return [token for column in columns for token in tokenize(fields.get(column)) if len(token) >= MIN_TOKEN_LENGTH]
+
+
+def fingerprint(content_type, fields):
+    """Retorna (hash exato, SimHash) dos campos normalizados de um post"""
+    _, head, body = FINGERPRINT_FIELDS[content_type]
+    head_tokens = _tokens(fields, head)
+    body_tokens = _tokens(fields, body)
+
+    normalized = ' '.join(head_tokens) + '|' + ' '.join(body_tokens)
+    exact_hash = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+    return exact_hash, simhash(head_tokens, body_tokens[:MAX_BODY_TOKENS])
+
+
+def bands(value):
+    return [(band, value >> (band * BAND_BITS) & BAND_MASK) for band in range(BANDS)]
+
+
+def hamming(first, second):
+    return (first ^ second).bit_count()
+
+
+def _to_signed(value):
+    # SQLite e PostgreSQL guardam inteiros de 64 bits com sinal
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+def _to_unsigned(value):
+    return value + (1 << SIMHASH_BITS) if value < 0 else value
+
+
+def register_fingerprints(content_type, items):
+    """Grava as impressões de ``items`` [(id, campos)] e marca os duplicados.
+
+    O hash exato é conferido com um IN no índice (tipo, hash) e os quase
+    duplicados com uma consulta aos buckets LSH das 4 faixas do SimHash;
+    só os posts dos buckets em comum são comparados, então o custo não
+    cresce com o total armazenado. Itens do mesmo lote também se comparam
+    entre si. Retorna {id: id do original ou None}. Não faz commit.
+    """
+    if not items:
+        return {}
+
+    prints = [(content_id, *fingerprint(content_type, fields)) for content_id, fields in items]
+
+    exact = {}
+    rows = db.session.query(
+        ContentFingerprint.exact_hash, ContentFingerprint.content_id, ContentFingerprint.duplicate_of
+    ).filter(
+        ContentFingerprint.content_type == content_type,
+        ContentFingerprint.exact_hash.in_({exact_hash for _, exact_hash, _ in prints})
+    )
+    for exact_hash, content_id, duplicate_of in rows:
+        exact.setdefault(exact_hash, duplicate_of or content_id)
+
+    wanted = {}
+    for _, _, value in prints:
+        for band, band_value in bands(value):
+            wanted.setdefault(band, set()).add(band_value)
+
+    buckets = {}
+    rows = db.session.query(
+        FingerprintBand.band, FingerprintBand.value, ContentFingerprint.content_id,
+        ContentFingerprint.simhash, ContentFingerprint.duplicate_of
+    ).join(ContentFingerprint, and_(
+        ContentFingerprint.content_type == FingerprintBand.content_type,
+        ContentFingerprint.content_id == FingerprintBand.content_id
+    )).filter(
+        FingerprintBand.content_type == content_type,
+        or_(*(and_(FingerprintBand.band == band, FingerprintBand.value.in_(values)) for band, values in wanted.items()))
+    )
+    for band, band_value, content_id, value, duplicate_of in rows:
+        buckets.setdefault((band, band_value), []).append((content_id, _to_unsigned(value), duplicate_of or content_id))
+
+    results = {}
+    fingerprint_rows = []
+    band_rows = []
+    for content_id, exact_hash, value in prints:
+        duplicate_of = exact.get(exact_hash)
+        distance = 0 if duplicate_of else None
+
+        if duplicate_of is None:
+            for key in bands(value):
+                for candidate_id, candidate_value, canonical in buckets.get(key, ()):
+                    candidate_distance = hamming(value, candidate_value)
+                    if candidate_distance <= MAX_DISTANCE and (distance is None or candidate_distance < distance):
+                        duplicate_of, distance = canonical, candidate_distance
+
+            # Cópias exatas não trazem faixas novas; só o resto entra nos buckets
+            for key in bands(value):
+                buckets.setdefault(key, []).append((content_id, value, duplicate_of or content_id))
+                band_rows.append({
+                    'content_type': content_type,
+                    'band': key[0],
+                    'value': key[1],
+                    'content_id': content_id
+                })
+
+        exact.setdefault(exact_hash, duplicate_of or content_id)
+        results[content_id] = duplicate_of
+        fingerprint_rows.append({
+            'content_type': content_type,
+            'content_id': content_id,
+            'exact_hash': exact_hash,
+            'simhash': _to_signed(value),
+            'duplicate_of': duplicate_of,
+            'distance': distance
+        })
+
+    db.session.execute(ContentFingerprint.__table__.insert(), fingerprint_rows)
+    if band_rows:
+        db.session.execute(FingerprintBand.__table__.insert(), band_rows)
+    return results
+
+
+def post_fields(content_type, post):
+    """Campos usados na impressão, lidos de um JobPost/NewsPost"""
+    _, head, body = FINGERPRINT_FIELDS[content_type]
+    return {column: getattr(post, column) for column in head + body}
+
+
+def duplicate_filter(content_type, model):
+    """Condição que exclui os posts marcados como duplicados"""
+    return ~db.session.query(ContentFingerprint.id).filter(
+        ContentFingerprint.content_type == content_type,
+        ContentFingerprint.content_id == model.id,
+        ContentFingerprint.duplicate_of.isnot(None)
+    ).exists()
+
+
+def duplicate_clusters(content_type, page=1, per_page=20):
+    """Clusters de duplicados (original + cópias), originais mais novos primeiro.
+
+    Uma consulta pagina os originais pelo índice (tipo, duplicate_of), outra
+    busca os membros e uma terceira os títulos dos posts envolvidos.
+    """
+    model = FINGERPRINT_FIELDS[content_type][0]
+
+    originals = [row[0] for row in db.session.query(ContentFingerprint.duplicate_of).filter(
+        ContentFingerprint.content_type == content_type,
+        ContentFingerprint.duplicate_of.isnot(None)
+    ).distinct().order_by(ContentFingerprint.duplicate_of.desc()).limit(per_page + 1).offset((page - 1) * per_page)]
+    has_next = len(originals) > per_page
+    originals = originals[:per_page]
+
+    members = {}
+    if originals:
+        rows = db.session.query(
+            ContentFingerprint.duplicate_of, ContentFingerprint.content_id, ContentFingerprint.distance
+        ).filter(
+            ContentFingerprint.content_type == content_type,
+            ContentFingerprint.duplicate_of.in_(originals)
+        ).order_by(ContentFingerprint.content_id)
+        for original_id, content_id, distance in rows:
+            members.setdefault(original_id, []).append((content_id, distance))
+
+    ids = set(originals) | {content_id for group in members.values() for content_id, _ in group}
+    posts = {}
+    if ids:
+        rows = db.session.query(model.id, model.title, model.source_name, model.created_at).filter(model.id.in_(ids))
+        for post_id, title, source_name, created_at in rows:
+            posts[post_id] = {
+                'id': post_id,
+                'title': title,
+                'source_name': source_name,
+                'created_at': created_at.isoformat() if created_at else None
+            }
+
+    clusters = []
+    for original_id in originals:
+        duplicates = [
+            dict(posts.get(content_id, {'id': content_id}), distance=distance)
+            for content_id, distance in members.get(original_id, [])
+        ]
+        clusters.append({
+            'original': posts.get(original_id, {'id': original_id}),
+            'duplicates': duplicates,
+            'size': len(duplicates) + 1
+        })
+
+    return clusters, {'page': page, 'per_page': per_page, 'has_next': has_next}
@@ -0,0 +1,523 @@
+import atexit
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from queue import Empty, SimpleQueue
+
+from sqlalchemy import bindparam, select
+
+from src.models.config import Group, SocialAccount
+from src.models.content import Publication
+from src.services.platforms import SendError, build_adapters
+from src.services.resource_versions import bump, resource_versions
+from src.services.scheduling import DueQueue
+
+# Publicações nesses estados não mudam mais
+FINAL_STATUSES = ('sent', 'failed')
+
+# Envios simultâneos, envios por segundo e rajada máxima de cada plataforma
+DEFAULT_PLATFORM_LIMITS = {
+    # Números que disparam rápido demais para grupos são banidos
+    'whatsapp': {'concurrency': 1, 'rate': 0.2, 'burst': 3},
+    # A Bot API aceita ~30 mensagens/s por bot
+    'telegram': {'concurrency': 8, 'rate': 20, 'burst': 20},
+    'facebook': {'concurrency': 2, 'rate': 0.5, 'burst': 2}
+}
+
+publications = Publication.__table__
+groups = Group.__table__
+
+# Grava o resultado de um envio; só vale para publicações ainda reservadas
+RESULT_UPDATE = (
+    publications.update()
+    .where(publications.c.id == bindparam('publication_id'), publications.c.status == 'sending')
+)
+
+# Resultado informado por um worker de fora do processo; publicações em
+# estado final não mudam mais (um != por estado: NOT IN não funciona
+# com executemany)
+REPORT_UPDATE = (
+    publications.update()
+    .where(publications.c.id == bindparam('publication_id'), *(publications.c.status != status for status in FINAL_STATUSES))
+    .values(attempts=publications.c.attempts + 1, next_attempt_at=None, claimed_at=None)
+)
+
+# Resultados aceitos em um único POST /api/publications/status/bulk
+MAX_STATUS_REPORTS = 5000
+
+
+def status_report_row(report, now):
+    """Valida um resultado {id, status, platform_message_id, error_message,
+    sent_at} e retorna os parâmetros do REPORT_UPDATE"""
+    if not isinstance(report, dict):
+        raise ValueError('Cada resultado deve ser um objeto')
+    publication_id = report.get('id')
+    if isinstance(publication_id, bool) or not isinstance(publication_id, int):
+        raise ValueError("'id' deve ser um inteiro")
+    status = report.get('status')
+    if status not in FINAL_STATUSES:
+        raise ValueError(f"'status' deve ser um de: {', '.join(FINAL_STATUSES)}")
+
+    sent_at = None
+    if status == 'sent':
+        sent_at = datetime.fromisoformat(report['sent_at']) if report.get('sent_at') else now
+        if sent_at.tzinfo is not None:
+            sent_at = sent_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return {
+        'publication_id': publication_id,
+        'status': status,
+        'platform_message_id': report.get('platform_message_id'),
+        'error_message': report.get('error_message'),
+        'sent_at': sent_at
+    }
+
+
+def apply_status_reports(conn, reports, now=None):
+    """Grava os resultados de envio de ``reports`` na transação de ``conn``.
+
+    Valida tudo antes de escrever; as linhas ainda abertas são atualizadas
+    com um único executemany. Retorna {'updated', 'unknown_ids',
+    'already_final_ids'}.
+    """
+    if not isinstance(reports, list):
+        raise ValueError('O corpo deve ser uma lista de resultados')
+    if len(reports) > MAX_STATUS_REPORTS:
+        raise ValueError(f'Máximo de {MAX_STATUS_REPORTS} resultados por requisição')
+
+    now = now or datetime.utcnow()
+    # O último resultado de cada id vale
+    rows = {}
+    for report in reports:
+        row = status_report_row(report, now)
+        rows[row['publication_id']] = row
+    if not rows:
+        return {'updated': 0, 'unknown_ids': [], 'already_final_ids': []}
+
+    current = dict(conn.execute(
+        select(publications.c.id, publications.c.status)
+        .where(publications.c.id.in_(rows))
+        .with_for_update()
+    ).all())
+    unknown = [publication_id for publication_id in rows if publication_id not in current]
+    final = [publication_id for publication_id in rows if current.get(publication_id) in FINAL_STATUSES]
+    pending = [row for publication_id, row in rows.items() if publication_id in current and current[publication_id] not in FINAL_STATUSES]
+
+    updated = conn.execute(REPORT_UPDATE, pending).rowcount if pending else 0
+    if updated:
+        bump(conn, 'publications')
+    return {'updated': updated, 'unknown_ids': unknown, 'already_final_ids': final}
+
+
+def is_due(now):
+    """Condição das publicações prontas para envio em ``now``"""
+    return (publications.c.status == 'pending') & (publications.c.next_attempt_at <= now)
+
+
+def due_publications(platform, now, limit):
+    """Ids das publicações de ``platform`` prontas para envio"""
+    return (
+        select(publications.c.id)
+        .join(groups, groups.c.id == publications.c.group_id)
+        .where(is_due(now), groups.c.platform == platform)
+        .order_by(publications.c.next_attempt_at)
+        .limit(limit)
+    )
+
+
+def claim_publications(conn, platform, limit, now=None):
+    """Reserva até ``limit`` publicações de ``platform`` (pending -> sending).
+
+    UPDATE ... RETURNING em um único comando. O UPDATE confere de novo que
+    a linha está pendente: se dois workers escolherem os mesmos ids, quem
+    chegar depois atualiza zero linhas em vez de enviar de novo. No
+    PostgreSQL os ids são escolhidos com FOR UPDATE SKIP LOCKED, então um
+    worker pula as linhas que outro está reservando. Retorna dicionários
+    com id, chat_id, message e attempts.
+    """
+    now = now or datetime.utcnow()
+    due = due_publications(platform, now, limit)
+    if conn.dialect.name == 'postgresql':
+        due = due.with_for_update(skip_locked=True, of=publications)
+    claimed = conn.execute(
+        publications.update()
+        .where(publications.c.id.in_(due), is_due(now))
+        .values(status='sending', claimed_at=now)
+        .returning(publications.c.id, publications.c.group_id, publications.c.message_content, publications.c.attempts)
+    ).all()
+    if not claimed:
+        return []
+
+    chat_ids = dict(conn.execute(
+        select(groups.c.id, groups.c.group_id).where(groups.c.id.in_({row.group_id for row in claimed}))
+    ).all())
+    return [
+        {
+            'id': row.id,
+            'chat_id': chat_ids.get(row.group_id),
+            'message': row.message_content,
+            'attempts': row.attempts or 0
+        }
+        for row in claimed
+    ]
+
+
+def release_stale_claims(conn, timeout, now=None):
+    """Devolve à fila reservas mais antigas que ``timeout`` segundos
+    (worker que morreu no meio do envio)"""
+    now = now or datetime.utcnow()
+    return conn.execute(
+        publications.update()
+        .where(publications.c.status == 'sending', publications.c.claimed_at < now - timedelta(seconds=timeout))
+        .values(status='pending', claimed_at=None, next_attempt_at=now)
+    ).rowcount
+
+
+class TokenBucket:
+    """Até ``rate`` envios por segundo, com rajadas de até ``burst``"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Reserva a vez de um envio e retorna quantos segundos esperar por ela.
+
+        O saldo pode ficar negativo: cada chamada recebe a próxima vaga da
+        fila, então as threads não disputam o mesmo token.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class PlatformLane:
+    """Envios de uma plataforma: pool de ``concurrency`` threads e token bucket"""
+
+    def __init__(self, platform, adapter, concurrency, rate, burst):
+        self.platform = platform
+        self.adapter = adapter
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f'dispatch-{platform}')
+        self.in_flight = 0
+
+
+class PublicationDispatcher:
+    """Worker de envio das publicações pendentes.
+
+    Uma thread de fundo reserva publicações em lote com uma transição
+    atômica de status (pending -> sending), por plataforma e só até o que
+    cada uma consegue enviar agora. Os envios rodam no pool da plataforma,
+    com concorrência limitada e token bucket, fora das threads do Flask.
+    Os resultados voltam por uma fila e são gravados em lote (executemany)
+    a cada ciclo: ``sent``; ``pending`` com backoff exponencial; ou
+    ``failed`` depois de ``max_attempts`` tentativas ou de um erro
+    definitivo.
+
+    Entre um envio e outro a thread dorme até o próximo horário do
+    ``DueQueue`` (ou ``idle_interval``): sem nada vencido, nenhuma consulta
+    à fila é feita.
+    """
+
+    def __init__(self, idle_interval=60, max_attempts=5, retry_base=30, retry_max=3600, claim_timeout=600):
+        self.idle_interval = idle_interval
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.claim_timeout = claim_timeout
+        # Reservas por plataforma além do que está sendo enviado
+        self.prefetch = 2
+        # Espera após acordar, para gravar vários resultados de uma vez
+        self.batch_window = 0.1
+        self.account_refresh_interval = 30
+        self.limits = DEFAULT_PLATFORM_LIMITS
+        self.adapter_overrides = {}
+        self.platform_settings = {}
+        self.lanes = {}
+        self.due = DueQueue()
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self._accounts = None
+        self._accounts_checked_at = 0.0
+        self._released_at = 0.0
+        self._loaded_at = 0.0
+        # Alguma plataforma pode ter mais publicações vencidas do que reservou
+        self._backlog = True
+        self._results = SimpleQueue()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._cycle_lock = threading.Lock()
+        self._thread = None
+        self._engine = None
+
+    def init_app(self, app):
+        self.idle_interval = app.config.get('DISPATCH_IDLE_INTERVAL', self.idle_interval)
+        self.max_attempts = app.config.get('DISPATCH_MAX_ATTEMPTS', self.max_attempts)
+        self.retry_base = app.config.get('DISPATCH_RETRY_BASE', self.retry_base)
+        self.claim_timeout = app.config.get('DISPATCH_CLAIM_TIMEOUT', self.claim_timeout)
+        configured = app.config.get('DISPATCH_PLATFORM_LIMITS', {})
+        self.limits = {
+            platform: {**DEFAULT_PLATFORM_LIMITS.get(platform, {}), **configured.get(platform, {})}
+            for platform in set(DEFAULT_PLATFORM_LIMITS) | set(configured)
+        }
+        self.adapter_overrides = app.config.get('DISPATCH_ADAPTER_OVERRIDES', {})
+        self.platform_settings = app.config.get('DISPATCH_PLATFORM_SETTINGS', {})
+
+        from src.models import db
+        with app.app_context():
+            self._engine = db.engine
+
+        if app.config.get('DISPATCH_WORKER_ENABLED', False):
+            self.start()
+
+    def start(self):
+        """Inicia a thread de envio neste processo.
+
+        Os limites por plataforma (token bucket e concorrência) valem por
+        processo: rode o worker em um único processo dedicado
+        (``flask content dispatch-worker``), não em cada worker web.
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='publication-dispatch', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def run_forever(self):
+        """Roda o worker em primeiro plano até Ctrl+C (processo dedicado)"""
+        self.start()
+        try:
+            while self._thread.is_alive():
+                self._thread.join(1.0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def wake(self):
+        """Antecipa o próximo ciclo (ex.: logo após criar publicações)"""
+        self._wakeup.set()
+
+    def schedule(self, times):
+        """Avisa o worker dos horários das publicações recém-criadas.
+
+        Sem o worker neste processo não faz nada: o processo do worker acha
+        os horários no banco a cada ``idle_interval``.
+        """
+        if self._thread is None:
+            return
+        self.due.push(times)
+        self._wakeup.set()
+
+    def run_once(self, force=False):
+        """Um ciclo: grava os resultados prontos e reserva novos envios.
+
+        Só consulta a fila se há horário vencido no ``DueQueue``, reservas
+        represadas de um ciclo anterior ou ``force``. Retorna quantas
+        publicações foram reservadas.
+        """
+        with self._cycle_lock:
+            self._write_results()
+
+            now = datetime.utcnow()
+            claimed = []
+            with self._engine.begin() as conn:
+                self._refresh_lanes(conn)
+                if not self.lanes:
+                    # Sem conta configurada nada sai: os horários vencidos
+                    # deixam o heap (senão o worker não dorme) e voltam com
+                    # o próximo due.load, quando houver uma plataforma
+                    self.due.pop_due(now)
+                    return 0
+
+                if time.monotonic() - self._loaded_at > self.idle_interval:
+                    # Horários criados por outros processos (e vencidos sem vaga)
+                    self.due.load(conn)
+                    self._loaded_at = time.monotonic()
+
+                if time.monotonic() - self._released_at > self.claim_timeout / 4:
+                    if release_stale_claims(conn, self.claim_timeout, now):
+                        self._backlog = True
+                    self._released_at = time.monotonic()
+
+                if not (force or self._backlog or self.due.is_due(now)):
+                    return 0
+
+                backlog = False
+                for lane in self.lanes.values():
+                    capacity = lane.concurrency * self.prefetch - lane.in_flight
+                    if lane.adapter is None:
+                        continue
+                    if capacity <= 0:
+                        backlog = True
+                        continue
+                    items = claim_publications(conn, lane.platform, capacity, now)
+                    backlog = backlog or len(items) == capacity
+                    claimed.extend((lane, item) for item in items)
+
+                self._backlog = backlog
+                self.due.pop_due(now)
+
+            # Só depois do commit: uma reserva desfeita nunca chega a ser enviada
+            for lane, item in claimed:
+                lane.in_flight += 1
+                lane.executor.submit(self._send, lane, item)
+            return len(claimed)
+
+    def drain(self, timeout=None):
+        """Envia em primeiro plano tudo que já está vencido (usado pela CLI)"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            claimed = self.run_once(force=True)
+            if not claimed and not any(lane.in_flight for lane in self.lanes.values()):
+                return
+            if deadline and time.monotonic() > deadline:
+                return
+            self._wakeup.wait(1.0)
+            self._wakeup.clear()
+
+    def stats(self):
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'retried': self.retried,
+            'in_flight': {platform: lane.in_flight for platform, lane in self.lanes.items()}
+        }
+
+    def close(self):
+        """Para a thread, espera os envios em andamento e grava os resultados"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        for lane in self.lanes.values():
+            lane.executor.shutdown(wait=True)
+        if self._engine is not None:
+            with self._cycle_lock:
+                self._write_results()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Erro no envio de publicações: {e}")
+            self._wakeup.wait(self._sleep_time())
+            self._wakeup.clear()
+            self._stopped.wait(self.batch_window)
+
+    def _sleep_time(self):
+        """Segundos até o próximo horário conhecido, no máximo ``idle_interval``"""
+        sleep = self.idle_interval
+        next_due = self.due.next_due()
+        if next_due is not None:
+            sleep = min(sleep, (next_due - datetime.utcnow()).total_seconds())
+        return max(sleep, 0)
+
+    def _refresh_lanes(self, conn):
+        if time.monotonic() - self._accounts_checked_at < self.account_refresh_interval:
+            return
+        self._accounts_checked_at = time.monotonic()
+
+        accounts = conn.execute(
+            select(SocialAccount.platform, SocialAccount.api_key).order_by(SocialAccount.id)
+        ).all()
+        accounts = [tuple(account) for account in accounts]
+        if accounts == self._accounts:
+            return
+        self._accounts = accounts
+
+        adapters = build_adapters(accounts, self.platform_settings, self.adapter_overrides)
+        for lane in self.lanes.values():
+            lane.adapter = adapters.pop(lane.platform, None)
+        for platform, adapter in adapters.items():
+            limits = self.limits.get(platform) or {'concurrency': 1, 'rate': 1, 'burst': 1}
+            self.lanes[platform] = PlatformLane(platform, adapter, **limits)
+
+    def _send(self, lane, item):
+        """Executa no pool da plataforma: espera a vez no bucket e envia"""
+        message_id = error = None
+        delay = lane.bucket.reserve()
+        if delay and self._stopped.wait(delay):
+            # Encerrando: a publicação volta para a fila sem contar tentativa
+            self._results.put((lane.platform, item, None, None))
+            return
+
+        try:
+            if item['chat_id'] is None:
+                raise SendError('Grupo não encontrado', retryable=False)
+            message_id = lane.adapter.send(item['chat_id'], item['message'])
+        except SendError as e:
+            error = e
+        except Exception as e:
+            error = SendError(str(e))
+
+        self._results.put((lane.platform, item, message_id, error))
+        self._wakeup.set()
+
+    def _write_results(self):
+        results = []
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except Empty:
+                break
+        if not results:
+            return
+
+        now = datetime.utcnow()
+        rows = []
+        for platform, item, message_id, error in results:
+            lane = self.lanes.get(platform)
+            if lane:
+                lane.in_flight -= 1
+            rows.append(self._result_row(item, message_id, error, now))
+
+        with self._engine.begin() as conn:
+            conn.execute(RESULT_UPDATE, rows)
+            bump(conn, 'publications')
+        resource_versions.expire()
+        self.due.push(row['next_attempt_at'] for row in rows if row['status'] == 'pending')
+
+    def _result_row(self, item, message_id, error, now):
+        row = {
+            'publication_id': item['id'],
+            'status': 'pending',
+            'platform_message_id': None,
+            'error_message': None,
+            'sent_at': None,
+            'attempts': item['attempts'],
+            'next_attempt_at': now,
+            'claimed_at': None
+        }
+        if message_id is None and error is None:
+            return row
+
+        row['attempts'] += 1
+        if error is None:
+            self.sent += 1
+            row.update(status='sent', platform_message_id=message_id, sent_at=now, next_attempt_at=None)
+        elif error.retryable and row['attempts'] < self.max_attempts:
+            self.retried += 1
+            row.update(error_message=str(error), next_attempt_at=now + timedelta(seconds=self._backoff(row['attempts'], error.retry_after)))
+        else:
+            self.failed += 1
+            row.update(status='failed', error_message=str(error), next_attempt_at=None)
+        return row
+
+    def _backoff(self, attempts, retry_after=None):
+        """Espera exponencial (com jitter) antes da próxima tentativa"""
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+        return max(delay, retry_after or 0)
+
+
+dispatcher = PublicationDispatcher()
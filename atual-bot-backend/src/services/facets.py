@@ -0,0 +1,181 @@
+import threading
+import time
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from src.models.content import JobPost
+from src.services.cache import LRUCache
+
+# Facetas da tela de vagas, na ordem das colunas do índice ix_job_posts_facets
+FACET_COLUMNS = ('uf', 'job_type', 'work_mode', 'experience_level', 'is_published')
+
+# Filtros de /jobs que são colunas das facetas: respondidos pelo histograma
+HISTOGRAM_FILTERS = ('uf', 'job_type', 'work_mode', 'experience_level')
+
+# Parâmetros que mudam a página, mas não o conjunto de vagas
+IGNORED_ARGS = {'page', 'per_page', 'after', 'include_total', 'fields'}
+
+
+def _combo(values):
+    return tuple(values.get(column, False if column == 'is_published' else None) for column in FACET_COLUMNS)
+
+
+def summarize(rows):
+    """Soma [(combinação das facetas, total)] por faceta"""
+    total = 0
+    facets = {column: {} for column in FACET_COLUMNS}
+    for combo, count in rows:
+        total += count
+        for column, value in zip(FACET_COLUMNS, combo):
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = 'true' if value else 'false'
+            facets[column][value] = facets[column].get(value, 0) + count
+
+    return {'total': total, 'facets': facets}
+
+
+def grouped_counts(query):
+    """Total de ``query`` por combinação das facetas, em uma única consulta.
+
+    São poucas centenas de combinações, lidas só do índice de cobertura.
+    """
+    columns = [getattr(JobPost, column) for column in FACET_COLUMNS]
+    rows = query.order_by(None).with_entities(*columns, func.count()).group_by(*columns)
+    return {tuple(row[:-1]): row[-1] for row in rows}
+
+
+class JobFacetCache:
+    """Contagens das facetas de vagas.
+
+    Sem filtros, ou só com filtros que são colunas das facetas, a resposta
+    sai de um histograma em memória (total por combinação das facetas),
+    carregado com um GROUP BY e mantido pelos eventos do ORM e pelas
+    inserções em lote, então não precisa ser recalculado a cada vaga nova.
+    Outros filtros (busca, salário, local) usam o GROUP BY da consulta
+    filtrada, em um cache limpo a cada escrita em vagas. O TTL cobre
+    escritas de outros processos.
+    """
+
+    def __init__(self, max_size=256, ttl=60):
+        self.ttl = ttl
+        self._cache = LRUCache(max_size, ttl)
+        self._histogram = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('JOB_FACETS_CACHE_TTL', 60)
+        self._cache = LRUCache(app.config.get('JOB_FACETS_CACHE_MAX_SIZE', 256), self.ttl)
+
+    def counts(self, args, build_query):
+        filters = {name: args.get(name) for name in args if name not in IGNORED_ARGS and args.get(name)}
+        if set(filters) <= set(HISTOGRAM_FILTERS):
+            return self._from_histogram(filters)
+
+        key = tuple(sorted(filters.items()))
+        result = self._cache.get(key)
+        if result is None:
+            generation = self._generation
+            result = summarize(grouped_counts(build_query(args)).items())
+            # Não guarda um resultado calculado antes de uma escrita
+            with self._lock:
+                if generation == self._generation:
+                    self._cache.set(key, result)
+        return result
+
+    def _from_histogram(self, filters):
+        histogram = self._histogram
+        if histogram is None or time.monotonic() - self._loaded_at > self.ttl:
+            generation = self._generation
+            histogram = grouped_counts(JobPost.query)
+            with self._lock:
+                if generation == self._generation:
+                    self._histogram = histogram
+                    self._loaded_at = time.monotonic()
+
+        wanted = [
+            (FACET_COLUMNS.index(name), value.upper() if name == 'uf' else value)
+            for name, value in filters.items()
+        ]
+        return summarize(
+            (combo, count) for combo, count in histogram.items()
+            if all(combo[index] == value for index, value in wanted)
+        )
+
+    def apply_changes(self, deltas, reload=False):
+        """Aplica [(combinação, +1/-1)] ao histograma e limpa o cache filtrado"""
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+            if reload:
+                self._histogram = None
+            elif self._histogram is not None:
+                # Cópia: leitores em andamento continuam com o dicionário antigo
+                histogram = dict(self._histogram)
+                for combo, delta in deltas:
+                    count = histogram.get(combo, 0) + delta
+                    if count > 0:
+                        histogram[combo] = count
+                    else:
+                        histogram.pop(combo, None)
+                self._histogram = histogram
+
+    def record_inserts(self, rows):
+        """Conta as linhas inseridas em lote (fora dos eventos do ORM)"""
+        self.apply_changes([(_combo(row), 1) for row in rows])
+
+    def stats(self):
+        return self._cache.stats()
+
+
+job_facets = JobFacetCache()
+
+
+def _previous_combo(obj):
+    """Combinação gravada antes do flush, ou None se não der para saber"""
+    state = inspect(obj)
+    values = {}
+    for column in FACET_COLUMNS:
+        history = state.attrs[column].history
+        if history.deleted:
+            values[column] = history.deleted[0]
+        elif history.added:
+            # Valor antigo não carregado: só recarregando o histograma
+            return None
+        else:
+            values[column] = getattr(obj, column)
+    return _combo(values)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_job_changes(session, flush_context):
+    changes = session.info.setdefault('job_facet_changes', {'deltas': [], 'reload': False})
+    for obj in session.new:
+        if isinstance(obj, JobPost):
+            changes['deltas'].append((_combo({column: getattr(obj, column) for column in FACET_COLUMNS}), 1))
+    for obj in list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, JobPost):
+            continue
+        previous = _previous_combo(obj)
+        if previous is None:
+            changes['reload'] = True
+            continue
+        changes['deltas'].append((previous, -1))
+        if obj not in session.deleted:
+            changes['deltas'].append((_combo({column: getattr(obj, column) for column in FACET_COLUMNS}), 1))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_job_changes(session):
+    changes = session.info.pop('job_facet_changes', None)
+    if changes and (changes['deltas'] or changes['reload']):
+        job_facets.apply_changes(changes['deltas'], reload=changes['reload'])
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_job_changes(session):
+    session.info.pop('job_facet_changes', None)
@@ -0,0 +1,116 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, request
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models import db
+from src.models.idempotency import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 200
+
+
+def request_fingerprint():
+    """SHA-256 do corpo da requisição (JSON normalizado, se for JSON)"""
+    data = request.get_json(silent=True)
+    if data is None:
+        body = request.get_data()
+    else:
+        body = json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(body).hexdigest()
+
+
+class IdempotencyStore:
+    """Respostas guardadas por (endpoint, Idempotency-Key).
+
+    A chave primária é o próprio par, então conferir uma chave é uma busca
+    no índice da tabela. Respostas ficam guardadas por ``ttl``; as vencidas
+    são apagadas (pelo índice de created_at) a cada resposta nova.
+    """
+
+    def __init__(self, ttl=timedelta(hours=24)):
+        self.ttl = ttl
+
+    def init_app(self, app):
+        self.ttl = timedelta(seconds=app.config.get('IDEMPOTENCY_KEY_TTL', self.ttl.total_seconds()))
+
+    def find(self, scope, key):
+        stored = db.session.get(IdempotencyKey, (scope, key))
+        if stored is None or stored.created_at < datetime.utcnow() - self.ttl:
+            return None
+        return stored
+
+    def save(self, scope, key, request_hash, response):
+        """Guarda a resposta; retorna False se outra requisição com a mesma
+        chave guardou a sua antes"""
+        table = IdempotencyKey.__table__
+        now = datetime.utcnow()
+        if db.engine.dialect.name == 'postgresql':
+            stmt = postgresql.insert(table)
+        else:
+            stmt = sqlite.insert(table)
+        stmt = stmt.values(
+            scope=scope,
+            key=key,
+            request_hash=request_hash,
+            status_code=response.status_code,
+            response_body=response.get_data(as_text=True),
+            created_at=now
+        ).on_conflict_do_nothing()
+
+        db.session.execute(table.delete().where(table.c.created_at < now - self.ttl))
+        saved = db.session.execute(stmt).rowcount == 1
+        db.session.commit()
+        return saved
+
+
+idempotency_keys = IdempotencyStore()
+
+
+def _replay(stored, request_hash):
+    if stored.request_hash != request_hash:
+        return jsonify({
+            'success': False,
+            'error': f'{IDEMPOTENCY_HEADER} já usada em uma requisição diferente'
+        }), 422
+
+    response = current_app.response_class(stored.response_body, status=stored.status_code, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(scope):
+    """Repete a resposta original quando a requisição volta com o mesmo
+    Idempotency-Key, sem executar a view de novo.
+
+    Só respostas 2xx são guardadas: depois de um erro o cliente pode tentar
+    de novo com a mesma chave. Requisições simultâneas com a mesma chave
+    chegam a executar a view; a que guardar a resposta primeiro vale para
+    as outras.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return view(*args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return jsonify({
+                    'success': False,
+                    'error': f'{IDEMPOTENCY_HEADER} deve ter no máximo {MAX_KEY_LENGTH} caracteres'
+                }), 400
+
+            request_hash = request_fingerprint()
+            stored = idempotency_keys.find(scope, key)
+            if stored is not None:
+                return _replay(stored, request_hash)
+
+            response = make_response(view(*args, **kwargs))
+            if 200 <= response.status_code < 300 and not idempotency_keys.save(scope, key, request_hash, response):
+                return _replay(idempotency_keys.find(scope, key), request_hash)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,100 @@
+import hashlib
+import os
+
+from flask import url_for
+from sqlalchemy import event
+
+from src.models.config import BotConfig
+from src.services.cache import LRUCache
+
+ADSENSE_KEYS = ('adsense_publisher_id', 'adsense_slot_id')
+
+ASSET_TYPES = {
+    'interstitial.css': 'text/css; charset=utf-8',
+    'interstitial.js': 'application/javascript; charset=utf-8'
+}
+
+
+class InterstitialRenderer:
+    """Renderiza a página intermediária do AdSense no /track.
+
+    CSS e JS ficam em arquivos estáticos versionados pelo hash do conteúdo
+    (cacheáveis por um ano); o template por link é compilado uma única vez
+    e as páginas prontas ficam memorizadas por (tracking_id, publisher, slot).
+    """
+
+    def __init__(self, max_size=2048):
+        self._pages = LRUCache(max_size=max_size)
+        self._previews = LRUCache(max_size=max_size)
+        self._template = None
+        self._preview_template = None
+        self._assets = {}
+
+    def init_app(self, app):
+        self._pages.max_size = app.config.get('INTERSTITIAL_CACHE_MAX_SIZE', self._pages.max_size)
+        self._previews.max_size = self._pages.max_size
+
+        assets_dir = os.path.join(app.static_folder, 'track')
+        for name, mimetype in ASSET_TYPES.items():
+            with open(os.path.join(assets_dir, name), 'rb') as f:
+                body = f.read()
+            self._assets[name] = (body, mimetype, hashlib.sha1(body).hexdigest()[:12])
+
+        self._template = app.jinja_env.get_template('interstitial.html')
+        self._preview_template = app.jinja_env.get_template('preview.html')
+
+    def asset(self, name):
+        """Retorna (conteúdo, mimetype, versão) de um asset ou None"""
+        return self._assets.get(name)
+
+    def asset_url(self, name):
+        return url_for('tracking.interstitial_asset', name=name, v=self._assets[name][2])
+
+    def render(self, link, publisher_id, slot_id):
+        """Retorna (html, etag) da página do link, memorizada"""
+        key = (link.tracking_id, publisher_id, slot_id)
+        cached = self._pages.get(key)
+        # O link faz parte do valor: título ou destino alterados geram nova página
+        if cached is not None and cached[0] == link:
+            return cached[1], cached[2]
+
+        html = self._template.render(
+            title=link.title,
+            destination_url=link.original_url,
+            publisher_id=publisher_id,
+            slot_id=slot_id,
+            css_url=self.asset_url('interstitial.css'),
+            js_url=self.asset_url('interstitial.js')
+        ).encode('utf-8')
+        etag = hashlib.sha1(html).hexdigest()
+
+        self._pages.set(key, (link, html, etag))
+        return html, etag
+
+    def preview(self, link, url):
+        """Retorna o HTML mínimo com OpenGraph servido aos robôs de prévia"""
+        key = (link.tracking_id, url)
+        cached = self._previews.get(key)
+        if cached is not None and cached[0] == link:
+            return cached[1]
+
+        html = self._preview_template.render(title=link.title, url=url).encode('utf-8')
+        self._previews.set(key, (link, html))
+        return html
+
+    def clear(self):
+        self._pages.clear()
+
+    def stats(self):
+        return self._pages.stats()
+
+
+interstitial = InterstitialRenderer()
+
+
+@event.listens_for(BotConfig, 'after_insert')
+@event.listens_for(BotConfig, 'after_update')
+@event.listens_for(BotConfig, 'after_delete')
+def _adsense_config_changed(mapper, connection, target):
+    if target.key in ADSENSE_KEYS:
+        interstitial.clear()
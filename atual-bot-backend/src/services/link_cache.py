@@ -0,0 +1,182 @@
+import threading
+from collections import namedtuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models.content import db, JobPost, NewsPost, ClickTracking
+from src.services.cache import LRUCache
+from src.services.tracking_links import decode_code
+
+# Tudo que o redirecionamento precisa saber sobre um link, sem tocar no banco
+ResolvedLink = namedtuple('ResolvedLink', [
+    'id', 'tracking_id', 'original_url', 'job_post_id', 'news_post_id',
+    'group_id', 'content_type', 'title'
+])
+
+
+class LinkCache:
+    """Cache de resolução tracking_id -> ResolvedLink para o /track.
+
+    Mantém índices reversos conteúdo -> links e id do link -> tracking_ids
+    para invalidar as entradas quando a vaga ou notícia vinculada, ou o
+    próprio link, é editado ou removido.
+    """
+
+    def __init__(self, max_size=2048, ttl=300):
+        self._cache = LRUCache(max_size=max_size, ttl=ttl, on_evict=self._forget)
+        self._by_content = {}
+        self._by_link = {}
+        self._keys_of = {}
+        self._lock = threading.RLock()
+
+    def init_app(self, app):
+        self._cache.max_size = app.config.get('LINK_CACHE_MAX_SIZE', self._cache.max_size)
+        self._cache.ttl = app.config.get('LINK_CACHE_TTL', self._cache.ttl)
+
+    def resolve(self, tracking_id):
+        """Retorna o ResolvedLink do tracking_id ou None se não existir"""
+        link = self._cache.get(tracking_id)
+        if link is not None:
+            return link
+
+        link = _load_link(tracking_id)
+        if link is not None:
+            with self._lock:
+                self._cache.set(tracking_id, link)
+                content_key = _content_key(link.job_post_id, link.news_post_id)
+                self._keys_of[tracking_id] = (link.id, content_key)
+                self._by_link.setdefault(link.id, set()).add(tracking_id)
+                if content_key:
+                    self._by_content.setdefault(content_key, set()).add(tracking_id)
+        return link
+
+    def invalidate_links(self, link_ids):
+        """Remove as entradas dos links (pelo id, qualquer que seja o código usado)"""
+        with self._lock:
+            for link_id in link_ids:
+                for tracking_id in list(self._by_link.get(link_id, ())):
+                    self._cache.delete(tracking_id)
+                    self._forget(tracking_id)
+
+    def invalidate_content(self, content_type, content_id):
+        with self._lock:
+            for tracking_id in list(self._by_content.get((content_type, content_id), ())):
+                self._cache.delete(tracking_id)
+                self._forget(tracking_id)
+
+    def invalidate_on_commit(self, session, links=(), contents=()):
+        """Agenda a invalidação para depois do commit de ``session``.
+
+        Para escritas Core (sem o ORM), que não passam pelos eventos de
+        flush: ``links`` são ids de click_tracking e ``contents`` pares
+        (tipo, id) de vagas ou notícias.
+        """
+        changes = session.info.setdefault('link_cache_changes', set())
+        changes.update(('link', link_id) for link_id in links)
+        changes.update(contents)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._by_content.clear()
+            self._by_link.clear()
+            self._keys_of.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+    def _forget(self, tracking_id):
+        with self._lock:
+            link_id, content_key = self._keys_of.pop(tracking_id, (None, None))
+            for index, key in ((self._by_link, link_id), (self._by_content, content_key)):
+                tracking_ids = index.get(key)
+                if tracking_ids is not None:
+                    tracking_ids.discard(tracking_id)
+                    if not tracking_ids:
+                        del index[key]
+
+
+def _content_key(job_post_id, news_post_id):
+    if job_post_id:
+        return ('job', job_post_id)
+    if news_post_id:
+        return ('news', news_post_id)
+    return None
+
+
+def _load_link(tracking_id):
+    query = db.session.query(
+        ClickTracking.id,
+        ClickTracking.tracking_id,
+        ClickTracking.original_url,
+        ClickTracking.job_post_id,
+        ClickTracking.news_post_id,
+        ClickTracking.group_id,
+        JobPost.title,
+        NewsPost.title
+    ).outerjoin(
+        JobPost, JobPost.id == ClickTracking.job_post_id
+    ).outerjoin(
+        NewsPost, NewsPost.id == ClickTracking.news_post_id
+    )
+
+    # Códigos curtos vão pela chave primária; UUIDs antigos pelo índice da string
+    link_id = decode_code(tracking_id)
+    if link_id is not None:
+        row = query.filter(ClickTracking.id == link_id).first()
+    else:
+        row = query.filter(ClickTracking.tracking_id == tracking_id).first()
+
+    if row is None:
+        return None
+
+    link_id, tracking_id, original_url, job_post_id, news_post_id, group_id, job_title, news_title = row
+    if job_title is not None:
+        content_type, title = 'job', f"Vaga: {job_title}"
+    elif news_title is not None:
+        content_type, title = 'news', f"Notícia: {news_title}"
+    else:
+        content_type, title = None, "Conteúdo"
+
+    return ResolvedLink(
+        id=link_id,
+        tracking_id=tracking_id,
+        original_url=original_url,
+        job_post_id=job_post_id,
+        news_post_id=news_post_id,
+        group_id=group_id,
+        content_type=content_type,
+        title=title
+    )
+
+
+link_cache = LinkCache()
+
+
+# Invalidação: coleta o que mudou no flush e aplica só após o commit, para
+# que uma leitura concorrente não recoloque no cache um valor não commitado.
+@event.listens_for(Session, 'after_flush')
+def _collect_link_changes(session, flush_context):
+    changed = session.info.setdefault('link_cache_changes', set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, JobPost) and obj.id is not None:
+            changed.add(('job', obj.id))
+        elif isinstance(obj, NewsPost) and obj.id is not None:
+            changed.add(('news', obj.id))
+        elif isinstance(obj, ClickTracking) and obj.id is not None:
+            changed.add(('link', obj.id))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_link_changes(session):
+    for kind, key in session.info.pop('link_cache_changes', ()):
+        if kind == 'link':
+            link_cache.invalidate_links([key])
+        else:
+            link_cache.invalidate_content(kind, key)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_link_changes(session):
+    session.info.pop('link_cache_changes', None)
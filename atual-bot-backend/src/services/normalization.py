@@ -0,0 +1,156 @@
+import re
+import threading
+
+from src.models.config import BotConfig
+from src.services.search import fold
+
+# Número no formato brasileiro: "2.500,00", "3000", "2,5"
+NUMBER_PATTERN = re.compile(r'(\d{1,3}(?:\.\d{3})+(?:,\d+)?|\d+(?:,\d+)?)\s*(mil\b|k\b)?')
+
+# Valores menores que isso sem "mil"/"k" são horas, dias, benefícios...
+MIN_SALARY = 100.0
+
+LOCATION_SEPARATORS = re.compile(r'\s*(?:[-/,|()]|\s–\s)\s*')
+
+# Os mesmos locais se repetem muito; cada texto é analisado uma vez
+MAX_CACHED_LOCATIONS = 10000
+
+# Partes do local que não são cidade
+NOT_A_CITY = {'remoto', 'home office', 'brasil', 'hibrido', 'presencial', 'todo o brasil', 'qualquer lugar'}
+
+
+# Entre dois números de uma faixa: "3 a 5 mil", "3 - 5k", "entre 3 e 5 mil"
+RANGE_SEPARATOR = re.compile(r'\s*(?:a|e|-|ate)\s*(?:r\$\s*)?')
+
+
+def parse_number(digits, multiplier):
+    value = float(digits.replace('.', '').replace(',', '.'))
+    if multiplier:
+        return value * 1000
+    return value if value >= MIN_SALARY else None
+
+
+def parse_salary(text):
+    """Converte um salário em texto em (mínimo, máximo).
+
+    "R$ 2.500,00 a R$ 3.000" -> (2500.0, 3000.0); "até R$ 5 mil" ->
+    (None, 5000.0); "a partir de 3k" -> (3000.0, None); "R$ 4.000" ->
+    (4000.0, 4000.0); "3 a 5 mil" -> (3000.0, 5000.0); "a combinar" ->
+    (None, None).
+    """
+    folded = fold(text)
+    matches = list(NUMBER_PATTERN.finditer(folded))
+    values = []
+    for index, match in enumerate(matches):
+        digits, multiplier = match.groups()
+        following = matches[index + 1] if index + 1 < len(matches) else None
+        value = parse_number(digits, multiplier)
+        # Em uma faixa o "mil"/"k" do segundo número vale também para o primeiro
+        if value is None and following and following.group(2) and RANGE_SEPARATOR.fullmatch(folded[match.end():following.start()]):
+            value = parse_number(digits, following.group(2))
+        if value:
+            values.append(value)
+    if not values:
+        return None, None
+
+    low, high = min(values), max(values)
+    if len(values) == 1:
+        if re.search(r'\bate\b', folded):
+            return None, high
+        if re.search(r'\b(a partir de|acima de|mais de|minimo)\b', folded):
+            return low, None
+    return low, high
+
+
+class LocationParser:
+    """Separa "Cidade - UF" em (cidade, UF) com os estados de ``estados_brasil``"""
+
+    def __init__(self, states):
+        self.states = tuple(states)
+        self.codes = set()
+        self.by_name = {}
+        for state in states:
+            code, _, name = state.partition(' - ')
+            code = code.strip().upper()
+            self.codes.add(code)
+            self.by_name[fold(name.strip())] = code
+        self._cache = {}
+
+    def parse(self, text):
+        if not text:
+            return None, None
+        result = self._cache.get(text)
+        if result is None:
+            if len(self._cache) >= MAX_CACHED_LOCATIONS:
+                self._cache.clear()
+            result = self._cache[text] = self._parse(text)
+        return result
+
+    def _parse(self, text):
+        parts = [part for part in LOCATION_SEPARATORS.split(text.strip()) if part]
+
+        uf = None
+        uf_index = None
+        # O estado costuma vir no fim: "São Paulo - SP", "Curitiba/PR"
+        for index in range(len(parts) - 1, -1, -1):
+            part = parts[index]
+            code = part.upper() if len(part) == 2 and part.upper() in self.codes else self.by_name.get(fold(part))
+            if code:
+                uf, uf_index = code, index
+                break
+
+        city = None
+        for index, part in enumerate(parts):
+            if index == uf_index or fold(part) in NOT_A_CITY or part.upper() in self.codes:
+                continue
+            city = ' '.join(part.split())
+            break
+        return city, uf
+
+
+_parser = None
+_parser_lock = threading.Lock()
+
+
+def location_parser():
+    """Parser dos estados configurados, refeito quando a configuração muda"""
+    global _parser
+    states = tuple(BotConfig.get_config('estados_brasil') or ())
+    with _parser_lock:
+        if _parser is None or _parser.states != states:
+            _parser = LocationParser(states)
+        return _parser
+
+
+def normalize_job_rows(rows):
+    """Preenche city, uf, salary_min e salary_max de uma lista de linhas.
+
+    Cada texto distinto de local e salário é analisado uma única vez por
+    lote; valores de salário informados pelo cliente são mantidos.
+    """
+    parser = location_parser()
+    salaries = {}
+    for row in rows:
+        row['city'], row['uf'] = parser.parse(row.get('location'))
+
+        salary = row.get('salary')
+        if salary and (row.get('salary_min') is None or row.get('salary_max') is None):
+            if salary not in salaries:
+                salaries[salary] = parse_salary(salary)
+            low, high = salaries[salary]
+            if row.get('salary_min') is None:
+                row['salary_min'] = low
+            if row.get('salary_max') is None:
+                row['salary_max'] = high
+    return rows
+
+
+NORMALIZED_COLUMNS = ('location', 'salary', 'salary_min', 'salary_max', 'city', 'uf')
+
+
+def normalize_job(job):
+    """Aplica ``normalize_job_rows`` a um JobPost"""
+    row = normalize_job_rows([{column: getattr(job, column) for column in NORMALIZED_COLUMNS}])[0]
+    for column in NORMALIZED_COLUMNS:
+        setattr(job, column, row[column])
+    return job
@@ -0,0 +1,124 @@
+import base64
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import and_, or_
+
+
+# Prefixo dos cursores de buscas ordenadas por relevância
+RANK_PREFIX = 'rank:'
+
+
+def encode_cursor(sort_key, item_id):
+    """Gera o token opaco ``after`` a partir de (created_at, id) ou (rank, id)"""
+    if isinstance(sort_key, datetime):
+        key = sort_key.isoformat()
+    else:
+        key = RANK_PREFIX + repr(float(sort_key))
+    raw = f"{key}|{item_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Lê um token ``after`` como (created_at ou rank, id); levanta ValueError se for inválido"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        key, item_id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|')
+        if key.startswith(RANK_PREFIX):
+            return float(key[len(RANK_PREFIX):]), int(item_id)
+        return datetime.fromisoformat(key), int(item_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Cursor de paginação inválido') from e
+
+
+def search_rank(query):
+    """Expressão de relevância deixada em ``query`` pela busca textual (ou None)"""
+    return query.get_execution_options().get('search_rank')
+
+
+def keyset_filter(query, model, after=None):
+    """Ordena por (created_at, id) decrescentes e aplica o cursor ``after``.
+
+    Em buscas com ``q`` a ordem é a da relevância, (rank, id), e o cursor
+    guarda o rank do último item em vez do created_at.
+    """
+    rank = search_rank(query)
+    if rank is None:
+        sort_key, newer_first = model.created_at, True
+        query = query.order_by(None).order_by(model.created_at.desc(), model.id.desc())
+    else:
+        sort_key, newer_first = rank, False
+        query = query.order_by(None).order_by(rank, model.id.desc())
+
+    if after:
+        value, item_id = decode_cursor(after)
+        if isinstance(value, datetime) != newer_first:
+            raise ValueError('Cursor de paginação inválido para esta busca')
+        beyond = sort_key < value if newer_first else sort_key > value
+        query = query.filter(or_(beyond, and_(sort_key == value, model.id < item_id)))
+    return query
+
+
+def keyset_page(query, model, after=None, per_page=20, with_total=False):
+    """Página ordenada por (created_at, id) decrescentes a partir do cursor.
+
+    O custo não depende da profundidade: o cursor vira um filtro sobre
+    (created_at, id) em vez de um OFFSET, e o COUNT(*) só roda quando
+    ``with_total`` é pedido. Buscas com ``q`` seguem a ordem de relevância
+    (ver ``keyset_filter``); como o BM25 depende das estatísticas do índice,
+    vagas inseridas entre duas páginas podem deslocar um pouco essa ordem.
+    """
+    if with_total:
+        total = query.order_by(None).count()
+
+    rank = search_rank(query)
+    query = keyset_filter(query, model, after)
+    if rank is None:
+        items = query.limit(per_page + 1).all()
+        keys = [item.created_at for item in items]
+    else:
+        rows = query.add_columns(rank).limit(per_page + 1).all()
+        items = [item for item, _ in rows]
+        keys = [score for _, score in rows]
+    has_next = len(items) > per_page
+    items = items[:per_page]
+
+    pagination = {
+        'per_page': per_page,
+        'has_next': has_next,
+        'next_cursor': encode_cursor(keys[per_page - 1], items[-1].id) if has_next else None
+    }
+    if with_total:
+        pagination['total'] = total
+    return items, pagination
+
+
+def page_size(args, default=20):
+    """``per_page`` da query string, limitado a ``MAX_PER_PAGE``"""
+    per_page = args.get('per_page', default, type=int)
+    return max(1, min(per_page, current_app.config.get('MAX_PER_PAGE', 100)))
+
+
+def paginate_request(query, model, args):
+    """Pagina conforme a query string: cursor (``after``) ou ``page``/``per_page``.
+
+    O modo cursor é ativado pela presença de ``after`` (vazio na primeira
+    página); ``include_total=true`` pede o total nesse modo. Listagens
+    maiores que ``MAX_PER_PAGE`` ficam para os endpoints de exportação.
+    """
+    per_page = page_size(args)
+
+    if 'after' in args:
+        with_total = args.get('include_total', '').lower() in ('1', 'true')
+        return keyset_page(query, model, args.get('after'), per_page, with_total)
+
+    page = args.get('page', 1, type=int)
+    result = query.paginate(page=page, per_page=per_page, error_out=False)
+    return result.items, {
+        'page': page,
+        'per_page': per_page,
+        'total': result.total,
+        'pages': result.pages,
+        'has_next': result.has_next,
+        'has_prev': result.has_prev
+    }
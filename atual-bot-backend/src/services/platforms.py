@@ -0,0 +1,194 @@
+import itertools
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+# Tempo máximo de uma chamada HTTP às plataformas (segundos)
+HTTP_TIMEOUT = 15
+
+TELEGRAM_API_URL = 'https://api.telegram.org'
+FACEBOOK_GRAPH_URL = 'https://graph.facebook.com/v19.0'
+
+
+class SendError(Exception):
+    """Falha no envio de uma mensagem.
+
+    ``retryable`` diz se vale tentar de novo (limite da plataforma, erro de
+    rede, 5xx); ``retry_after`` é a espera pedida pela plataforma, se houver.
+    """
+
+    def __init__(self, message, retryable=True, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def _request(url, payload=None, headers=None, form=False):
+    """POST (ou GET sem ``payload``) e retorna o corpo JSON decodificado"""
+    data = None
+    headers = dict(headers or {})
+    if payload is not None:
+        if form:
+            data = urllib.parse.urlencode(payload).encode('utf-8')
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        else:
+            data = json.dumps(payload).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data, headers=headers), timeout=HTTP_TIMEOUT) as response:
+            return json.loads(response.read() or b'{}')
+    except urllib.error.HTTPError as e:
+        try:
+            body = json.loads(e.read() or b'{}')
+        except ValueError:
+            body = {}
+        retry_after = (body.get('parameters') or {}).get('retry_after') or e.headers.get('Retry-After')
+        raise SendError(
+            _error_text(body) or f'HTTP {e.code}',
+            retryable=e.code == 429 or e.code >= 500,
+            retry_after=float(retry_after) if retry_after else None
+        )
+    except (urllib.error.URLError, TimeoutError, ValueError) as e:
+        raise SendError(f'Erro de comunicação: {e}')
+
+
+def _error_text(body):
+    error = body.get('error')
+    if isinstance(error, dict):
+        return error.get('message')
+    return body.get('description') or error
+
+
+class PlatformAdapter:
+    """Envia mensagens para os grupos de uma plataforma.
+
+    ``send`` retorna o id da mensagem na plataforma ou levanta SendError.
+    É chamado de várias threads ao mesmo tempo.
+    """
+
+    platform = None
+
+    def __init__(self, api_key=None, settings=None):
+        self.api_key = api_key
+        self.settings = settings or {}
+
+    @classmethod
+    def configured(cls, api_key, settings):
+        """Se há credencial para enviar; sem ela a plataforma fica sem adaptador"""
+        return bool(api_key)
+
+    def send(self, chat_id, message):
+        raise NotImplementedError
+
+
+class TelegramAdapter(PlatformAdapter):
+    """Bot API do Telegram (``api_key`` é o token do bot)"""
+
+    platform = 'telegram'
+
+    def send(self, chat_id, message):
+        body = _request(f'{TELEGRAM_API_URL}/bot{self.api_key}/sendMessage', {
+            'chat_id': chat_id,
+            'text': message,
+            # A mensagem vem com o texto escapado para HTML (ver PLATFORM_MARKUP)
+            'parse_mode': 'HTML'
+        })
+        return str(body['result']['message_id'])
+
+
+class FacebookAdapter(PlatformAdapter):
+    """Graph API: publica no feed do grupo/página (``api_key`` é o access token)"""
+
+    platform = 'facebook'
+
+    def send(self, chat_id, message):
+        body = _request(
+            f'{FACEBOOK_GRAPH_URL}/{urllib.parse.quote(chat_id)}/feed',
+            {'message': message, 'access_token': self.api_key},
+            form=True
+        )
+        return str(body['id'])
+
+
+class WhatsAppAdapter(PlatformAdapter):
+    """Envio para grupos do WhatsApp através de um gateway HTTP.
+
+    A API oficial não publica em grupos; o gateway (``gateway_url``) recebe
+    ``{"chat_id", "text"}`` em ``/messages`` e retorna ``{"id"}``.
+    """
+
+    platform = 'whatsapp'
+
+    @classmethod
+    def configured(cls, api_key, settings):
+        # A chave é opcional (depende do gateway); o endereço, não
+        return bool((settings or {}).get('gateway_url'))
+
+    def send(self, chat_id, message):
+        gateway_url = self.settings.get('gateway_url')
+        if not gateway_url:
+            raise SendError('Gateway do WhatsApp não configurado', retryable=False)
+
+        headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+        body = _request(f"{gateway_url.rstrip('/')}/messages", {'chat_id': chat_id, 'text': message}, headers)
+        return str(body['id'])
+
+
+class FakeAdapter(PlatformAdapter):
+    """Adaptador local para testes e desenvolvimento: não sai da máquina.
+
+    Guarda as mensagens em ``sent``; ``failures`` mapeia chat_id para a
+    lista de SendError a levantar nas próximas tentativas, e ``delay``
+    simula a latência da plataforma.
+    """
+
+    def __init__(self, platform=None, delay=0.0):
+        super().__init__()
+        self.platform = platform
+        self.delay = delay
+        self.sent = []
+        self.failures = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def send(self, chat_id, message):
+        if self.delay:
+            time.sleep(self.delay)
+        with self._lock:
+            errors = self.failures.get(chat_id)
+            if errors:
+                raise errors.pop(0)
+            self.sent.append((chat_id, message))
+            return f'fake-{next(self._ids)}'
+
+
+ADAPTERS = {
+    'telegram': TelegramAdapter,
+    'facebook': FacebookAdapter,
+    'whatsapp': WhatsAppAdapter
+}
+
+
+def build_adapters(accounts, settings=None, overrides=None):
+    """Adaptadores por plataforma a partir das contas sociais.
+
+    ``accounts`` são pares (plataforma, api_key); plataformas sem conta
+    configurada (ver ``PlatformAdapter.configured``) ficam sem adaptador e
+    suas publicações esperam na fila.
+    ``overrides`` troca o adaptador de uma plataforma (ex.: ``{'telegram':
+    'fake'}``) e ``settings`` traz opções por plataforma.
+    """
+    settings = settings or {}
+    overrides = overrides or {}
+    adapters = {}
+    for platform, api_key in accounts:
+        if platform in ADAPTERS and platform not in adapters and ADAPTERS[platform].configured(api_key, settings.get(platform)):
+            adapters[platform] = ADAPTERS[platform](api_key, settings.get(platform))
+
+    for platform, name in overrides.items():
+        adapters[platform] = FakeAdapter(platform) if name == 'fake' else ADAPTERS[name](None, settings.get(platform))
+    return adapters
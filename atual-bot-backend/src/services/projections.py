@@ -0,0 +1,28 @@
+from sqlalchemy.orm import load_only
+
+
+def requested_fields(model, value):
+    """Interpreta ``fields=`` da query string.
+
+    Vazio ou ``summary`` usa ``model.SUMMARY_FIELDS``; ``all`` traz todas as
+    colunas; senão, uma lista separada por vírgulas. Levanta ValueError para
+    campos desconhecidos.
+    """
+    value = (value or 'summary').strip()
+    if value == 'summary':
+        return model.SUMMARY_FIELDS
+    if value == 'all':
+        return model.FIELDS
+
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in model.FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"Campos inválidos: {', '.join(unknown) or value}. Disponíveis: {', '.join(model.FIELDS)}")
+    return fields
+
+
+def project(query, model, fields):
+    """Carrega do banco só as colunas de ``fields`` (mais id e created_at,
+    usados na ordenação e no cursor de paginação)"""
+    columns = dict.fromkeys(('id', 'created_at') + tuple(fields))
+    return query.options(load_only(*(getattr(model, column) for column in columns)))
@@ -0,0 +1,305 @@
+import html
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import load_only
+
+from src.models.config import Group
+from src.models.content import db, ClickTracking, Publication
+from src.services.link_cache import link_cache
+from src.services.resource_versions import bump
+from src.services.scheduling import plan_send_times
+from src.services.tracking_links import allocate_ids, encode_code, tracking_path
+
+
+def star_bold(text):
+    return f"*{text}*"
+
+
+def no_markup(text):
+    return text
+
+
+def html_bold(text):
+    return f"<b>{text}</b>"
+
+
+def html_text(text):
+    return html.escape(text, quote=False)
+
+
+# Marcação de cada plataforma: (negrito, escape do texto vindo das fontes).
+# O Telegram recebe parse_mode HTML: no Markdown não há como escapar um
+# "_" ou "*" de um título dentro do negrito, e a mensagem volta com 400
+PLATFORM_MARKUP = {
+    'telegram': (html_bold, html_text),
+    'whatsapp': (star_bold, no_markup),
+    # O Facebook mostraria os asteriscos como texto
+    'facebook': (no_markup, no_markup)
+}
+DEFAULT_MARKUP = (star_bold, no_markup)
+
+
+def format_job_message(job, link=None, markup=DEFAULT_MARKUP):
+    """Formata mensagem de vaga para publicação"""
+    bold, escape = markup
+    message = f"""💼 {bold('NOVA VAGA DE EMPREGO')}
+
+📋 {bold(escape(job.title))}
+🏢 {escape(job.company or 'Empresa não informada')}
+📍 {escape(job.location or 'Localização não informada')}"""
+
+    if job.salary:
+        message += f"\n💰 {escape(job.salary)}"
+
+    if job.work_mode:
+        message += f"\n🏠 {escape(job.work_mode)}"
+
+    if job.job_type:
+        message += f"\n📄 {escape(job.job_type)}"
+
+    message += f"\n\n👉 {bold('Clique aqui para se candidatar:')}\n{escape(link or job.tracking_url or job.source_url)}"
+
+    return message
+
+
+def format_news_message(news, link=None, markup=DEFAULT_MARKUP):
+    """Formata mensagem de notícia para publicação"""
+    bold, escape = markup
+    message = f"""📰 {bold('NOTÍCIA MUNDIAL')}
+
+📋 {bold(escape(news.title))}"""
+
+    if news.summary:
+        message += f"\n\n📝 {escape(news.summary[:200])}{'...' if len(news.summary) > 200 else ''}"
+
+    if news.source_name:
+        message += f"\n\n🏢 Fonte: {escape(news.source_name)}"
+
+    message += f"\n\n👉 {bold('Leia mais:')}\n{escape(link or news.tracking_url or news.source_url)}"
+
+    return message
+
+
+# tipo -> (coluna do post em Publication, formatação da mensagem)
+PUBLICATION_TYPES = {
+    'job': ('job_post_id', format_job_message),
+    'news': ('news_post_id', format_news_message)
+}
+
+
+# Marca o lugar do link de tracking do grupo nas mensagens planejadas
+LINK_PLACEHOLDER = '\x00link\x00'
+
+
+def render_message(content_type, content, platform):
+    """Mensagem de ``content`` na marcação de ``platform``, com
+    ``LINK_PLACEHOLDER`` no lugar do link (ver ``mint_group_links``)"""
+    markup = PLATFORM_MARKUP.get(platform, DEFAULT_MARKUP)
+    return PUBLICATION_TYPES[content_type][1](content, LINK_PLACEHOLDER, markup)
+
+
+# Colunas do grupo usadas no planejamento (e mostradas no plano)
+GROUP_FIELDS = (
+    'id', 'name', 'platform', 'uf', 'activity_score', 'member_count',
+    'quiet_hours_start', 'quiet_hours_end', 'min_post_interval'
+)
+
+
+def active_groups(group_ids):
+    """Grupos ativos entre ``group_ids``, em uma única consulta IN.
+
+    Retorna ``(grupos, ids ignorados)``: ids inexistentes ou de grupos
+    inativos ficam de fora.
+    """
+    group_ids = list(dict.fromkeys(group_ids))
+    groups = (
+        Group.query
+        .options(load_only(*(getattr(Group, field) for field in GROUP_FIELDS)))
+        .filter(Group.id.in_(group_ids), Group.is_active.is_(True))
+        .order_by(Group.id)
+        .all()
+    )
+    found = {group.id for group in groups}
+    return groups, [group_id for group_id in group_ids if group_id not in found]
+
+
+# Tamanho máximo do nome de campanha pedido em /api/publish
+MAX_CAMPAIGN_LENGTH = 100
+
+
+def campaign_key(campaign=None, idempotency_key=None):
+    """Chave de deduplicação do pedido: a campanha explícita ou, sem ela, o
+    Idempotency-Key. Sem nenhum dos dois (None) o envio não é deduplicado,
+    e o mesmo conteúdo pode voltar ao grupo (ex.: depois da janela de
+    ``exclude_recent_days``)."""
+    if campaign:
+        return campaign
+    if idempotency_key:
+        return f'key:{idempotency_key}'
+    return None
+
+
+def campaign_labels(campaign, slots):
+    """Campanha gravada para cada horário pedido (``slots`` em ordem).
+
+    Com horários explícitos, cada um é uma campanha própria: o mesmo
+    conteúdo pode ir ao grupo às 8h e às 18h, mas repetir o pedido não
+    duplica nenhum dos dois.
+    """
+    if not slots or campaign is None:
+        return [campaign] * max(len(slots), 1)
+    return [f'{campaign}@{slot.isoformat()}' for slot in slots]
+
+
+def plan_publications(content_type, content, groups, slots=None, spread=None, tz=None, campaign=None):
+    """Monta as linhas de Publication para enviar ``content`` aos ``groups``.
+
+    A mensagem é formatada uma vez por plataforma, não uma vez por grupo.
+    Há uma linha por grupo para cada horário de ``slots`` (padrão: agora),
+    ajustado pela janela de envio do grupo (ver ``plan_send_times``).
+    """
+    link_column = PUBLICATION_TYPES[content_type][0]
+    slots = sorted(set(slots or []))
+    labels = campaign_labels(campaign, slots)
+    send_times = plan_send_times(groups, slots or [datetime.utcnow()], spread, tz) if groups else {}
+
+    messages = {}
+    rows = []
+    for group in groups:
+        if group.platform not in messages:
+            messages[group.platform] = render_message(content_type, content, group.platform)
+        for moment, label in zip(send_times[group.id], labels):
+            rows.append({
+                'group_id': group.id,
+                link_column: content.id,
+                'campaign': label,
+                'message_content': messages[group.platform],
+                'status': 'pending',
+                'scheduled_for': moment,
+                'next_attempt_at': moment
+            })
+    return rows
+
+
+def describe_plan(groups, rows):
+    """Plano legível (grupos, na ordem, com seus horários) para o dry run"""
+    times = {}
+    for row in rows:
+        times.setdefault(row['group_id'], []).append(row['scheduled_for'].isoformat())
+    return [
+        {
+            'group_id': group.id,
+            'name': group.name,
+            'platform': group.platform,
+            'uf': group.uf,
+            'activity_score': group.activity_score,
+            'member_count': group.member_count,
+            'send_times': times.get(group.id, [])
+        }
+        for group in groups
+    ]
+
+
+def drop_published(content_type, content, rows):
+    """Tira de ``rows`` os envios que já existem (mesmo conteúdo, grupo e
+    campanha). Retorna ``(linhas novas, ids dos grupos repetidos)``.
+
+    A consulta percorre o índice único (conteúdo, grupo, campanha); linhas
+    sem campanha não são deduplicadas.
+    """
+    campaigns = {row['campaign'] for row in rows if row['campaign'] is not None}
+    if not campaigns:
+        return rows, []
+
+    link_column = PUBLICATION_TYPES[content_type][0]
+    publications = Publication.__table__
+    existing = set(db.session.execute(
+        select(publications.c.group_id, publications.c.campaign).where(
+            publications.c[link_column] == content.id,
+            publications.c.group_id.in_({row['group_id'] for row in rows}),
+            publications.c.campaign.in_(campaigns)
+        )
+    ).all())
+    if not existing:
+        return rows, []
+
+    fresh = [row for row in rows if (row['group_id'], row['campaign']) not in existing]
+    repeated = list(dict.fromkeys(row['group_id'] for row in rows if (row['group_id'], row['campaign']) in existing))
+    return fresh, repeated
+
+
+def mint_group_links(content_type, content, rows, base_url=''):
+    """Cria um link de tracking por grupo e o põe na mensagem de cada linha.
+
+    Os ids dos links são reservados em bloco e os links entram em um único
+    INSERT multi-linha, já com ``group_id``: os cliques ficam atribuídos ao
+    grupo e ao conteúdo. Sem URL de origem, a mensagem fica sem link.
+    """
+    if not content.source_url:
+        for row in rows:
+            row['message_content'] = row['message_content'].replace(LINK_PLACEHOLDER, content.tracking_url or '')
+        return []
+
+    link_column = PUBLICATION_TYPES[content_type][0]
+    group_ids = list(dict.fromkeys(row['group_id'] for row in rows))
+    urls = {}
+    links = []
+    for group_id, link_id in zip(group_ids, allocate_ids(len(group_ids))):
+        code = encode_code(link_id)
+        urls[group_id] = base_url.rstrip('/') + tracking_path(code)
+        links.append({
+            'id': link_id,
+            'tracking_id': code,
+            'original_url': content.source_url,
+            link_column: content.id,
+            'group_id': group_id
+        })
+    if links:
+        db.session.execute(ClickTracking.__table__.insert(), links)
+
+    for row in rows:
+        row['message_content'] = row['message_content'].replace(LINK_PLACEHOLDER, urls[row['group_id']])
+    return links
+
+
+def discard_unused_links(links, created):
+    """Apaga os links de ``mint_group_links`` dos grupos que ficaram sem
+    nenhuma publicação gravada (ON CONFLICT em ``create_publications``).
+
+    Roda na mesma transação do INSERT; o DELETE é Core, então o cache de
+    links é invalidado explicitamente após o commit. Retorna os ids apagados.
+    """
+    created_groups = {group_id for _, group_id, _ in created}
+    unused = [link['id'] for link in links if link['group_id'] not in created_groups]
+    if unused:
+        table = ClickTracking.__table__
+        db.session.execute(table.delete().where(table.c.id.in_(unused)))
+        link_cache.invalidate_on_commit(db.session, links=unused)
+    return unused
+
+
+def create_publications(rows):
+    """Grava as publicações planejadas em um único INSERT multi-linha.
+
+    Envios que outra requisição gravou no meio tempo (mesmo conteúdo, grupo
+    e campanha) são ignorados pelo ON CONFLICT DO NOTHING. Retorna os
+    ``(id, group_id, scheduled_for)`` gravados.
+    """
+    if not rows:
+        return []
+
+    table = Publication.__table__
+    conn = db.session.connection()
+    if conn.dialect.name == 'postgresql':
+        stmt = postgresql.insert(table)
+    else:
+        stmt = sqlite.insert(table)
+    stmt = stmt.on_conflict_do_nothing().returning(table.c.id, table.c.group_id, table.c.scheduled_for)
+
+    created = db.session.execute(stmt, rows).all()
+    if created:
+        # INSERT Core: as versões não passam pelos eventos do ORM
+        bump(conn, 'publications')
+    return created
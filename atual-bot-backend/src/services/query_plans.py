@@ -0,0 +1,141 @@
+import re
+import sys
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from werkzeug.datastructures import MultiDict
+
+from src.models import db
+from src.models.content import ClickTracking, ClickEvent, JobPost, NewsPost, Publication
+from src.models.dedup import ContentFingerprint, FingerprintBand
+from src.models.idempotency import IdempotencyKey
+from src.routes.content import build_jobs_query, build_news_query, build_publications_query
+from src.services.click_analytics import aggregate_clicks_query
+from src.services.dispatch import due_publications
+from src.services.facets import FACET_COLUMNS
+from src.services.pagination import encode_cursor, keyset_filter
+from src.services.targeting import top_groups_query
+
+# "SCAN tabela" sem "USING INDEX": o SQLite vai ler a tabela inteira
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+PAGE_SIZE = 21
+
+
+def _listing(build_query, **args):
+    return lambda: build_query(MultiDict(args)).limit(PAGE_SIZE)
+
+
+def _keyset(build_query, model, **args):
+    after = encode_cursor(-1.0 if 'q' in args else datetime(2030, 1, 1), 1000)
+    return lambda: keyset_filter(build_query(MultiDict(args)), model, after).limit(PAGE_SIZE)
+
+
+# Consultas representativas de cada endpoint
+PLAN_CASES = [
+    ('GET /api/jobs', _listing(build_jobs_query)),
+    ('GET /api/jobs?job_type', _listing(build_jobs_query, job_type='CLT')),
+    ('GET /api/jobs?work_mode', _listing(build_jobs_query, work_mode='Remoto')),
+    ('GET /api/jobs?experience_level', _listing(build_jobs_query, experience_level='Pleno')),
+    ('GET /api/jobs?uf', _listing(build_jobs_query, uf='SP')),
+    ('GET /api/jobs?salary_min', _listing(build_jobs_query, salary_min='3000')),
+    ('GET /api/jobs?after', _keyset(build_jobs_query, JobPost)),
+    ('GET /api/jobs?q', _listing(build_jobs_query, q='desenvolvedor python')),
+    ('GET /api/jobs?q&after', _keyset(build_jobs_query, JobPost, q='desenvolvedor python')),
+    ('GET /api/jobs?location', _listing(build_jobs_query, location='São Paulo')),
+    ('GET /api/jobs/facets', lambda: build_jobs_query(MultiDict()).order_by(None).with_entities(
+        *(getattr(JobPost, column) for column in FACET_COLUMNS)).group_by(*(getattr(JobPost, column) for column in FACET_COLUMNS))),
+    ('GET /api/news', _listing(build_news_query)),
+    ('GET /api/news?category', _listing(build_news_query, category='Tecnologia')),
+    ('GET /api/news?after', _keyset(build_news_query, NewsPost)),
+    ('GET /api/news?q', _listing(build_news_query, q='economia')),
+    ('GET /api/publications', _listing(build_publications_query)),
+    ('GET /api/publications?status', _listing(build_publications_query, status='pending')),
+    ('GET /api/publications?after', _keyset(build_publications_query, Publication)),
+    ('GET /track/<uuid>', lambda: ClickTracking.query.filter(ClickTracking.tracking_id == 'legacy')),
+    ('GET /track/<codigo>', lambda: ClickTracking.query.filter(ClickTracking.id == 1)),
+    ('GET /api/analytics/clicks', lambda: aggregate_clicks_query(datetime.utcnow() - timedelta(days=30), by_group=True)),
+    ('GET /api/analytics/clicks?content_id', lambda: aggregate_clicks_query(
+        datetime.utcnow() - timedelta(days=30), 'job', by_group=True, content_id=1)),
+    ('GET /analytics/summary', lambda: aggregate_clicks_query(datetime.utcnow() - timedelta(days=30))),
+    ('GET /api/jobs?hide_duplicates', _listing(build_jobs_query, hide_duplicates='true')),
+    ('impressão exata', lambda: ContentFingerprint.query.filter(
+        ContentFingerprint.content_type == 'job', ContentFingerprint.exact_hash.in_(['0' * 40]))),
+    ('buckets LSH', lambda: FingerprintBand.query.filter(
+        FingerprintBand.content_type == 'job', FingerprintBand.band == 0, FingerprintBand.value.in_([1, 2]))),
+    ('GET /api/duplicates', lambda: ContentFingerprint.query.with_entities(ContentFingerprint.duplicate_of).filter(
+        ContentFingerprint.content_type == 'job', ContentFingerprint.duplicate_of.isnot(None)
+    ).distinct().order_by(ContentFingerprint.duplicate_of.desc()).limit(PAGE_SIZE)),
+    ('fila de envio', lambda: due_publications('telegram', datetime.utcnow(), 16)),
+    ('reservas vencidas', lambda: Publication.query.filter(
+        Publication.status == 'sending', Publication.claimed_at < datetime.utcnow())),
+    ('próximos horários de envio', lambda: Publication.query.with_entities(Publication.next_attempt_at).filter(
+        Publication.status == 'pending').order_by(Publication.next_attempt_at).limit(1000)),
+    ('envios planejados do grupo', lambda: Publication.query.with_entities(Publication.group_id, Publication.scheduled_for).filter(
+        Publication.group_id.in_([1, 2]), Publication.scheduled_for.between(datetime(2030, 1, 1), datetime(2030, 1, 2))
+    ).order_by(Publication.group_id, Publication.scheduled_for)),
+    ('top_k de grupos', lambda: top_groups_query(200, content_type='job', content_id=1)),
+    ('top_k de grupos?platform', lambda: top_groups_query(200, 'telegram', content_type='job', content_id=1)),
+    ('top_k de grupos?uf', lambda: top_groups_query(200, uf='SP', content_type='job', content_id=1)),
+    ('top_k de grupos?platform&uf', lambda: top_groups_query(200, 'telegram', 'SP', content_type='job', content_id=1)),
+    ('envios já feitos na campanha', lambda: Publication.query.with_entities(Publication.group_id, Publication.campaign).filter(
+        Publication.job_post_id == 1, Publication.group_id.in_([1, 2]), Publication.campaign.in_(['']))),
+    ('Idempotency-Key', lambda: IdempotencyKey.query.filter(IdempotencyKey.scope == 'publish', IdempotencyKey.key == 'chave')),
+    ('cliques por link', lambda: ClickEvent.query.filter(ClickEvent.click_tracking_id == 1)),
+]
+
+# Índice que o caso precisa usar. Sem ele o plano pode não ter full scan e
+# ainda assim ler muito mais do que devia: o top_k por UF sem plataforma
+# percorreria o ranking de todos os grupos ativos descartando as outras UFs
+EXPECTED_INDEXES = {
+    'top_k de grupos': 'ix_groups_ranking',
+    'top_k de grupos?platform': 'ix_groups_platform_ranking',
+    'top_k de grupos?uf': 'ix_groups_uf_active_ranking',
+    'top_k de grupos?platform&uf': 'ix_groups_uf_ranking',
+}
+
+
+def explain(statement):
+    """Retorna as linhas de detalhe do EXPLAIN QUERY PLAN da consulta"""
+    sql = str(statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+    with db.engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+
+
+def uses_index(details, index):
+    """Se alguma linha do plano lê o índice ``index``"""
+    pattern = re.compile(rf'USING (?:COVERING )?INDEX {index}\b')
+    return any(pattern.search(detail) for detail in details)
+
+
+def check_query_plans():
+    """Lista (caso, problema) de cada leitura completa de tabela e de cada
+    caso que não usa o índice de ``EXPECTED_INDEXES``"""
+    failures = []
+    for name, build in PLAN_CASES:
+        query = build()
+        details = explain(getattr(query, 'statement', query))
+        failures.extend((name, f'full scan ({detail})') for detail in details if FULL_SCAN.match(detail))
+        index = EXPECTED_INDEXES.get(name)
+        if index and not uses_index(details, index):
+            failures.append((name, f'não usa o índice {index}: {"; ".join(details)}'))
+    return failures
+
+
+@click.command('check-query-plans')
+@with_appcontext
+def check_query_plans_command():
+    """Falha se alguma consulta dos endpoints fizer full scan ou não usar o
+    índice esperado"""
+    if db.engine.dialect.name != 'sqlite':
+        print("Verificação disponível apenas para SQLite")
+        return
+
+    failures = check_query_plans()
+    for name, problem in failures:
+        print(f"{name}: {problem}")
+
+    if failures:
+        sys.exit(1)
+    print(f"{len(PLAN_CASES)} consultas verificadas, nenhum full scan nem índice faltando")
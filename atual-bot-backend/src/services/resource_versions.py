@@ -0,0 +1,140 @@
+import hashlib
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+
+from flask import make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models import db
+from src.models.config import BotConfig, ResourceVersion, AIProvider, SocialAccount, Group
+from src.models.content import JobPost, NewsPost, Publication
+
+# Recurso da API afetado pela escrita em cada modelo ('config' usa a
+# versão própria das configurações, BotConfigVersion)
+MODEL_RESOURCES = {
+    Group: 'groups',
+    AIProvider: 'ai_providers',
+    SocialAccount: 'social_accounts',
+    JobPost: 'jobs',
+    NewsPost: 'news',
+    Publication: 'publications'
+}
+
+# Cliques são gravados pelo buffer (SQL direto), que incrementa 'clicks'
+RESOURCES = tuple(MODEL_RESOURCES.values()) + ('clicks',)
+
+
+def bump(conn, *names):
+    """Incrementa a versão dos recursos na transação de ``conn``"""
+    conn.execute(
+        db.update(ResourceVersion)
+        .where(ResourceVersion.name.in_(names))
+        .values(version=ResourceVersion.version + 1)
+    )
+
+
+class ResourceVersions:
+    """Versões dos recursos vistas por este processo.
+
+    Como em ``ConfigSnapshot``, a tabela (uma linha por recurso) é lida no
+    máximo a cada ``check_interval`` segundos; escritas deste processo
+    expiram a cópia no commit e aparecem na hora, as de outros processos
+    em até ``check_interval``.
+    """
+
+    def __init__(self, check_interval=1.0):
+        self.check_interval = check_interval
+        self.values = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.check_interval = app.config.get('RESOURCE_VERSION_CHECK_INTERVAL', 1.0)
+        with app.app_context():
+            ensure_resource_versions()
+
+    def current(self):
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return self.values
+
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.check_interval:
+                self.values = dict(db.session.query(ResourceVersion.name, ResourceVersion.version))
+                self._checked_at = time.monotonic()
+        return self.values
+
+    def expire(self):
+        self._checked_at = 0.0
+
+    def etag(self, names, daily=False):
+        """ETag a partir das versões de ``names`` (e do dia, se ``daily``)"""
+        values = self.current()
+        parts = [f"{name}={BotConfig.get_version() if name == 'config' else values.get(name, 0)}" for name in names]
+        if daily:
+            # Janelas de "últimos N dias" mudam com a data mesmo sem escrita
+            parts.append(datetime.utcnow().date().isoformat())
+        return hashlib.sha1(';'.join(parts).encode('utf-8')).hexdigest()[:20]
+
+
+resource_versions = ResourceVersions()
+
+
+def ensure_resource_versions():
+    """Cria as linhas de versão que ainda não existem"""
+    existing = {name for (name,) in db.session.query(ResourceVersion.name)}
+    for name in RESOURCES:
+        if name not in existing:
+            db.session.add(ResourceVersion(name=name, version=1))
+    db.session.commit()
+
+
+def conditional(*names, daily=False):
+    """Responde 304 quando o If-None-Match bate com as versões de ``names``.
+
+    A versão é lida antes da consulta: uma escrita no meio só faz a
+    próxima requisição receber o corpo de novo, nunca um 304 velho.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = resource_versions.etag(names, daily)
+            # Comparação fraca: respostas comprimidas levam o ETag como W/
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+                response.set_etag(etag, weak=not request.if_none_match.contains(etag))
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_resource_versions(session, flush_context):
+    names = {
+        MODEL_RESOURCES[type(obj)]
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if type(obj) in MODEL_RESOURCES
+    }
+    if names:
+        # Mesma transação da escrita: a versão nova só aparece com os dados
+        bump(session.connection(), *names)
+        session.info['resource_versions_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _expire_resource_versions(session):
+    if session.info.pop('resource_versions_changed', False):
+        resource_versions.expire()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_resource_versions(session):
+    session.info.pop('resource_versions_changed', None)
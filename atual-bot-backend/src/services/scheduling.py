@@ -0,0 +1,171 @@
+import bisect
+import heapq
+import threading
+from datetime import datetime, time as day_time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+
+from src.models.content import db, Publication
+
+publications = Publication.__table__
+
+# Horários pendentes mantidos em memória pelo worker de envio
+DUE_QUEUE_SIZE = 10000
+
+
+def parse_send_time(value, tz):
+    """ISO 8601 -> datetime UTC sem fuso (como as colunas do banco).
+
+    Horários sem fuso são do fuso local (``tz``). Levanta ValueError para
+    qualquer valor que não seja um texto ISO 8601.
+    """
+    if not isinstance(value, str):
+        raise ValueError(f'Horário inválido: {value!r} (use texto ISO 8601)')
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Horário inválido: {value!r} (use texto ISO 8601)')
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=tz)
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def in_quiet_hours(hour, start, end):
+    """Se a hora local ``hour`` cai no silêncio [start, end) (pode virar a meia-noite)"""
+    if start is None or end is None or start == end:
+        return False
+    if start < end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def after_quiet_hours(moment, start, end, tz):
+    """Primeiro horário a partir de ``moment`` (UTC) fora do silêncio do grupo"""
+    local = moment.replace(tzinfo=timezone.utc).astimezone(tz)
+    if not in_quiet_hours(local.hour, start, end):
+        return moment
+
+    release = datetime.combine(local.date(), day_time(end), tzinfo=tz)
+    if release <= local:
+        release = datetime.combine(local.date() + timedelta(days=1), day_time(end), tzinfo=tz)
+    return release.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def planned_times(groups, start, end):
+    """Envios já planejados entre ``start`` e ``end`` dos grupos com
+    espaçamento mínimo, em ordem: {group_id: [horários]}.
+
+    Só lê o trecho do índice (group_id, scheduled_for) de cada grupo.
+    """
+    group_ids = [group.id for group in groups if group.min_post_interval]
+    if not group_ids:
+        return {}
+
+    times = {}
+    rows = db.session.execute(
+        select(publications.c.group_id, publications.c.scheduled_for)
+        .where(publications.c.group_id.in_(group_ids), publications.c.scheduled_for.between(start, end))
+        .order_by(publications.c.group_id, publications.c.scheduled_for)
+    )
+    for group_id, moment in rows:
+        times.setdefault(group_id, []).append(moment)
+    return times
+
+
+def place_send_time(moment, taken, spacing, group, tz):
+    """Primeiro horário a partir de ``moment`` a ``spacing`` de todos os
+    horários de ``taken`` (ordenados) e fora do silêncio do grupo"""
+    while True:
+        for other in taken:
+            if abs(moment - other) < spacing:
+                moment = other + spacing
+        adjusted = after_quiet_hours(moment, group.quiet_hours_start, group.quiet_hours_end, tz)
+        if adjusted == moment:
+            return moment
+        moment = adjusted
+
+
+def plan_send_times(groups, slots, spread=None, tz=None):
+    """Horários de envio (UTC) de cada grupo para cada horário pedido.
+
+    Com ``spread`` (timedelta), cada horário é distribuído entre os grupos ao
+    longo desse intervalo, em vez de todos no mesmo instante. Depois vêm o
+    espaçamento mínimo do grupo (em relação aos envios já planejados) e o
+    silêncio do grupo, que empurra o envio para o fim do intervalo.
+    Retorna {group_id: [horários]}.
+    """
+    tz = tz or timezone.utc
+    slots = sorted(slots)
+    longest = timedelta(minutes=max((group.min_post_interval or 0 for group in groups), default=0))
+    taken = {}
+    if longest:
+        # O silêncio pode empurrar um envio para o dia seguinte
+        taken = planned_times(groups, slots[0] - longest, slots[-1] + (spread or timedelta()) + longest + timedelta(days=1))
+
+    times = {}
+    for index, group in enumerate(groups):
+        offset = spread * index / len(groups) if spread else timedelta()
+        spacing = timedelta(minutes=group.min_post_interval or 0)
+        group_taken = taken.get(group.id, [])
+        planned = []
+        for slot in slots:
+            moment = place_send_time(slot + offset, group_taken, spacing, group, tz)
+            if spacing:
+                bisect.insort(group_taken, moment)
+            planned.append(moment)
+        times[group.id] = planned
+    return times
+
+
+class DueQueue:
+    """Heap dos próximos horários de envio pendentes.
+
+    Alimentado pelas publicações criadas neste processo e, a cada
+    ``DISPATCH_IDLE_INTERVAL``, pelos primeiros horários pendentes do banco
+    (índice status/next_attempt_at), o que cobre outros processos. O worker
+    dorme até o topo do heap em vez de consultar a fila a cada poucos
+    segundos.
+    """
+
+    def __init__(self, max_size=DUE_QUEUE_SIZE):
+        self.max_size = max_size
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def push(self, times):
+        with self._lock:
+            for moment in times:
+                if moment is not None:
+                    heapq.heappush(self._heap, moment)
+            if len(self._heap) > 2 * self.max_size:
+                self._heap = heapq.nsmallest(self.max_size, self._heap)
+
+    def load(self, conn, limit=None):
+        """Troca o conteúdo pelos primeiros horários pendentes do banco"""
+        times = conn.execute(
+            select(publications.c.next_attempt_at)
+            .where(publications.c.status == 'pending')
+            .order_by(publications.c.next_attempt_at)
+            .limit(limit or self.max_size)
+        ).scalars().all()
+        with self._lock:
+            self._heap = [moment for moment in times if moment is not None]
+            heapq.heapify(self._heap)
+
+    def next_due(self):
+        with self._lock:
+            return self._heap[0] if self._heap else None
+
+    def is_due(self, now):
+        moment = self.next_due()
+        return moment is not None and moment <= now
+
+    def pop_due(self, now):
+        with self._lock:
+            while self._heap and self._heap[0] <= now:
+                heapq.heappop(self._heap)
+
+
+def local_timezone(name):
+    return ZoneInfo(name) if name else timezone.utc
@@ -0,0 +1,289 @@
+import math
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import Counter
+
+from sqlalchemy import Float, Integer, case, event, text
+from sqlalchemy.orm import Session
+
+from src.models.content import db, JobPost, NewsPost
+
+# Colunas indexadas e pesos do BM25 (título pesa mais que o corpo)
+SEARCH_FIELDS = {
+    'job': (JobPost, 'job_posts', {
+        'title': 10.0, 'company': 3.0, 'location': 3.0, 'description': 1.0, 'requirements': 1.0
+    }),
+    'news': (NewsPost, 'news_posts', {
+        'title': 10.0, 'summary': 3.0, 'source_name': 2.0, 'category': 2.0, 'content': 1.0
+    })
+}
+
+# Limite de candidatos no índice em memória (o FTS5 não precisa): buscas
+# sem FTS5 param nos MAX_MEMORY_RESULTS mais relevantes, inclusive no cursor
+MAX_MEMORY_RESULTS = 1000
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def fold(value):
+    """Minúsculas e sem acentos: "São Paulo" -> "sao paulo" """
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(value):
+    return TOKEN_PATTERN.findall(fold(value))
+
+
+def fts5_available():
+    try:
+        sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE t USING fts5(x)')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def create_fts_tables(conn):
+    """Cria as tabelas FTS5 (conteúdo externo) e os triggers de sincronização"""
+    for model, table, weights in SEARCH_FIELDS.values():
+        fts = f'{table}_fts'
+        columns = ', '.join(weights)
+        new_values = ', '.join(f'new.{column}' for column in weights)
+        old_values = ', '.join(f'old.{column}' for column in weights)
+
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, "
+            f"content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+        )
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+        )
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+        )
+        conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def match_expression(q=None, **columns):
+    """Monta a expressão MATCH do FTS5 com termos entre aspas (sem sintaxe do usuário)"""
+    parts = []
+    terms = tokenize(q)
+    if terms:
+        parts.append('(' + ' '.join(f'"{term}"' for term in terms) + ')')
+    for column, value in columns.items():
+        terms = tokenize(value)
+        if terms:
+            parts.append(f'{column} : (' + ' '.join(f'"{term}"' for term in terms) + ')')
+    return ' AND '.join(parts) or None
+
+
+class InvertedIndex:
+    """Índice invertido em memória com ranking BM25 (quando não há FTS5)"""
+
+    def __init__(self, weights, k1=1.2, b=0.75):
+        self.weights = weights
+        self.k1 = k1
+        self.b = b
+        self.postings = {}
+        self.documents = {}
+        self.total_length = 0.0
+
+    def add(self, doc_id, fields):
+        self.remove(doc_id)
+        terms = Counter()
+        for column, weight in self.weights.items():
+            for term in tokenize(fields.get(column)):
+                terms[term] += weight
+        length = sum(terms.values())
+        self.documents[doc_id] = (terms, length)
+        self.total_length += length
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+
+    def remove(self, doc_id):
+        document = self.documents.pop(doc_id, None)
+        if document is None:
+            return
+        terms, length = document
+        self.total_length -= length
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+
+    def search(self, q, limit=MAX_MEMORY_RESULTS):
+        """Retorna [(doc_id, score)] com todos os termos, melhor primeiro"""
+        terms = set(tokenize(q))
+        if not terms or not self.documents:
+            return []
+
+        # Interseção começando pela lista de postings mais curta
+        postings = sorted((self.postings.get(term, {}) for term in terms), key=len)
+        candidates = set(postings[0])
+        for docs in postings[1:]:
+            candidates &= docs.keys()
+            if not candidates:
+                return []
+
+        total = len(self.documents)
+        average_length = self.total_length / total or 1.0
+        scores = {}
+        for docs in postings:
+            idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id in candidates:
+                frequency = docs[doc_id]
+                length = self.documents[doc_id][1]
+                norm = frequency + self.k1 * (1 - self.b + self.b * length / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / norm
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+class SearchIndex:
+    """Busca textual sobre vagas e notícias.
+
+    Usa as tabelas FTS5 criadas pela migração (sincronizadas por triggers)
+    quando o banco é SQLite com FTS5; caso contrário, mantém um índice
+    invertido em memória, carregado na primeira busca e atualizado pelos
+    eventos do ORM após cada commit.
+
+    O índice em memória serve só para um processo: cada worker tem a sua
+    cópia, que não vê o que outros processos (outros workers, comandos da
+    CLI) gravaram depois de carregá-la. Com vários workers, use SQLite com
+    FTS5 ou reinicie os processos após importações.
+
+    Com ``q`` a query recebe a opção de execução ``search_rank`` (menor é
+    mais relevante), usada pela paginação por cursor para manter a ordem.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        with app.app_context():
+            self.backend = 'fts5' if _fts_tables_exist() else 'memory'
+
+    def filter(self, content_type, query, q=None, **columns):
+        """Restringe ``query`` à busca ``q`` e aos filtros textuais por coluna.
+
+        Com ``q`` o resultado passa a ser ordenado por relevância (BM25);
+        só com filtros por coluna a ordenação de ``query`` é mantida.
+        """
+        model, table, weights = SEARCH_FIELDS[content_type]
+
+        if self.backend == 'fts5':
+            expression = match_expression(q, **columns)
+            if expression is None:
+                return query
+            bm25_weights = ', '.join(str(weight) for weight in weights.values())
+            matches = text(
+                f"SELECT rowid AS id, bm25({table}_fts, {bm25_weights}) AS score "
+                f"FROM {table}_fts WHERE {table}_fts MATCH :expression"
+            ).bindparams(expression=expression).columns(id=Integer, score=Float).subquery()
+            query = query.join(matches, matches.c.id == model.id)
+            if tokenize(q):
+                query = _order_by_rank(query, model, matches.c.score)
+            return query
+
+        # Sem FTS5, só ``q`` passa pelo índice; filtros por coluna seguem no SQL
+        for column, value in columns.items():
+            if value:
+                query = query.filter(getattr(model, column).ilike(f'%{value}%'))
+        if not tokenize(q):
+            return query
+
+        results = self._memory_index(content_type).search(q)
+        if not results:
+            return query.filter(db.false())
+        # Pontuação negativa para seguir a convenção do bm25() do FTS5
+        ranking = {doc_id: -score for doc_id, score in results}
+        return _order_by_rank(query.filter(model.id.in_(ranking)), model, case(ranking, value=model.id))
+
+    def _memory_index(self, content_type):
+        with self._lock:
+            index = self._memory.get(content_type)
+            if index is None:
+                model, _, weights = SEARCH_FIELDS[content_type]
+                index = InvertedIndex(weights)
+                columns = [getattr(model, column) for column in weights]
+                rows = db.session.query(model.id, *columns).execution_options(yield_per=1000)
+                for row in rows:
+                    index.add(row[0], dict(zip(weights, row[1:])))
+                self._memory[content_type] = index
+            return index
+
+    def apply_changes(self, changes):
+        """Aplica (tipo, id, campos ou None) ao índice em memória já carregado"""
+        with self._lock:
+            for content_type, doc_id, fields in changes:
+                index = self._memory.get(content_type)
+                if index is None:
+                    continue
+                if fields is None:
+                    index.remove(doc_id)
+                else:
+                    index.add(doc_id, fields)
+
+
+def _order_by_rank(query, model, rank):
+    query = query.order_by(None).order_by(rank, model.id.desc())
+    return query.execution_options(search_rank=rank)
+
+
+def _fts_tables_exist():
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    names = {row[0] for row in db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+    return all(f'{table}_fts' in names for _, table, _ in SEARCH_FIELDS.values())
+
+
+search_index = SearchIndex()
+
+
+def _content_type_of(obj):
+    if isinstance(obj, JobPost):
+        return 'job'
+    if isinstance(obj, NewsPost):
+        return 'news'
+    return None
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_search_changes(session, flush_context):
+    if search_index.backend != 'memory':
+        return
+    changes = session.info.setdefault('search_changes', [])
+    for obj in list(session.new) + list(session.dirty):
+        content_type = _content_type_of(obj)
+        if content_type:
+            weights = SEARCH_FIELDS[content_type][2]
+            changes.append((content_type, obj.id, {column: getattr(obj, column) for column in weights}))
+    for obj in session.deleted:
+        content_type = _content_type_of(obj)
+        if content_type:
+            changes.append((content_type, obj.id, None))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_search_changes(session):
+    changes = session.info.pop('search_changes', None)
+    if changes:
+        search_index.apply_changes(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_search_changes(session):
+    session.info.pop('search_changes', None)
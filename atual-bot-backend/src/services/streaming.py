@@ -0,0 +1,56 @@
+import json
+
+from flask import Response, stream_with_context
+
+# Linhas buscadas por vez do cursor do banco
+EXPORT_BATCH_SIZE = 1000
+
+# Tamanho aproximado de cada pedaço enviado ao cliente
+CHUNK_SIZE = 64 * 1024
+
+
+def _chunked(pieces):
+    """Junta pedaços pequenos de texto em blocos de ~CHUNK_SIZE bytes"""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def json_list_pieces(items, serialize, key):
+    """``{"success": true, "data": {key: [...]}}`` gerado item a item"""
+    yield f'{{"success": true, "data": {{{json.dumps(key)}: ['
+    for index, item in enumerate(items):
+        if index:
+            yield ','
+        yield json.dumps(serialize(item))
+    yield ']}}'
+
+
+def ndjson_pieces(items, serialize):
+    for item in items:
+        yield json.dumps(serialize(item))
+        yield '\n'
+
+
+def stream_export(query, serialize, key, format=None):
+    """Resposta em streaming com todas as linhas de ``query``.
+
+    As linhas vêm do cursor em lotes de ``EXPORT_BATCH_SIZE`` (yield_per)
+    e são serializadas conforme chegam, então a memória por requisição
+    não depende do tamanho do resultado. ``format=ndjson`` gera uma linha
+    JSON por item; o padrão é o envelope JSON de sempre.
+    """
+    items = query.yield_per(EXPORT_BATCH_SIZE)
+    if format == 'ndjson':
+        pieces, mimetype = ndjson_pieces(items, serialize), 'application/x-ndjson'
+    else:
+        pieces, mimetype = json_list_pieces(items, serialize, key), 'application/json'
+    return Response(stream_with_context(_chunked(pieces)), mimetype=mimetype)
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import load_only
+
+from src.models.config import Group
+from src.models.content import db, Publication
+from src.services.publications import GROUP_FIELDS, PUBLICATION_TYPES
+
+# Maior top_k aceito em um único envio
+MAX_TOP_K = 5000
+
+# Grupos que receberam o mesmo conteúdo nesse intervalo ficam de fora
+RECENT_DAYS = 7
+
+
+def ranking_order():
+    """Melhores grupos primeiro: engajamento, depois tamanho"""
+    return (Group.activity_score.desc(), Group.member_count.desc(), Group.id.desc())
+
+
+def top_groups_query(top_k, platform=None, uf=None, content_type=None, content_id=None, recent_days=RECENT_DAYS):
+    """Consulta dos ``top_k`` grupos ativos mais bem ranqueados.
+
+    Percorre um dos índices de ranking (ix_groups_*_ranking) já na ordem e
+    para no ``top_k``-ésimo grupo; o NOT EXISTS descarta quem recebeu o
+    mesmo conteúdo nos últimos ``recent_days`` dias sem trazer esses grupos
+    para o Python.
+    """
+    query = Group.query.options(load_only(*(getattr(Group, field) for field in GROUP_FIELDS)))
+    query = query.filter(Group.is_active.is_(True))
+    if platform:
+        query = query.filter(Group.platform == platform)
+    if uf:
+        query = query.filter(Group.uf == uf.upper())
+
+    if content_id is not None and recent_days:
+        link_column = getattr(Publication, PUBLICATION_TYPES[content_type][0])
+        since = datetime.utcnow() - timedelta(days=recent_days)
+        received = db.session.query(Publication.id).filter(
+            Publication.group_id == Group.id,
+            Publication.scheduled_for >= since,
+            link_column == content_id
+        )
+        query = query.filter(~received.exists())
+
+    return query.order_by(*ranking_order()).limit(top_k)
+
+
+def select_top_groups(top_k, platform=None, uf=None, content_type=None, content_id=None, recent_days=RECENT_DAYS):
+    """Os ``top_k`` melhores grupos (ver ``top_groups_query``)"""
+    if isinstance(top_k, bool) or not isinstance(top_k, int) or not 1 <= top_k <= MAX_TOP_K:
+        raise ValueError(f'top_k deve ser um inteiro entre 1 e {MAX_TOP_K}')
+    return top_groups_query(top_k, platform, uf, content_type, content_id, recent_days).all()
@@ -0,0 +1,99 @@
+from sqlalchemy import func
+
+from src.models.content import db, ClickTracking, IdSequence
+
+BASE62 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+BASE62_INDEX = {char: index for index, char in enumerate(BASE62)}
+
+# 11 dígitos base62 cobrem um inteiro de 64 bits
+MAX_CODE_LENGTH = 11
+
+SEQUENCE_NAME = 'click_tracking'
+
+
+def encode_code(number):
+    """Converte um inteiro positivo no código curto base62"""
+    if number <= 0:
+        raise ValueError('O id do link deve ser positivo')
+
+    digits = []
+    while number:
+        number, remainder = divmod(number, 62)
+        digits.append(BASE62[remainder])
+    return ''.join(reversed(digits))
+
+
+def decode_code(code):
+    """Converte um código curto no id do link, ou None se não for um código.
+
+    Só a forma canônica vale: com zeros à esquerda ("01") o código seria um
+    apelido de outro ("1") e ocuparia outra entrada no cache de links.
+    """
+    if not code or len(code) > MAX_CODE_LENGTH or code[0] == '0':
+        return None
+
+    number = 0
+    for char in code:
+        index = BASE62_INDEX.get(char)
+        if index is None:
+            # UUIDs antigos têm '-' e caem aqui
+            return None
+        number = number * 62 + index
+    return number or None
+
+
+def tracking_path(code):
+    return f"/track/{code}"
+
+
+def allocate_ids(count, name=SEQUENCE_NAME):
+    """Reserva ``count`` ids consecutivos e retorna o range reservado.
+
+    O UPDATE atômico na linha da sequência serializa as reservas entre
+    processos; os ids ficam conhecidos antes do INSERT, o que permite gravar
+    o código curto junto com o link em um único comando.
+    """
+    if count <= 0:
+        return range(0)
+
+    next_value = db.session.execute(
+        db.update(IdSequence)
+        .where(IdSequence.name == name)
+        .values(next_value=IdSequence.next_value + count)
+        .returning(IdSequence.next_value)
+    ).scalar()
+
+    if next_value is None:
+        ensure_sequence(name)
+        return allocate_ids(count, name)
+
+    return range(next_value - count, next_value)
+
+
+def ensure_sequence(name=SEQUENCE_NAME):
+    """Cria a sequência (ou a adianta) a partir do maior id existente"""
+    max_id = db.session.query(func.max(ClickTracking.id)).scalar() or 0
+    sequence = db.session.get(IdSequence, name)
+    if sequence is None:
+        db.session.add(IdSequence(name=name, next_value=max_id + 1))
+    elif sequence.next_value <= max_id:
+        # Links inseridos sem passar pela sequência (ex.: bancos antigos)
+        sequence.next_value = max_id + 1
+    db.session.flush()
+
+
+def create_tracking_link(original_url, job_post_id=None, news_post_id=None, group_id=None):
+    """Cria (na sessão atual) um link de tracking com código curto"""
+    link_id = allocate_ids(1)[0]
+    code = encode_code(link_id)
+
+    tracking = ClickTracking(
+        id=link_id,
+        tracking_id=code,
+        original_url=original_url,
+        job_post_id=job_post_id,
+        news_post_id=news_post_id,
+        group_id=group_id
+    )
+    db.session.add(tracking)
+    return tracking
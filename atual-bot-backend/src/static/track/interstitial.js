@@ -0,0 +1,64 @@
+(function () {
+    // Criar partículas animadas
+    function createParticles() {
+        const container = document.getElementById('particles');
+        for (let i = 0; i < 20; i++) {
+            const particle = document.createElement('div');
+            particle.className = 'particle';
+            particle.style.left = Math.random() * 100 + '%';
+            particle.style.top = Math.random() * 100 + '%';
+            particle.style.width = (Math.random() * 4 + 2) + 'px';
+            particle.style.height = particle.style.width;
+            particle.style.animationDelay = Math.random() * 6 + 's';
+            particle.style.animationDuration = (Math.random() * 4 + 4) + 's';
+            container.appendChild(particle);
+        }
+    }
+
+    // Simular carregamento do anúncio
+    let countdown = 5;
+    const timerElement = document.getElementById('timer');
+    const continueBtn = document.getElementById('continue-btn');
+    const adContent = document.getElementById('ad-content');
+
+    function updateTimer() {
+        if (countdown > 0) {
+            timerElement.textContent = `⏱️ Redirecionamento em ${countdown} segundos...`;
+            countdown--;
+            setTimeout(updateTimer, 1000);
+        } else {
+            timerElement.textContent = '✅ Anúncio carregado com sucesso!';
+            continueBtn.style.display = 'inline-block';
+            adContent.innerHTML = `
+                <div>
+                    <p class="ad-loaded-title">📢 Anúncio Carregado</p>
+                    <p class="ad-note">
+                        O anúncio foi carregado com sucesso. Clique no botão abaixo para continuar.
+                    </p>
+                </div>
+            `;
+        }
+    }
+
+    function continueToContent() {
+        // Só segue para destinos http(s); nunca executa javascript: ou data:
+        const destination = continueBtn.dataset.destination || '';
+        if (/^https?:\/\//i.test(destination)) {
+            window.location.href = destination;
+        }
+    }
+
+    continueBtn.addEventListener('click', continueToContent);
+
+    // Inicializar
+    createParticles();
+    updateTimer();
+    (window.adsbygoogle = window.adsbygoogle || []).push({});
+
+    // Auto-redirect após 10 segundos se o usuário não clicar
+    setTimeout(() => {
+        if (continueBtn.style.display === 'inline-block') {
+            continueToContent();
+        }
+    }, 10000);
+})();
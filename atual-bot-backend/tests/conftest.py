@@ -0,0 +1,69 @@
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# O app é criado na importação de src.main: o banco de teste precisa estar
+# configurado antes (nunca o src/database/app.db do repositório)
+_db_dir = tempfile.mkdtemp(prefix='atual-bot-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'app.db')}"
+os.environ.pop('DISPATCH_WORKER', None)
+
+# Tabelas com dados dos testes, apagadas depois de cada um
+CONTENT_TABLES = (
+    'idempotency_keys', 'click_events', 'click_rollups_hourly', 'click_rollups_daily', 'click_tracking',
+    'publications', 'fingerprint_bands', 'content_fingerprints', 'job_posts', 'news_posts',
+    'groups', 'social_accounts', 'id_sequences'
+)
+
+
+@pytest.fixture(scope='session')
+def app():
+    from src import main
+    yield main.app
+    main.dispatcher.close()
+    main.click_buffer.close()
+
+
+@pytest.fixture
+def db(app):
+    from src.models import db
+    from src.services.facets import job_facets
+    from src.services.resource_versions import resource_versions
+
+    with app.app_context():
+        yield db
+        db.session.rollback()
+        for name in CONTENT_TABLES:
+            db.session.execute(db.metadata.tables[name].delete())
+        db.session.commit()
+        job_facets.apply_changes([], reload=True)
+        resource_versions.expire()
+
+
+@pytest.fixture
+def client(app, db):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_queries(db):
+    """Bloco que guarda os comandos SQL executados dentro dele"""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return counter
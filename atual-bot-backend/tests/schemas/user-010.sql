@@ -0,0 +1,192 @@
+-- Esquema de um banco criado na versão de user-010 (db.create_all + migrações da época)
+CREATE TABLE user (
+	id INTEGER NOT NULL,
+	username VARCHAR(80) NOT NULL,
+	email VARCHAR(120) NOT NULL,
+	PRIMARY KEY (id),
+	UNIQUE (username),
+	UNIQUE (email)
+);
+CREATE TABLE bot_config_version (
+	id INTEGER NOT NULL,
+	version INTEGER NOT NULL,
+	PRIMARY KEY (id)
+);
+CREATE TABLE bot_config (
+	id INTEGER NOT NULL,
+	"key" VARCHAR(100) NOT NULL,
+	value TEXT,
+	description VARCHAR(255),
+	created_at DATETIME,
+	updated_at DATETIME,
+	PRIMARY KEY (id),
+	UNIQUE ("key")
+);
+CREATE TABLE ai_providers (
+	id INTEGER NOT NULL,
+	name VARCHAR(100) NOT NULL,
+	api_key VARCHAR(500),
+	model VARCHAR(100),
+	is_active BOOLEAN,
+	status VARCHAR(50),
+	last_check DATETIME,
+	created_at DATETIME,
+	PRIMARY KEY (id)
+);
+CREATE TABLE social_accounts (
+	id INTEGER NOT NULL,
+	platform VARCHAR(50) NOT NULL,
+	account_name VARCHAR(200),
+	api_key VARCHAR(500),
+	session_data TEXT,
+	is_active BOOLEAN,
+	status VARCHAR(50),
+	last_check DATETIME,
+	created_at DATETIME,
+	PRIMARY KEY (id)
+);
+CREATE TABLE groups (
+	id INTEGER NOT NULL,
+	name VARCHAR(200) NOT NULL,
+	platform VARCHAR(50) NOT NULL,
+	group_id VARCHAR(500) NOT NULL,
+	link VARCHAR(1000),
+	member_count INTEGER,
+	activity_score FLOAT,
+	is_active BOOLEAN,
+	auto_discovered BOOLEAN,
+	created_at DATETIME,
+	PRIMARY KEY (id)
+);
+CREATE TABLE job_posts (
+	id INTEGER NOT NULL,
+	title VARCHAR(500) NOT NULL,
+	company VARCHAR(200),
+	location VARCHAR(200),
+	salary VARCHAR(100),
+	salary_min FLOAT,
+	salary_max FLOAT,
+	description TEXT,
+	requirements TEXT,
+	job_type VARCHAR(50),
+	work_mode VARCHAR(50),
+	experience_level VARCHAR(50),
+	source_url VARCHAR(1000),
+	source_name VARCHAR(100),
+	tracking_url VARCHAR(1000),
+	is_published BOOLEAN,
+	published_at DATETIME,
+	created_at DATETIME,
+	PRIMARY KEY (id)
+);
+CREATE INDEX ix_job_posts_job_type_created_at ON job_posts (job_type, created_at);
+CREATE INDEX ix_job_posts_experience_level_created_at ON job_posts (experience_level, created_at);
+CREATE INDEX ix_job_posts_salary_min ON job_posts (salary_min);
+CREATE INDEX ix_job_posts_work_mode_created_at ON job_posts (work_mode, created_at);
+CREATE INDEX ix_job_posts_created_at_id ON job_posts (created_at, id);
+CREATE TABLE news_posts (
+	id INTEGER NOT NULL,
+	title VARCHAR(500) NOT NULL,
+	summary TEXT,
+	content TEXT,
+	source_url VARCHAR(1000) NOT NULL,
+	source_name VARCHAR(100),
+	tracking_url VARCHAR(1000),
+	category VARCHAR(100),
+	tags TEXT,
+	is_published BOOLEAN,
+	published_at DATETIME,
+	original_published_at DATETIME,
+	created_at DATETIME,
+	PRIMARY KEY (id)
+);
+CREATE INDEX ix_news_posts_category_created_at ON news_posts (category, created_at);
+CREATE INDEX ix_news_posts_created_at_id ON news_posts (created_at, id);
+CREATE TABLE id_sequences (
+	name VARCHAR(50) NOT NULL,
+	next_value INTEGER NOT NULL,
+	PRIMARY KEY (name)
+);
+CREATE TABLE click_rollups_hourly (
+	id INTEGER NOT NULL,
+	bucket DATETIME NOT NULL,
+	content_type VARCHAR(10) NOT NULL,
+	content_id INTEGER NOT NULL,
+	group_id INTEGER NOT NULL,
+	clicks INTEGER NOT NULL,
+	PRIMARY KEY (id),
+	CONSTRAINT uq_click_rollups_hourly_key UNIQUE (bucket, content_type, content_id, group_id)
+);
+CREATE TABLE click_rollups_daily (
+	id INTEGER NOT NULL,
+	bucket DATETIME NOT NULL,
+	content_type VARCHAR(10) NOT NULL,
+	content_id INTEGER NOT NULL,
+	group_id INTEGER NOT NULL,
+	clicks INTEGER NOT NULL,
+	PRIMARY KEY (id),
+	CONSTRAINT uq_click_rollups_daily_key UNIQUE (bucket, content_type, content_id, group_id)
+);
+CREATE TABLE schema_migrations (
+	version INTEGER NOT NULL,
+	name VARCHAR(200) NOT NULL,
+	applied_at DATETIME NOT NULL,
+	PRIMARY KEY (version)
+);
+CREATE TABLE publications (
+	id INTEGER NOT NULL,
+	group_id INTEGER NOT NULL,
+	job_post_id INTEGER,
+	news_post_id INTEGER,
+	message_content TEXT NOT NULL,
+	platform_message_id VARCHAR(200),
+	status VARCHAR(50),
+	error_message TEXT,
+	sent_at DATETIME,
+	created_at DATETIME,
+	PRIMARY KEY (id),
+	FOREIGN KEY(group_id) REFERENCES groups (id),
+	FOREIGN KEY(job_post_id) REFERENCES job_posts (id),
+	FOREIGN KEY(news_post_id) REFERENCES news_posts (id)
+);
+CREATE INDEX ix_publications_job_post_id ON publications (job_post_id);
+CREATE INDEX ix_publications_group_id ON publications (group_id);
+CREATE INDEX ix_publications_status_created_at ON publications (status, created_at, id);
+CREATE INDEX ix_publications_news_post_id ON publications (news_post_id);
+CREATE INDEX ix_publications_created_at_id ON publications (created_at, id);
+CREATE TABLE click_tracking (
+	id INTEGER NOT NULL,
+	tracking_id VARCHAR(100) NOT NULL,
+	original_url VARCHAR(1000) NOT NULL,
+	job_post_id INTEGER,
+	news_post_id INTEGER,
+	group_id INTEGER,
+	ip_address VARCHAR(45),
+	user_agent VARCHAR(500),
+	referrer VARCHAR(1000),
+	clicked_at DATETIME,
+	PRIMARY KEY (id),
+	UNIQUE (tracking_id),
+	FOREIGN KEY(job_post_id) REFERENCES job_posts (id),
+	FOREIGN KEY(news_post_id) REFERENCES news_posts (id),
+	FOREIGN KEY(group_id) REFERENCES groups (id)
+);
+CREATE INDEX ix_click_tracking_job_post_id ON click_tracking (job_post_id);
+CREATE INDEX ix_click_tracking_group_id ON click_tracking (group_id);
+CREATE INDEX ix_click_tracking_news_post_id ON click_tracking (news_post_id);
+CREATE TABLE click_events (
+	id INTEGER NOT NULL,
+	click_tracking_id INTEGER NOT NULL,
+	job_post_id INTEGER,
+	news_post_id INTEGER,
+	group_id INTEGER,
+	ip_address VARCHAR(45),
+	user_agent VARCHAR(500),
+	referrer VARCHAR(1000),
+	clicked_at DATETIME,
+	PRIMARY KEY (id),
+	FOREIGN KEY(click_tracking_id) REFERENCES click_tracking (id)
+);
+CREATE INDEX ix_click_events_click_tracking_id ON click_events (click_tracking_id);
+CREATE INDEX ix_click_events_clicked_at ON click_events (clicked_at);
+INSERT INTO schema_migrations (version, name, applied_at) VALUES (1, 'índices de conteúdo e tracking', '2025-01-01 00:00:00');
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.config import Group
+from src.models.content import JobPost, NewsPost
+from src.services.click_rollups import apply_rollups
+
+ENDPOINTS = ('/api/analytics/clicks', '/api/analytics/clicks?content_type=job', '/analytics/summary')
+
+
+def add_clicks(db, groups):
+    """Cria ``groups`` grupos com cliques em uma vaga e uma notícia nos últimos dias"""
+    job = JobPost(title='Desenvolvedor Python')
+    news = NewsPost(title='Economia em alta', source_url='https://example.com/noticia')
+    db.session.add_all([job, news])
+    db.session.flush()
+
+    events = []
+    now = datetime.utcnow()
+    for index in range(groups):
+        group = Group(name=f'Grupo {index}', platform='telegram', group_id=f'-200{index}')
+        db.session.add(group)
+        db.session.flush()
+        for day in range(3):
+            clicked_at = now - timedelta(days=day)
+            events.append({'job_post_id': job.id, 'news_post_id': None, 'group_id': group.id, 'clicked_at': clicked_at})
+            events.append({'job_post_id': None, 'news_post_id': news.id, 'group_id': group.id, 'clicked_at': clicked_at})
+    apply_rollups(db.session.connection(), events)
+    db.session.commit()
+    return len(events)
+
+
+def statements_per_request(client, count_queries, path):
+    with count_queries() as statements:
+        assert client.get(path).status_code == 200
+    return statements
+
+
+@pytest.mark.parametrize('path', ENDPOINTS)
+def test_one_aggregation_regardless_of_groups(client, db, count_queries, path):
+    add_clicks(db, 3)
+    few = statements_per_request(client, count_queries, path)
+
+    add_clicks(db, 30)
+    many = statements_per_request(client, count_queries, path)
+
+    # O número de comandos não cresce com os grupos: uma única consulta aos
+    # rollups (com JOIN em groups), além da leitura das versões do ETag
+    assert len(few) == len(many) <= 2
+    assert len([statement for statement in many if 'click_rollups_daily' in statement]) == 1
+
+
+def test_click_breakdown_totals(client, db):
+    total = add_clicks(db, 4)
+
+    data = client.get('/api/analytics/clicks').get_json()['data']
+    assert data['total_clicks'] == total
+    assert sorted(data['clicks_by_group']) == [f'Grupo {index}' for index in range(4)]
+    assert set(data['clicks_by_group'].values()) == {6}
+
+    summary = client.get('/analytics/summary').get_json()['data']
+    assert summary['job_clicks_30d'] == summary['news_clicks_30d'] == total // 2
+
+
+def test_window_starts_at_the_hour_not_the_day(client, db):
+    db.session.add(Group(id=1, name='Grupo', platform='telegram', group_id='-100'))
+    start = datetime.utcnow() - timedelta(days=30)
+    clicks = [start - timedelta(hours=1), start - timedelta(days=1), start + timedelta(hours=2), datetime.utcnow()]
+    apply_rollups(db.session.connection(), [
+        {'job_post_id': 1, 'news_post_id': None, 'group_id': 1, 'clicked_at': clicked_at} for clicked_at in clicks
+    ])
+    db.session.commit()
+
+    # Antes, o dia inteiro do início da janela entrava na conta
+    assert client.get('/api/analytics/clicks?days=30').get_json()['data']['total_clicks'] == 2
+    assert client.get('/analytics/summary').get_json()['data']['job_clicks_30d'] == 2
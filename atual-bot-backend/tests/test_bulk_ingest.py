@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from src.models.content import ClickTracking, IdSequence, JobPost, NewsPost
+from src.services import bulk_ingest as bulk_module
+from src.services.bulk_ingest import bulk_ingest
+
+
+def ndjson(*records):
+    return [json.dumps(record) if isinstance(record, dict) else record for record in records]
+
+
+def job(index, **fields):
+    return dict({'title': f'Desenvolvedor {index}', 'company': f'Empresa {index}', 'source_url': f'https://example.com/{index}'}, **fields)
+
+
+def test_endpoint_reports_bad_lines_and_imports_the_rest(client, db):
+    body = '\n'.join(ndjson(
+        job(1, location='São Paulo - SP', salary='R$ 3.000 a 4.500'),
+        '{"title": ',
+        '',
+        {'company': 'Sem título'},
+        job(2, salary_min='muito'),
+        {'title': 'Vaga sem link'}
+    ))
+    response = client.post('/api/jobs/bulk', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+
+    data = response.get_json()['data']
+    assert (data['received'], data['created']) == (5, 2)
+    assert [error['line'] for error in data['errors']] == [2, 4, 5]
+
+    first, second = (db.session.get(JobPost, post_id) for post_id in data['ids'])
+    assert (first.uf, first.salary_min, first.salary_max) == ('SP', 3000, 4500)
+    # Só as vagas com source_url ganham link, já com o código no tracking_url
+    link = ClickTracking.query.one()
+    assert (link.job_post_id, link.original_url) == (first.id, 'https://example.com/1')
+    assert first.tracking_url == f'/track/{link.tracking_id}'
+    assert second.tracking_url is None
+
+
+def test_failed_chunk_reports_only_its_lines(db, monkeypatch):
+    register = bulk_module.register_fingerprints
+
+    def failing_register(content_type, items):
+        if any(fields['title'] == 'Falha' for _, fields in items):
+            raise RuntimeError('conflito no banco')
+        return register(content_type, items)
+
+    monkeypatch.setattr(bulk_module, 'register_fingerprints', failing_register)
+    result = bulk_ingest('job', ndjson(job(1), job(2), job(3), {'title': 'Falha'}, job(5)), chunk_size=2)
+
+    assert result['created'] == 3
+    assert [error['line'] for error in result['errors']] == [3, 4]
+    assert {post.title for post in JobPost.query} == {'Desenvolvedor 1', 'Desenvolvedor 2', 'Desenvolvedor 5'}
+    # O bloco que falhou não deixa links órfãos
+    assert ClickTracking.query.count() == 3
+    assert {link.job_post_id for link in ClickTracking.query} == {post.id for post in JobPost.query}
+
+
+def test_taken_link_id_rolls_back_the_chunk(db):
+    bulk_ingest('job', ndjson(job(1)))
+    # Link gravado por fora da sequência, no próximo id que ela vai entregar
+    next_id = db.session.get(IdSequence, 'click_tracking').next_value
+    db.session.add(ClickTracking(id=next_id, tracking_id='manual', original_url='https://example.com/manual'))
+    db.session.commit()
+
+    result = bulk_ingest('job', ndjson(job(2)))
+    assert result['created'] == 0
+    assert result['errors'][0]['line'] == 1
+    assert JobPost.query.count() == 1
+
+
+def test_duplicates_are_listed(db):
+    first = bulk_ingest('job', ndjson(job(1, description='Vaga para backend com Python e Flask')))
+    result = bulk_ingest('job', ndjson(
+        job(2),
+        job(1, description='Vaga para backend com Python e Flask')
+    ))
+    assert result['duplicates'] == [{'line': 2, 'id': result['ids'][1], 'duplicate_of': first['ids'][0]}]
+
+
+@pytest.mark.parametrize('record, error', [
+    ({'title': 'Notícia'}, 'URL da fonte'),
+    ({'title': 'Notícia', 'source_url': 'https://example.com', 'tags': 'python'}, 'lista'),
+    ({'title': 'Notícia', 'source_url': 'https://example.com', 'original_published_at': 'ontem'}, 'ontem'),
+    ('[1, 2]', 'objeto JSON')
+])
+def test_invalid_news(db, record, error):
+    result = bulk_ingest('news', ndjson(record))
+    assert result['created'] == 0
+    assert error in result['errors'][0]['error']
+    assert NewsPost.query.count() == 0
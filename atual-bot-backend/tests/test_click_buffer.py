@@ -0,0 +1,120 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.models.content import ClickEvent, ClickTracking
+from src.services.click_buffer import ClickEventBuffer
+
+# Link sem id: o INSERT em click_events falha (click_tracking_id NOT NULL)
+POISON = SimpleNamespace(id=None, job_post_id=None, news_post_id=None, group_id=None)
+
+
+@pytest.fixture
+def link(db):
+    link = ClickTracking(id=1, tracking_id='1', original_url='https://example.com/vaga')
+    db.session.add(link)
+    db.session.commit()
+    return link
+
+
+@pytest.fixture
+def make_buffer(app, db, monkeypatch):
+    """Cria um buffer com a thread de fundo e o fecha no fim do teste"""
+    buffers = []
+
+    def make(max_size=500, flush_interval=60):
+        monkeypatch.setitem(app.config, 'CLICK_BUFFER_MAX_SIZE', max_size)
+        monkeypatch.setitem(app.config, 'CLICK_BUFFER_FLUSH_INTERVAL', flush_interval)
+        buffer = ClickEventBuffer()
+        buffer.init_app(app)
+        buffers.append(buffer)
+        return buffer
+
+    yield make
+    for buffer in buffers:
+        buffer.close()
+
+
+def stored_clicks(db):
+    db.session.expire_all()
+    return ClickEvent.query.count()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'tempo esgotado'
+        time.sleep(0.01)
+
+
+def test_flush_when_full(db, link, make_buffer):
+    buffer = make_buffer(max_size=3)
+    for _ in range(2):
+        buffer.enqueue(link)
+    time.sleep(0.1)
+    assert buffer.written == 0
+
+    buffer.enqueue(link)
+    wait_for(lambda: buffer.written == 3)
+    assert stored_clicks(db) == 3
+
+
+def test_flush_on_interval(db, link, make_buffer):
+    buffer = make_buffer(flush_interval=0.05)
+    buffer.enqueue(link)
+    wait_for(lambda: buffer.written == 1)
+    assert buffer.pending() == 0
+
+
+def test_close_writes_what_is_left(db, link, make_buffer):
+    buffer = make_buffer()
+    buffer.enqueue(link)
+    buffer.enqueue(link)
+
+    buffer.close()
+    assert buffer.written == 2
+    assert stored_clicks(db) == 2
+
+
+def test_failed_batch_is_retried(db, link, make_buffer, monkeypatch):
+    buffer = make_buffer()
+    write = buffer._write
+    failures = iter([RuntimeError('banco indisponível')])
+
+    def flaky_write(conn, events):
+        for error in failures:
+            raise error
+        write(conn, events)
+
+    monkeypatch.setattr(buffer, '_write', flaky_write)
+    buffer.enqueue(link)
+    assert buffer.flush() == 0
+    assert buffer.pending() == 1
+
+    buffer.enqueue(link)
+    assert buffer.flush() == 2
+    assert (buffer.written, buffer.failed) == (2, 0)
+    assert stored_clicks(db) == 2
+
+
+def test_bad_event_does_not_discard_the_batch(db, link, make_buffer):
+    buffer = make_buffer()
+    buffer.enqueue(link)
+    buffer.enqueue(POISON)
+    buffer.enqueue(link)
+
+    # Primeira falha: o lote volta para a fila; na segunda, um a um
+    assert buffer.flush() == 0
+    assert buffer.flush() == 2
+    assert (buffer.written, buffer.failed, buffer.pending()) == (2, 1, 0)
+    assert stored_clicks(db) == 2
+
+
+def test_close_does_not_requeue(db, link, make_buffer):
+    buffer = make_buffer()
+    buffer.enqueue(POISON)
+    buffer.enqueue(link)
+
+    buffer.close()
+    assert (buffer.written, buffer.failed, buffer.pending()) == (1, 1, 0)
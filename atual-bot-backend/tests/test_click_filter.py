@@ -0,0 +1,106 @@
+import pytest
+
+from src.models.content import ClickTracking
+from src.services import click_filter
+from src.services.click_buffer import click_buffer
+from src.services.click_filter import DuplicateClickFilter, PreviewBotClassifier, duplicate_clicks
+from src.services.link_cache import link_cache
+
+BROWSER = 'Mozilla/5.0 (Linux; Android 14; SM-A546E) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Mobile Safari/537.36'
+
+
+@pytest.mark.parametrize('user_agent, is_bot', [
+    ('WhatsApp/2.23.20.0 A', True),
+    ('TelegramBot (like TwitterBot)', True),
+    ('facebookexternalhit/1.1 (+http://www.facebook.com/externalhit_uatext.php)', True),
+    ('Mozilla/5.0 (compatible; Discordbot/2.0; +https://discordapp.com)', True),
+    ('Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)', True),
+    ('twitterbot/1.0', True),
+    (BROWSER, False),
+    ('Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148 Instagram 334.0', False),
+    ('', False),
+    (None, False)
+])
+def test_preview_bots(user_agent, is_bot):
+    classifier = PreviewBotClassifier()
+    assert classifier.is_preview_bot(user_agent) is is_bot
+    assert classifier.stats()['short_circuited'] == int(is_bot)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(click_filter.time, 'monotonic', clock)
+    return clock
+
+
+def test_repeated_tap_within_window(clock):
+    clicks = DuplicateClickFilter(window=30)
+    assert clicks.is_duplicate('10.0.0.1', 1) is False
+    clock.now += 10
+    assert clicks.is_duplicate('10.0.0.1', 1) is True
+    # Outro IP ou outro link contam normalmente
+    assert clicks.is_duplicate('10.0.0.2', 1) is False
+    assert clicks.is_duplicate('10.0.0.1', 2) is False
+    assert clicks.stats()['short_circuited'] == 1
+
+
+def test_window_expires_after_two_generations(clock):
+    clicks = DuplicateClickFilter(window=30)
+    clicks.is_duplicate('10.0.0.1', 1)
+
+    # Depois da primeira rotação o clique ainda está na geração anterior
+    clock.now += 31
+    assert clicks.is_duplicate('10.0.0.2', 1) is False
+    assert clicks.is_duplicate('10.0.0.1', 1) is True
+
+    clock.now += 31
+    clicks.is_duplicate('10.0.0.3', 1)
+    clock.now += 31
+    assert clicks.is_duplicate('10.0.0.1', 1) is False
+
+
+def test_max_entries_rotates_early(clock):
+    clicks = DuplicateClickFilter(window=30, max_entries=2)
+    for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.3', '10.0.0.4', '10.0.0.5'):
+        clicks.is_duplicate(ip, 1)
+    assert clicks.stats()['entries'] <= 4
+    assert clicks.is_duplicate('10.0.0.1', 1) is False
+
+
+@pytest.fixture
+def enqueued(client, db, monkeypatch):
+    db.session.add(ClickTracking(id=1, tracking_id='1', original_url='https://example.com/vaga'))
+    db.session.commit()
+    link_cache.clear()
+    monkeypatch.setattr(duplicate_clicks, '_current', set())
+    monkeypatch.setattr(duplicate_clicks, '_previous', set())
+
+    events = []
+    monkeypatch.setattr(click_buffer, 'enqueue', lambda link, **fields: events.append(fields))
+    yield events
+    link_cache.clear()
+
+
+def test_preview_bot_gets_preview_without_a_click(client, enqueued):
+    response = client.get('/track/1', headers={'User-Agent': 'WhatsApp/2.23.20.0 A'})
+    assert response.status_code == 200
+    assert 'og:' in response.get_data(as_text=True)
+    assert enqueued == []
+
+
+def test_track_counts_repeated_taps_once(client, enqueued):
+    headers = {'User-Agent': BROWSER, 'X-Forwarded-For': '200.1.1.1, 10.0.0.1'}
+    for _ in range(3):
+        assert client.get('/track/1', headers=headers).status_code == 302
+    assert client.get('/track/1', headers={'User-Agent': BROWSER, 'X-Forwarded-For': '200.1.1.2'}).status_code == 302
+
+    assert [event['ip_address'] for event in enqueued] == ['200.1.1.1', '200.1.1.2']
@@ -0,0 +1,115 @@
+import gzip
+import json
+
+import pytest
+from flask import Response
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+from src.models.content import JobPost
+from src.services import compression as compression_module
+from src.services.compression import choose_encoding, compression
+
+
+def accept(header):
+    return parse_accept_header(header, Accept)
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    """Oferece 'br' mesmo sem o pacote brotli (só a escolha é testada)"""
+    monkeypatch.setitem(compression_module.ENCODERS, 'br', compression_module._Gzip)
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip', 'gzip'),
+    ('gzip, deflate, br', 'br'),
+    ('br;q=0.5, gzip;q=0.8', 'gzip'),
+    ('gzip;q=0, br;q=0.1', 'br'),
+    ('gzip;q=0', None),
+    ('deflate', None),
+    ('identity', None),
+    ('*', 'br'),
+    ('*;q=0.3, br;q=0', 'gzip'),
+    ('', None)
+])
+def test_choose_encoding(with_brotli, header, expected):
+    assert choose_encoding(accept(header)) == expected
+
+
+def test_brotli_is_not_offered_without_the_package():
+    if 'br' in compression_module.ENCODERS:
+        pytest.skip('brotli instalado')
+    assert choose_encoding(accept('br')) is None
+
+
+def compressed(app, response, encoding='gzip'):
+    with app.test_request_context(headers={'Accept-Encoding': encoding}):
+        return compression.compress_response(response)
+
+
+BODY = json.dumps({'data': ['vaga'] * 500})
+
+
+def test_large_json_is_gzipped_with_weak_etag(app):
+    response = Response(BODY, mimetype='application/json')
+    response.set_etag('abc')
+    response = compressed(app, response)
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    assert response.get_etag() == ('abc', True)
+    assert gzip.decompress(response.get_data()).decode('utf-8') == BODY
+
+
+@pytest.mark.parametrize('response', [
+    # Abaixo de COMPRESS_MIN_SIZE
+    Response('{"ok": true}', mimetype='application/json'),
+    # Tipo que já vem comprimido
+    Response(b'\x89PNG' + b'0' * 4096, mimetype='image/png'),
+    # Corpo já codificado pela view
+    Response(gzip.compress(BODY.encode('utf-8')), mimetype='application/json', headers={'Content-Encoding': 'gzip'}),
+    # Arquivos servidos direto (send_file)
+    Response(BODY, mimetype='application/json', direct_passthrough=True),
+    # Só respostas 200
+    Response(BODY, status=206, mimetype='application/json')
+])
+def test_skipped(app, response):
+    before = (response.get_data(), response.headers.get('Content-Encoding'))
+    response = compressed(app, response)
+    assert (response.get_data(), response.headers.get('Content-Encoding')) == before
+
+
+def test_without_accept_encoding(app):
+    response = compressed(app, Response(BODY, mimetype='application/json'), encoding='')
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.vary
+
+
+def test_streamed_export_is_compressed_chunk_by_chunk(client, db):
+    for index in range(300):
+        db.session.add(JobPost(title=f'Desenvolvedor Python {index}', company='Atual'))
+    db.session.commit()
+
+    response = client.get('/api/jobs/export?format=ndjson', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+
+    lines = gzip.decompress(response.get_data()).decode('utf-8').splitlines()
+    assert len(lines) == 300
+    assert json.loads(lines[0])['title'].startswith('Desenvolvedor Python')
+
+
+def test_compressed_listing_revalidates_with_weak_etag(client, db):
+    for index in range(50):
+        db.session.add(JobPost(title=f'Desenvolvedor Python {index}', company='Atual'))
+    db.session.commit()
+
+    first = client.get('/api/jobs?per_page=50', headers={'Accept-Encoding': 'gzip'})
+    assert first.headers['Content-Encoding'] == 'gzip'
+    assert first.headers['ETag'].startswith('W/')
+
+    again = client.get('/api/jobs?per_page=50', headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
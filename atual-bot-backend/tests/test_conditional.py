@@ -0,0 +1,62 @@
+import pytest
+
+from src.models.config import Group
+from src.models.content import JobPost, NewsPost, Publication
+
+
+@pytest.fixture
+def publication(db):
+    group = Group(name='Grupo', platform='telegram', group_id='-100')
+    job = JobPost(title='Desenvolvedor Python')
+    db.session.add_all([group, job])
+    db.session.flush()
+    db.session.add(Publication(group_id=group.id, job_post_id=job.id, message_content='vaga'))
+    db.session.commit()
+    return job
+
+
+def revalidate(client, path, etag):
+    return client.get(path, headers={'If-None-Match': etag})
+
+
+def test_not_modified_until_a_write(client, db, publication):
+    first = client.get('/api/jobs')
+    etag = first.headers['ETag'].strip('"')
+    assert first.headers['Cache-Control'] == 'no-cache'
+
+    response = revalidate(client, '/api/jobs', etag)
+    assert response.status_code == 304
+    assert response.get_data() == b''
+
+    # Escrita em outro recurso não muda o ETag das vagas
+    db.session.add(NewsPost(title='Notícia', source_url='https://example.com'))
+    db.session.commit()
+    assert revalidate(client, '/api/jobs', etag).status_code == 304
+
+    db.session.add(JobPost(title='Nova vaga'))
+    db.session.commit()
+    response = revalidate(client, '/api/jobs', etag)
+    assert response.status_code == 200
+    assert response.headers['ETag'].strip('"') != etag
+
+
+def test_publications_follow_content_titles(client, db, publication):
+    first = client.get('/api/publications')
+    etag = first.headers['ETag'].strip('"')
+    assert first.get_json()['data']['publications'][0]['content_title'] == 'Desenvolvedor Python'
+    assert revalidate(client, '/api/publications', etag).status_code == 304
+
+    publication.title = 'Desenvolvedora Python'
+    db.session.commit()
+    response = revalidate(client, '/api/publications', etag)
+    assert response.status_code == 200
+    assert response.get_json()['data']['publications'][0]['content_title'] == 'Desenvolvedora Python'
+
+
+def test_core_write_changes_the_etag(client, db, publication):
+    etag = client.get('/api/publications').headers['ETag'].strip('"')
+    publication_id = Publication.query.one().id
+
+    response = client.post('/api/publications/status/bulk', json=[{'id': publication_id, 'status': 'sent'}])
+    assert response.status_code == 200
+    assert revalidate(client, '/api/publications', etag).status_code == 200
@@ -0,0 +1,119 @@
+import hashlib
+import random
+
+import pytest
+
+from src.models.dedup import ContentFingerprint, FingerprintBand
+from src.services.dedup import (
+    BAND_BITS, BANDS, HEAD_WEIGHT, MAX_DISTANCE, SIMHASH_BITS, _to_signed, _to_unsigned, bands,
+    fingerprint, hamming, register_fingerprints, simhash
+)
+
+JOB = {
+    'title': 'Desenvolvedor Python Pleno',
+    'company': 'Atual Tecnologia',
+    'location': 'São Paulo - SP',
+    'description': (
+        'Buscamos pessoa desenvolvedora Python para atuar no time de plataforma, construindo APIs REST com Flask e '
+        'SQLAlchemy, integrações com filas de mensagens, rotinas de importação de dados e automação de testes. Você vai '
+        'participar do desenho das soluções, revisar código dos colegas, acompanhar métricas de produção e colaborar com '
+        'produto e design para entregar funcionalidades com qualidade. Trabalhamos com deploy contínuo, observabilidade e '
+        'documentação viva.'
+    ),
+    'requirements': 'Experiência com Python, bancos relacionais, Git e testes automatizados.'
+}
+
+
+def reference_simhash(head_tokens, body_tokens):
+    """SimHash bit a bit, sem o truque das faixas de 32 bits"""
+    features = {}
+    for token in head_tokens:
+        features[token] = features.get(token, 0) + HEAD_WEIGHT
+    for first, second in zip(body_tokens, body_tokens[1:]):
+        features[f'{first} {second}'] = features.get(f'{first} {second}', 0) + 1
+
+    sums = [0] * SIMHASH_BITS
+    for feature, weight in features.items():
+        value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+        for bit in range(SIMHASH_BITS):
+            if value >> bit & 1:
+                sums[bit] += weight
+    total = sum(features.values())
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if 2 * sums[bit] > total)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_simhash_matches_bitwise_reference(seed):
+    rng = random.Random(seed)
+    words = [f'palavra{index}' for index in range(50)]
+    head = rng.choices(words, k=5)
+    body = rng.choices(words, k=rng.randint(0, 200))
+    assert simhash(head, body) == reference_simhash(head, body)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_close_hashes_share_a_band(seed):
+    rng = random.Random(seed)
+    value = rng.getrandbits(SIMHASH_BITS)
+    flipped = value
+    for bit in rng.sample(range(SIMHASH_BITS), MAX_DISTANCE):
+        flipped ^= 1 << bit
+    assert hamming(value, flipped) == MAX_DISTANCE
+    assert set(bands(value)) & set(bands(flipped))
+
+
+def test_signed_storage_round_trip():
+    for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+        assert -(1 << 63) <= _to_signed(value) < 1 << 63
+        assert _to_unsigned(_to_signed(value)) == value
+
+
+def test_exact_copy_ignores_case_accents_and_short_words(db):
+    first = register_fingerprints('job', [(1, JOB)])
+    copy = dict(JOB, title='DESENVOLVEDOR PYTHON PLENO', location='Sao Paulo SP', description=JOB['description'] + ' e')
+    assert first == {1: None}
+    assert register_fingerprints('job', [(2, copy)]) == {2: 1}
+    assert db.session.query(ContentFingerprint.distance).filter_by(content_id=2).scalar() == 0
+    # Cópias exatas não entram nos buckets
+    assert FingerprintBand.query.filter_by(content_id=2).count() == 0
+
+
+def test_near_copy_in_the_same_batch_points_to_the_original(db):
+    edited = dict(JOB, requirements=JOB['requirements'] + ' Docker.')
+    copy_of_edited = dict(edited, title=edited['title'].upper())
+    assert hamming(fingerprint('job', JOB)[1], fingerprint('job', edited)[1]) <= MAX_DISTANCE
+
+    results = register_fingerprints('job', [(1, JOB), (2, edited), (3, copy_of_edited)])
+    # A cópia da cópia aponta para o original do cluster, não para a 2
+    assert results == {1: None, 2: 1, 3: 1}
+
+
+def seed_fingerprint(db, content_id, value):
+    db.session.add(ContentFingerprint(content_type='job', content_id=content_id, exact_hash=f'{content_id:040}', simhash=_to_signed(value)))
+    for band, band_value in bands(value):
+        db.session.add(FingerprintBand(content_type='job', band=band, value=band_value, content_id=content_id))
+    db.session.flush()
+
+
+def flip_bits(value, bits):
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+@pytest.mark.parametrize('bits, duplicate', [
+    # Mesma faixa 0, mas as outras três faixas inteiras trocadas: colisão de bucket, não duplicado
+    (range(BAND_BITS, SIMHASH_BITS), False),
+    # Três bits na faixa 1: candidato achado pelas faixas 0, 2 e 3
+    ([BAND_BITS, BAND_BITS + 1, BAND_BITS + 2], True),
+    # Um bit por faixa: nenhuma faixa em comum e distância acima do limite
+    ([band * BAND_BITS for band in range(BANDS)], False),
+    # Quatro bits na mesma faixa: faixas em comum, mas distância 4
+    ([0, 1, 2, 3], False)
+])
+def test_band_collisions(db, bits, duplicate):
+    _, value = fingerprint('job', JOB)
+    seed_fingerprint(db, 100, flip_bits(value, bits))
+
+    results = register_fingerprints('job', [(1, JOB)])
+    assert results[1] == (100 if duplicate else None)
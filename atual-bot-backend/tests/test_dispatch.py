@@ -0,0 +1,231 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.models.config import Group
+from src.models.content import JobPost, Publication
+from src.services import dispatch
+from src.services.dispatch import PublicationDispatcher, TokenBucket, claim_publications, release_stale_claims
+from src.services.platforms import SendError
+
+NOW = datetime(2025, 5, 6, 12, 0)
+
+
+@pytest.fixture
+def group(db):
+    group = Group(name='Vagas SP', platform='telegram', group_id='-1001', is_active=True)
+    db.session.add(group)
+    db.session.commit()
+    return group
+
+
+def add_publication(db, group, status='pending', next_attempt_at=NOW, **fields):
+    job = JobPost(title='Vaga', source_url=f'https://example.com/{datetime.utcnow().timestamp()}')
+    db.session.add(job)
+    db.session.flush()
+    publication = Publication(
+        group_id=group.id, job_post_id=job.id, message_content='Vaga', status=status,
+        next_attempt_at=next_attempt_at, **fields
+    )
+    db.session.add(publication)
+    db.session.commit()
+    return publication.id
+
+
+def status_of(db, publication_id):
+    db.session.expire_all()
+    return db.session.get(Publication, publication_id).status
+
+
+def test_claim_takes_only_due_pending_rows(db, group):
+    due = add_publication(db, group, next_attempt_at=NOW - timedelta(minutes=1))
+    future = add_publication(db, group, next_attempt_at=NOW + timedelta(minutes=1))
+    sent = add_publication(db, group, status='sent', next_attempt_at=None)
+    sending = add_publication(db, group, status='sending', claimed_at=NOW)
+    facebook = Group(name='Vagas FB', platform='facebook', group_id='fb-1')
+    db.session.add(facebook)
+    db.session.commit()
+    other_platform = add_publication(db, facebook)
+
+    with db.engine.begin() as conn:
+        claimed = claim_publications(conn, 'telegram', 10, NOW)
+    assert claimed == [{'id': due, 'chat_id': '-1001', 'message': 'Vaga', 'attempts': 0}]
+    assert [status_of(db, id) for id in (due, future, sent, sending, other_platform)] == [
+        'sending', 'pending', 'sent', 'sending', 'pending'
+    ]
+
+    with db.engine.begin() as conn:
+        assert claim_publications(conn, 'telegram', 10, NOW) == []
+
+
+def test_claim_respects_limit_in_due_order(db, group):
+    ids = [add_publication(db, group, next_attempt_at=NOW - timedelta(minutes=minutes)) for minutes in (1, 3, 2)]
+
+    with db.engine.begin() as conn:
+        claimed = claim_publications(conn, 'telegram', 2, NOW)
+    assert sorted(item['id'] for item in claimed) == sorted([ids[1], ids[2]])
+
+
+class RecordingConnection:
+    """Conexão PostgreSQL de mentira: guarda o comando em vez de executar"""
+
+    dialect = postgresql.dialect()
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=self.dialect)))
+        return self
+
+    def all(self):
+        return []
+
+
+def test_claim_rechecks_status_and_skips_locked_rows_on_postgresql():
+    conn = RecordingConnection()
+    assert claim_publications(conn, 'telegram', 5, NOW) == []
+
+    (statement,) = conn.statements
+    # Depois da subconsulta que escolhe os ids
+    outer = statement.split('FOR UPDATE OF publications SKIP LOCKED)', 1)[1]
+    assert 'publications.status =' in outer
+    assert 'publications.next_attempt_at <=' in outer
+
+
+@pytest.fixture
+def dispatcher(db):
+    """Dispatcher sem thread, com o FakeAdapter no lugar do Telegram"""
+    dispatcher = PublicationDispatcher(max_attempts=3, retry_base=30)
+    dispatcher.adapter_overrides = {'telegram': 'fake'}
+    dispatcher.limits = {'telegram': {'concurrency': 1, 'rate': 1000, 'burst': 1000}}
+    dispatcher._engine = db.engine
+    with db.engine.begin() as conn:
+        dispatcher._refresh_lanes(conn)
+    yield dispatcher
+    dispatcher.close()
+
+
+def adapter(dispatcher):
+    return dispatcher.lanes['telegram'].adapter
+
+
+def cycle(dispatcher, timeout=5):
+    """Reserva, espera os envios e grava os resultados; retorna o número reservado"""
+    claimed = dispatcher.run_once(force=True)
+    deadline = time.monotonic() + timeout
+    while dispatcher._results.qsize() < claimed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with dispatcher._cycle_lock:
+        dispatcher._write_results()
+    return claimed
+
+
+def publication(db, publication_id):
+    db.session.expire_all()
+    return db.session.get(Publication, publication_id)
+
+
+def test_dispatcher_sends_due_publications(db, group, dispatcher):
+    due = add_publication(db, group, next_attempt_at=datetime.utcnow() - timedelta(minutes=1))
+    future = add_publication(db, group, next_attempt_at=datetime.utcnow() + timedelta(hours=1))
+
+    assert cycle(dispatcher) == 1
+    assert adapter(dispatcher).sent == [('-1001', 'Vaga')]
+    sent = publication(db, due)
+    assert (sent.status, sent.attempts, sent.platform_message_id, sent.claimed_at) == ('sent', 1, 'fake-1', None)
+    assert publication(db, future).status == 'pending'
+    assert cycle(dispatcher) == 0
+
+
+def test_retryable_error_backs_off(db, group, dispatcher):
+    publication_id = add_publication(db, group, next_attempt_at=datetime.utcnow())
+    adapter(dispatcher).failures['-1001'] = [SendError('Too Many Requests')]
+
+    before = datetime.utcnow()
+    assert cycle(dispatcher) == 1
+    retried = publication(db, publication_id)
+    assert (retried.status, retried.attempts, retried.error_message) == ('pending', 1, 'Too Many Requests')
+    # retry_base * 2 ** 0 com jitter de ±20%
+    assert before + timedelta(seconds=24) <= retried.next_attempt_at <= datetime.utcnow() + timedelta(seconds=36)
+    assert dispatcher.retried == 1
+
+    # Ainda não venceu: nada é reservado
+    assert cycle(dispatcher) == 0
+    assert adapter(dispatcher).sent == []
+
+
+def test_retry_after_from_platform_wins_over_backoff(db, group, dispatcher):
+    publication_id = add_publication(db, group, next_attempt_at=datetime.utcnow(), attempts=1)
+    adapter(dispatcher).failures['-1001'] = [SendError('Flood', retry_after=600)]
+
+    before = datetime.utcnow()
+    cycle(dispatcher)
+    retried = publication(db, publication_id)
+    assert retried.attempts == 2
+    assert retried.next_attempt_at >= before + timedelta(seconds=600)
+
+
+def test_permanent_error_fails_without_retry(db, group, dispatcher):
+    publication_id = add_publication(db, group, next_attempt_at=datetime.utcnow())
+    adapter(dispatcher).failures['-1001'] = [SendError('chat not found', retryable=False)]
+
+    cycle(dispatcher)
+    failed = publication(db, publication_id)
+    assert (failed.status, failed.attempts, failed.error_message, failed.next_attempt_at) == ('failed', 1, 'chat not found', None)
+    assert dispatcher.failed == 1
+
+
+def test_retryable_error_fails_after_max_attempts(db, group, dispatcher):
+    publication_id = add_publication(db, group, next_attempt_at=datetime.utcnow(), attempts=2)
+    adapter(dispatcher).failures['-1001'] = [SendError('Bad Gateway')]
+
+    cycle(dispatcher)
+    failed = publication(db, publication_id)
+    assert (failed.status, failed.attempts) == ('failed', 3)
+
+
+def test_stale_claims_go_back_to_the_queue(db, group):
+    now = datetime.utcnow()
+    stale = add_publication(db, group, status='sending', claimed_at=now - timedelta(minutes=11))
+    recent = add_publication(db, group, status='sending', claimed_at=now - timedelta(minutes=1))
+
+    with db.engine.begin() as conn:
+        assert release_stale_claims(conn, 600, now) == 1
+    released = publication(db, stale)
+    assert (released.status, released.claimed_at, released.next_attempt_at) == ('pending', None, now)
+    assert publication(db, recent).status == 'sending'
+
+
+def test_dispatcher_resends_stale_claims(db, group, dispatcher):
+    stale = add_publication(db, group, status='sending', claimed_at=datetime.utcnow() - timedelta(minutes=11))
+
+    assert cycle(dispatcher) == 1
+    assert publication(db, stale).status == 'sent'
+    assert adapter(dispatcher).sent == [('-1001', 'Vaga')]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_spaces_sends(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(dispatch.time, 'monotonic', clock)
+    bucket = TokenBucket(rate=10, burst=2)
+
+    assert [bucket.reserve() for _ in range(2)] == [0.0, 0.0]
+    # Cada reserva seguinte espera mais 1/rate
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.1, 0.2, 0.3])
+
+    # Depois de esperar tudo, o saldo volta a zero e então reabastece até o burst
+    clock.now += 0.3
+    assert bucket.reserve() == pytest.approx(0.1)
+    clock.now += 10
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.0, 0.0, 0.1])
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+from sqlalchemy import func
+from werkzeug.datastructures import MultiDict
+
+from src.models.content import JobPost
+from src.routes.content import build_jobs_query
+from src.services.bulk_ingest import bulk_ingest
+from src.services.facets import FACET_COLUMNS
+
+FILTERS = [
+    {},
+    {'uf': 'sp'},
+    {'job_type': 'CLT', 'work_mode': 'Remoto'},
+    {'q': 'python'},
+    {'salary_min': '4000'},
+    {'uf': 'RJ', 'q': 'dados'}
+]
+
+
+def reference(filters):
+    """O que as facetas devem dizer: um GROUP BY simples por coluna"""
+    query = build_jobs_query(MultiDict(filters)).order_by(None)
+    facets = {}
+    for column in FACET_COLUMNS:
+        attribute = getattr(JobPost, column)
+        facets[column] = {
+            ('true' if value else 'false') if isinstance(value, bool) else value: count
+            for value, count in query.with_entities(attribute, func.count()).group_by(attribute)
+            if value is not None
+        }
+    return {'total': query.count(), 'facets': facets}
+
+
+def assert_matches_group_by(client, db):
+    for filters in FILTERS:
+        response = client.get('/api/jobs/facets', query_string=filters)
+        assert response.status_code == 200
+        db.session.rollback()
+        assert response.get_json()['data'] == reference(filters), filters
+
+
+def add_job(db, title, **fields):
+    job = JobPost(title=title, **fields)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+@pytest.fixture
+def jobs(db):
+    add_job(db, 'Desenvolvedor Python', uf='SP', job_type='CLT', work_mode='Remoto', experience_level='Pleno', salary_min=5000)
+    add_job(db, 'Analista de Dados', uf='RJ', job_type='PJ', work_mode='Presencial', salary_min=3000)
+    add_job(db, 'Engenheiro de Dados Python', uf='SP', job_type='CLT', work_mode='Híbrido', experience_level='Sênior')
+    add_job(db, 'Estágio em TI')
+
+
+def test_counts_match_group_by(client, db, jobs):
+    assert_matches_group_by(client, db)
+
+
+def test_counts_follow_writes(client, db, jobs):
+    # Carrega o histograma e o cache filtrado antes das escritas
+    assert_matches_group_by(client, db)
+
+    job = add_job(db, 'Cientista de Dados Python', uf='RJ', job_type='CLT', work_mode='Remoto')
+    assert_matches_group_by(client, db)
+
+    job.uf = 'MG'
+    job.is_published = True
+    db.session.commit()
+    assert_matches_group_by(client, db)
+
+    db.session.delete(JobPost.query.filter_by(title='Analista de Dados').one())
+    db.session.commit()
+    assert_matches_group_by(client, db)
+
+    bulk_ingest('job', [json.dumps({'title': 'Dev Python Júnior', 'location': 'Campinas - SP', 'job_type': 'CLT', 'work_mode': 'Remoto'})])
+    assert_matches_group_by(client, db)
+
+
+def test_update_of_unloaded_row_reloads_the_histogram(client, db, jobs):
+    assert_matches_group_by(client, db)
+    job_id = JobPost.query.filter_by(title='Estágio em TI').one().id
+    db.session.expunge_all()
+
+    # Valor antigo desconhecido: o histograma é recarregado em vez de ajustado
+    job = db.session.get(JobPost, job_id)
+    db.session.expire(job, ['uf'])
+    job.uf = 'PE'
+    db.session.commit()
+    assert_matches_group_by(client, db)
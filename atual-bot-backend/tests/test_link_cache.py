@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+from src.models.content import ClickTracking, JobPost
+from src.services.link_cache import LinkCache, link_cache
+from src.services.publications import discard_unused_links
+
+
+@pytest.fixture
+def cache(db):
+    link_cache.clear()
+    yield link_cache
+    link_cache.clear()
+
+
+@pytest.fixture
+def link(db):
+    job = JobPost(title='Desenvolvedor Python')
+    db.session.add(job)
+    db.session.flush()
+    db.session.add(ClickTracking(id=7, tracking_id='7', original_url='https://example.com/vaga', job_post_id=job.id, group_id=3))
+    db.session.commit()
+    return job
+
+
+def test_hit_does_not_query(db, cache, link, count_queries):
+    resolved = cache.resolve('7')
+    assert (resolved.id, resolved.content_type, resolved.title) == (7, 'job', 'Vaga: Desenvolvedor Python')
+
+    hits = cache.stats()['hits']
+    with count_queries() as statements:
+        assert cache.resolve('7') == resolved
+    assert statements == []
+    assert cache.stats()['hits'] == hits + 1
+
+
+def test_miss_is_not_cached(db, cache):
+    assert cache.resolve('8') is None
+    db.session.add(ClickTracking(id=8, tracking_id='8', original_url='https://example.com/nova'))
+    db.session.commit()
+    assert cache.resolve('8').original_url == 'https://example.com/nova'
+
+
+def test_entries_expire(db, link):
+    cache = LinkCache(ttl=0.05)
+    cache.resolve('7')
+    time.sleep(0.06)
+
+    cache.resolve('7')
+    assert cache.stats()['hits'] == 0
+    assert cache.stats()['evictions'] == 1
+
+
+def test_content_edit_invalidates_after_commit(db, cache, link):
+    cache.resolve('7')
+    link.title = 'Desenvolvedora Python'
+    db.session.flush()
+    # Antes do commit o cache ainda serve o valor antigo
+    assert cache.resolve('7').title == 'Vaga: Desenvolvedor Python'
+
+    db.session.commit()
+    assert cache.resolve('7').title == 'Vaga: Desenvolvedora Python'
+
+
+def test_link_delete_invalidates(db, cache, link):
+    cache.resolve('7')
+    db.session.delete(db.session.get(ClickTracking, 7))
+    db.session.commit()
+    assert cache.resolve('7') is None
+
+
+def test_core_delete_invalidates_after_commit(db, cache, link):
+    cache.resolve('7')
+    discard_unused_links([{'id': 7, 'group_id': 3}], created=[])
+    db.session.rollback()
+    assert cache.resolve('7') is not None
+
+    discard_unused_links([{'id': 7, 'group_id': 3}], created=[])
+    db.session.commit()
+    assert cache.resolve('7') is None
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+from src.services import platforms
+from src.services.publications import LINK_PLACEHOLDER, render_message
+
+JOB = SimpleNamespace(
+    title='Dev C++ & <Go> _pleno_ *sr* [remoto]', company='Acme_Tech', location='São Paulo - SP',
+    salary='R$ 5.000 a R$ 7.000', work_mode=None, job_type=None, tracking_url=None,
+    source_url='https://example.com/vaga?a=1&b=2'
+)
+
+
+def test_telegram_message_is_html_escaped():
+    message = render_message('job', JOB, 'telegram')
+
+    assert '<b>NOVA VAGA DE EMPREGO</b>' in message
+    assert '<b>Dev C++ &amp; &lt;Go&gt; _pleno_ *sr* [remoto]</b>' in message
+    # Markdown não tem efeito em parse_mode HTML: "_" e "*" ficam como estão
+    assert 'Acme_Tech' in message
+    assert LINK_PLACEHOLDER in message
+
+
+def test_whatsapp_keeps_star_bold_and_raw_text():
+    message = render_message('job', JOB, 'whatsapp')
+
+    assert '*NOVA VAGA DE EMPREGO*' in message
+    assert f'*{JOB.title}*' in message
+
+
+def test_facebook_message_has_no_markup():
+    message = render_message('job', JOB, 'facebook')
+
+    assert 'NOVA VAGA DE EMPREGO\n' in message
+    assert '<b>' not in message
+    assert f'📋 {JOB.title}\n' in message
+
+
+def test_news_summary_is_escaped_before_truncation_marker():
+    news = SimpleNamespace(title='A & B', summary='<' * 250, source_name='R&D', tracking_url=None, source_url='https://example.com')
+    message = render_message('news', news, 'telegram')
+
+    assert '<b>A &amp; B</b>' in message
+    assert '&lt;' * 200 + '...' in message
+    assert 'Fonte: R&amp;D' in message
+
+
+def test_telegram_adapter_sends_html_parse_mode(monkeypatch):
+    requests = []
+
+    def request(url, payload=None, headers=None, form=False):
+        requests.append(payload)
+        return {'result': {'message_id': 7}}
+
+    monkeypatch.setattr(platforms, '_request', request)
+    assert platforms.TelegramAdapter('token').send('-1001', '<b>oi</b>') == '7'
+    assert requests == [{'chat_id': '-1001', 'text': '<b>oi</b>', 'parse_mode': 'HTML'}]
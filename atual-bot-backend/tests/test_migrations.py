@@ -0,0 +1,61 @@
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from src.migrations import MIGRATIONS, applied_versions, run_migrations
+from src.models import db
+
+SCHEMAS_DIR = os.path.join(os.path.dirname(__file__), 'schemas')
+SCHEMAS = sorted(name[:-len('.sql')] for name in os.listdir(SCHEMAS_DIR) if name.endswith('.sql'))
+
+
+def boot(path):
+    """O que src/main.py faz com o banco na inicialização"""
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine)
+    run_migrations(engine)
+    return engine
+
+
+def assert_current_schema(engine):
+    inspector = inspect(engine)
+    for table in db.metadata.sorted_tables:
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        assert {column.name for column in table.columns} <= columns, table.name
+        indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        assert {index.name for index in table.indexes} <= indexes, table.name
+    assert applied_versions(engine) == {version for version, _, _ in MIGRATIONS}
+
+
+def test_fresh_database(tmp_path):
+    assert_current_schema(boot(tmp_path / 'app.db'))
+
+
+@pytest.mark.parametrize('schema', SCHEMAS)
+def test_upgrade_from_older_schema(tmp_path, schema):
+    path = tmp_path / 'app.db'
+    conn = sqlite3.connect(path)
+    with open(os.path.join(SCHEMAS_DIR, f'{schema}.sql'), encoding='utf-8') as f:
+        conn.executescript(f.read())
+    # Dados de antes da migração, incluindo um envio repetido
+    conn.executescript("""
+        INSERT INTO groups (id, name, platform, group_id, is_active) VALUES (1, 'Grupo', 'telegram', '-100', 1);
+        INSERT INTO job_posts (id, title, location, created_at) VALUES (1, 'Dev Python', 'São Paulo - SP', '2024-05-01');
+        INSERT INTO publications (group_id, job_post_id, message_content, status, created_at)
+            VALUES (1, 1, 'vaga', 'sent', '2024-05-01'), (1, 1, 'vaga', 'sent', '2024-05-02');
+    """)
+    conn.commit()
+    conn.close()
+
+    engine = boot(path)
+    assert_current_schema(engine)
+
+    with engine.connect() as conn:
+        campaigns = conn.execute(text('SELECT campaign FROM publications')).scalars().all()
+    # Envios antigos (mesmo repetidos) ficam sem chave de deduplicação
+    assert campaigns == [None, None]
+
+    # Subir de novo não aplica nada
+    assert run_migrations(engine) == []
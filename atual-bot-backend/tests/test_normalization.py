@@ -0,0 +1,73 @@
+import pytest
+
+from src.services.normalization import LocationParser, location_parser, normalize_job_rows, parse_salary
+
+STATES = ['SP - São Paulo', 'RJ - Rio de Janeiro', 'PR - Paraná', 'MG - Minas Gerais', 'RS - Rio Grande do Sul', 'PE - Pernambuco']
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('R$ 3.000 a 4.500', (3000.0, 4500.0)),
+    ('R$ 2.500,00 a R$ 3.000,00', (2500.0, 3000.0)),
+    ('R$ 3.000 - R$ 4.500 + bônus', (3000.0, 4500.0)),
+    ('de 3.500 a 5.000 reais', (3500.0, 5000.0)),
+    ('R$ 4.000', (4000.0, 4000.0)),
+    ('R$3500', (3500.0, 3500.0)),
+    ('a combinar', (None, None)),
+    ('A Combinar', (None, None)),
+    ('', (None, None)),
+    ('R$ 5 mil', (5000.0, 5000.0)),
+    ('R$ 2,5 mil', (2500.0, 2500.0)),
+    ('10K', (10000.0, 10000.0)),
+    ('3k a 5k', (3000.0, 5000.0)),
+    ('entre 3 e 4 mil', (3000.0, 4000.0)),
+    ('R$ 3 a R$ 5 mil', (3000.0, 5000.0)),
+    ('3 - 5k', (3000.0, 5000.0)),
+    ('até R$ 5 mil', (None, 5000.0)),
+    ('a partir de 3k', (3000.0, None)),
+    ('Acima de R$ 6.000', (6000.0, None)),
+    # Valores pequenos sem "mil" são horas, dias ou benefícios
+    ('R$ 25/hora', (None, None)),
+    ('R$ 1.500/mês + VR de R$ 30 por dia', (1500.0, 1500.0)),
+    ('2 vagas, R$ 3 mil', (3000.0, 3000.0))
+])
+def test_parse_salary(text, expected):
+    assert parse_salary(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('São Paulo - SP', ('São Paulo', 'SP')),
+    ('Curitiba/PR', ('Curitiba', 'PR')),
+    ('Rio de Janeiro, RJ', ('Rio de Janeiro', 'RJ')),
+    ('Belo Horizonte (MG)', ('Belo Horizonte', 'MG')),
+    ('Porto Alegre - Rio Grande do Sul', ('Porto Alegre', 'RS')),
+    ('Híbrido - Recife/PE', ('Recife', 'PE')),
+    ('  Niterói  -  rj ', ('Niterói', 'RJ')),
+    ('Minas Gerais', (None, 'MG')),
+    ('Remoto', (None, None)),
+    ('Remoto - Brasil', (None, None)),
+    ('Home Office', (None, None)),
+    # UF desconhecida: a cidade fica, o estado não
+    ('Lisboa - PT', ('Lisboa', None)),
+    ('Campinas - XX', ('Campinas', None)),
+    ('', (None, None)),
+    (None, (None, None))
+])
+def test_parse_location(text, expected):
+    assert LocationParser(STATES).parse(text) == expected
+
+
+def test_normalize_rows_keeps_client_values(db):
+    rows = normalize_job_rows([
+        {'location': 'São Paulo - SP', 'salary': 'R$ 3.000 a 4.500', 'salary_min': None, 'salary_max': None},
+        {'location': 'Remoto', 'salary': 'R$ 3.000 a 4.500', 'salary_min': 3200, 'salary_max': None},
+        {'location': None, 'salary': None}
+    ])
+    assert [(row['city'], row['uf'], row.get('salary_min'), row.get('salary_max')) for row in rows] == [
+        ('São Paulo', 'SP', 3000.0, 4500.0),
+        (None, None, 3200, 4500.0),
+        (None, None, None, None)
+    ]
+
+
+def test_parser_follows_configured_states(db):
+    assert 'SP' in location_parser().codes
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.config import Group
+from src.models.content import JobPost, NewsPost, Publication
+
+TOTAL = 23
+
+
+def created_at(index):
+    # Vários itens no mesmo instante: o id desempata a ordem do cursor
+    return datetime(2025, 1, 1) + timedelta(hours=index // 3)
+
+
+@pytest.fixture
+def listings(db):
+    group = Group(name='Grupo', platform='telegram', group_id='-100')
+    db.session.add(group)
+    db.session.flush()
+    for index in range(TOTAL):
+        job = JobPost(title=f'Vaga {index}', created_at=created_at(index))
+        db.session.add(job)
+        db.session.add(NewsPost(title=f'Notícia {index}', source_url=f'https://example.com/{index}', created_at=created_at(index)))
+        db.session.flush()
+        db.session.add(Publication(group_id=group.id, job_post_id=job.id, message_content='vaga', created_at=created_at(index)))
+    db.session.commit()
+
+
+def walk(client, path, key, after='', **args):
+    """Segue next_cursor a partir de ``after`` e retorna as páginas de itens"""
+    pages = []
+    while after is not None:
+        response = client.get(path, query_string=dict(args, after=after))
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        pages.append(data[key])
+        after = data['pagination']['next_cursor']
+        assert data['pagination']['has_next'] is (after is not None)
+    return pages
+
+
+@pytest.mark.parametrize('path, key', [
+    ('/api/jobs', 'jobs'),
+    ('/api/news', 'news'),
+    ('/api/publications', 'publications')
+])
+def test_cursor_walks_every_item_once_in_order(client, listings, path, key):
+    pages = walk(client, path, key, per_page=5)
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+
+    items = sum(pages, [])
+    keys = [(item['created_at'], item['id']) for item in items]
+    assert len(set(keys)) == TOTAL
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_insert_between_pages_does_not_repeat_items(client, db, listings):
+    first = client.get('/api/jobs', query_string={'after': '', 'per_page': 5}).get_json()['data']
+    db.session.add(JobPost(title='Vaga nova', created_at=datetime(2030, 1, 1)))
+    db.session.commit()
+
+    after = first['pagination']['next_cursor']
+    rest = sum(walk(client, '/api/jobs', 'jobs', per_page=5, after=after), [])
+    seen = [job['id'] for job in first['jobs'] + rest]
+    assert len(seen) == len(set(seen)) == TOTAL
+
+
+def test_include_total(client, listings):
+    pagination = client.get('/api/news?after=&include_total=true').get_json()['data']['pagination']
+    assert pagination['total'] == TOTAL
+    assert 'total' not in client.get('/api/news?after=').get_json()['data']['pagination']
+
+
+@pytest.mark.parametrize('after', ['nao-e-cursor', '!!!'])
+def test_invalid_cursor_is_rejected(client, listings, after):
+    response = client.get('/api/jobs', query_string={'after': after})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
@@ -0,0 +1,82 @@
+import pytest
+
+from src.models.config import Group
+from src.models.content import ClickTracking, JobPost, Publication
+
+
+@pytest.fixture
+def job(db):
+    job = JobPost(title='Desenvolvedor Python', company='Atual', location='São Paulo - SP', source_url='https://example.com/vaga')
+    db.session.add(job)
+    for index in range(3):
+        db.session.add(Group(name=f'Grupo {index}', platform='telegram', group_id=f'-100{index}', is_active=True))
+    db.session.commit()
+    return job.id
+
+
+def group_ids(db):
+    return [group_id for (group_id,) in db.session.query(Group.id).order_by(Group.id)]
+
+
+def publish(client, body, key=None):
+    headers = {'Idempotency-Key': key} if key else {}
+    return client.post('/api/publish', json=body, headers=headers)
+
+
+def test_replay_returns_original_response_without_fan_out(client, db, job):
+    body = {'content_type': 'job', 'content_id': job, 'group_ids': group_ids(db)}
+    first = publish(client, body, key='pedido-1')
+    assert first.status_code == 200
+    assert first.get_json()['data']['publications_created'] == 3
+
+    replay = publish(client, body, key='pedido-1')
+    assert replay.status_code == 200
+    assert replay.headers['Idempotent-Replayed'] == 'true'
+    assert replay.get_json() == first.get_json()
+    assert Publication.query.count() == 3
+    assert ClickTracking.query.count() == 3
+
+
+def test_key_reused_with_another_body_is_rejected(client, db, job):
+    ids = group_ids(db)
+    publish(client, {'content_type': 'job', 'content_id': job, 'group_ids': ids}, key='pedido-2')
+
+    response = publish(client, {'content_type': 'job', 'content_id': job, 'group_ids': ids[:1]}, key='pedido-2')
+    assert response.status_code == 422
+    assert Publication.query.count() == 3
+
+
+def test_failed_request_is_not_stored(client, db, job):
+    body = {'content_type': 'job', 'content_id': job + 1, 'group_ids': group_ids(db)}
+    assert publish(client, body, key='pedido-3').status_code == 404
+    assert 'Idempotent-Replayed' not in publish(client, body, key='pedido-3').headers
+
+
+def test_campaign_sends_once_per_group(client, db, job):
+    ids = group_ids(db)
+    publish(client, {'content_type': 'job', 'content_id': job, 'group_ids': ids[:2], 'campaign': 'maio'})
+
+    data = publish(client, {'content_type': 'job', 'content_id': job, 'group_ids': ids, 'campaign': 'maio'}).get_json()['data']
+    assert data['publications_created'] == 1
+    assert data['duplicate_group_ids'] == ids[:2]
+
+
+def test_nothing_created_keeps_content_unpublished(client, db, job):
+    ids = group_ids(db)
+    body = {'content_type': 'job', 'content_id': job, 'group_ids': ids, 'campaign': 'junho'}
+    publish(client, body)
+    db.session.get(JobPost, job).is_published = False
+    db.session.commit()
+
+    data = publish(client, body).get_json()['data']
+    assert data['publications_created'] == 0
+    assert data['duplicate_group_ids'] == ids
+    db.session.expire_all()
+    assert db.session.get(JobPost, job).is_published is False
+
+
+def test_without_campaign_or_key_content_can_be_sent_again(client, db, job):
+    body = {'content_type': 'job', 'content_id': job, 'group_ids': group_ids(db)[:1]}
+    publish(client, body)
+    publish(client, body)
+    assert Publication.query.count() == 2
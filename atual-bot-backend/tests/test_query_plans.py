@@ -0,0 +1,14 @@
+from src.services.query_plans import EXPECTED_INDEXES, check_query_plans, explain, uses_index
+from src.services.targeting import top_groups_query
+
+
+def test_no_full_scan_or_missing_index(db):
+    assert check_query_plans() == []
+
+
+def test_top_k_by_uf_reads_only_that_uf(db):
+    details = explain(top_groups_query(200, uf='SP').statement)
+
+    assert uses_index(details, EXPECTED_INDEXES['top_k de grupos?uf'])
+    assert not any('TEMP B-TREE' in detail for detail in details)
+
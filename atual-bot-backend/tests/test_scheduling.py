@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.models.config import Group
+from src.models.content import JobPost, Publication
+from src.services.scheduling import in_quiet_hours, parse_send_time, plan_send_times
+
+# Sem horário de verão desde 2019: UTC-3 o ano todo
+SAO_PAULO = ZoneInfo('America/Sao_Paulo')
+
+
+def local(*args):
+    """Horário de São Paulo -> UTC sem fuso"""
+    return datetime(*args, tzinfo=SAO_PAULO).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def test_parse_send_time_uses_local_timezone_when_naive():
+    assert parse_send_time('2025-05-06T09:00', SAO_PAULO) == datetime(2025, 5, 6, 12, 0)
+    assert parse_send_time('2025-05-06T09:00+00:00', SAO_PAULO) == datetime(2025, 5, 6, 9, 0)
+
+
+@pytest.mark.parametrize('value', [1715000000, None, ['2025-05-06T09:00'], {'at': '09:00'}, 'amanhã cedo'])
+def test_parse_send_time_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        parse_send_time(value, SAO_PAULO)
+
+
+@pytest.mark.parametrize('hour, start, end, quiet', [
+    (23, 22, 6, True),
+    (3, 22, 6, True),
+    (6, 22, 6, False),
+    (21, 22, 6, False),
+    (1, 1, 5, True),
+    (5, 1, 5, False),
+    (12, 8, 8, False),
+    (12, None, 6, False),
+])
+def test_in_quiet_hours(hour, start, end, quiet):
+    assert in_quiet_hours(hour, start, end) is quiet
+
+
+def group(id, quiet=(None, None), min_post_interval=0):
+    return Group(id=id, name=f'Grupo {id}', platform='telegram', group_id=str(id),
+                 quiet_hours_start=quiet[0], quiet_hours_end=quiet[1], min_post_interval=min_post_interval)
+
+
+def test_quiet_hours_push_send_to_end_of_window():
+    groups = [group(1, quiet=(22, 6)), group(2)]
+
+    times = plan_send_times(groups, [local(2025, 5, 6, 23, 30)], tz=SAO_PAULO)
+    assert times == {1: [local(2025, 5, 7, 6, 0)], 2: [local(2025, 5, 6, 23, 30)]}
+
+
+def test_spread_across_midnight_respects_quiet_hours_of_next_day():
+    groups = [group(index, quiet=(0, 6)) for index in (1, 2, 3)]
+
+    times = plan_send_times(groups, [local(2025, 5, 6, 23, 50)], spread=timedelta(minutes=30), tz=SAO_PAULO)
+    # 23:50 sai; 00:00 e 00:10 já são do silêncio do dia seguinte
+    assert times == {
+        1: [local(2025, 5, 6, 23, 50)],
+        2: [local(2025, 5, 7, 6, 0)],
+        3: [local(2025, 5, 7, 6, 0)]
+    }
+
+
+def test_min_spacing_counts_planned_and_new_sends(db):
+    target = group(1, min_post_interval=60)
+    job = JobPost(title='Vaga', source_url='https://example.com/vaga')
+    db.session.add_all([target, job])
+    db.session.flush()
+    db.session.add(Publication(group_id=1, job_post_id=job.id, message_content='Vaga', scheduled_for=datetime(2025, 5, 6, 12, 0)))
+    db.session.commit()
+
+    times = plan_send_times([target], [datetime(2025, 5, 6, 12, 30), datetime(2025, 5, 6, 12, 40)])
+    assert times == {1: [datetime(2025, 5, 6, 13, 0), datetime(2025, 5, 6, 14, 0)]}
+
+
+def test_min_spacing_and_quiet_hours_combine(db):
+    target = group(1, quiet=(22, 6), min_post_interval=120)
+    db.session.add(target)
+    db.session.commit()
+
+    times = plan_send_times([target], [local(2025, 5, 6, 21, 0), local(2025, 5, 6, 21, 30)], tz=SAO_PAULO)
+    # O segundo envio cairia às 23:00, dentro do silêncio
+    assert times == {1: [local(2025, 5, 6, 21, 0), local(2025, 5, 7, 6, 0)]}
+
+
+@pytest.mark.parametrize('schedule', [1715000000, [None], ['2025-05-06T09:00', 5], 'amanhã'])
+def test_publish_rejects_invalid_schedule(client, db, schedule):
+    job = JobPost(title='Vaga', source_url='https://example.com/vaga')
+    db.session.add_all([job, Group(name='Grupo', platform='telegram', group_id='-1001')])
+    db.session.commit()
+
+    response = client.post('/api/publish', json={
+        'content_type': 'job', 'content_id': job.id, 'group_ids': [Group.query.one().id], 'schedule': schedule
+    })
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    assert Publication.query.count() == 0
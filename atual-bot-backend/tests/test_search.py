@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.content import JobPost
+from src.services.search import search_index
+
+
+@pytest.fixture(params=['fts5', 'memory'])
+def backend(request, db):
+    """Roda o teste com o FTS5 e com o índice em memória"""
+    previous = search_index.backend
+    search_index.backend = request.param
+    search_index._memory.clear()
+    yield request.param
+    search_index.backend = previous
+    search_index._memory.clear()
+
+
+@pytest.fixture
+def jobs(db):
+    # Relevância e data em ordens opostas: as mais antigas citam "python" mais vezes
+    base = datetime(2025, 1, 1)
+    for index in range(12):
+        db.session.add(JobPost(
+            title='Desenvolvedor ' + 'python ' * (12 - index),
+            description='Vaga de backend',
+            created_at=base + timedelta(days=index)
+        ))
+    db.session.add(JobPost(title='Analista de dados', created_at=base))
+    db.session.commit()
+
+
+def ids(response):
+    return [job['id'] for job in response.get_json()['data']['jobs']]
+
+
+def test_cursor_pages_keep_relevance_order(client, backend, jobs):
+    ranked = ids(client.get('/api/jobs?q=python&per_page=50'))
+    assert len(ranked) == 12
+
+    pages, after = [], ''
+    while after is not None:
+        response = client.get('/api/jobs', query_string={'q': 'python', 'per_page': 5, 'after': after})
+        assert response.status_code == 200
+        pages.append(ids(response))
+        after = response.get_json()['data']['pagination']['next_cursor']
+
+    assert [len(page) for page in pages] == [5, 5, 2]
+    assert sum(pages, []) == ranked
+
+
+def test_created_at_cursor_is_rejected_in_search(client, backend, jobs):
+    after = client.get('/api/jobs?after=&per_page=5').get_json()['data']['pagination']['next_cursor']
+    response = client.get('/api/jobs', query_string={'q': 'python', 'after': after})
+    assert response.status_code == 400
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+import pytest
+
+from src.models.config import Group
+from src.models.content import JobPost, Publication
+
+
+@pytest.fixture
+def publication_ids(db):
+    group = Group(name='Grupo', platform='whatsapp', group_id='grupo-1')
+    job = JobPost(title='Vaga', source_url='https://example.com/vaga')
+    db.session.add_all([group, job])
+    db.session.flush()
+    rows = [
+        Publication(group_id=group.id, job_post_id=job.id, message_content='Vaga', status=status, attempts=0)
+        for status in ('pending', 'sending', 'sent', 'failed')
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    return [row.id for row in rows]
+
+
+def report(client, body):
+    return client.post('/api/publications/status/bulk', json=body)
+
+
+def publication(db, publication_id):
+    db.session.expire_all()
+    return db.session.get(Publication, publication_id)
+
+
+def test_reports_update_open_publications(client, db, publication_ids):
+    pending, sending, _, _ = publication_ids
+    response = report(client, [
+        {'id': pending, 'status': 'sent', 'platform_message_id': 'wa-1', 'sent_at': '2025-05-06T09:00:00-03:00'},
+        {'id': sending, 'status': 'failed', 'error_message': 'grupo removido'}
+    ])
+
+    assert response.status_code == 200
+    assert response.get_json()['data'] == {'updated': 2, 'unknown_ids': [], 'already_final_ids': []}
+    sent = publication(db, pending)
+    assert (sent.status, sent.platform_message_id, sent.sent_at, sent.attempts) == ('sent', 'wa-1', datetime(2025, 5, 6, 12, 0), 1)
+    failed = publication(db, sending)
+    assert (failed.status, failed.error_message, failed.sent_at, failed.claimed_at) == ('failed', 'grupo removido', None, None)
+
+
+def test_unknown_ids_are_reported_not_written(client, db, publication_ids):
+    missing = max(publication_ids) + 100
+    response = report(client, [{'id': missing, 'status': 'sent'}, {'id': publication_ids[0], 'status': 'sent'}])
+
+    assert response.get_json()['data'] == {'updated': 1, 'unknown_ids': [missing], 'already_final_ids': []}
+    assert db.session.get(Publication, missing) is None
+
+
+def test_final_publications_do_not_change(client, db, publication_ids):
+    _, _, sent, failed = publication_ids
+    response = report(client, [{'id': sent, 'status': 'failed', 'error_message': 'atrasado'}, {'id': failed, 'status': 'sent'}])
+
+    assert response.get_json()['data'] == {'updated': 0, 'unknown_ids': [], 'already_final_ids': [sent, failed]}
+    assert (publication(db, sent).status, publication(db, sent).error_message) == ('sent', None)
+    assert publication(db, failed).status == 'failed'
+
+
+def test_last_report_for_an_id_wins(client, db, publication_ids):
+    pending = publication_ids[0]
+    response = report(client, [
+        {'id': pending, 'status': 'failed', 'error_message': 'timeout'},
+        {'id': pending, 'status': 'sent', 'platform_message_id': 'wa-2'}
+    ])
+
+    assert response.get_json()['data']['updated'] == 1
+    sent = publication(db, pending)
+    assert (sent.status, sent.platform_message_id, sent.error_message, sent.attempts) == ('sent', 'wa-2', None, 1)
+
+
+def test_reports_are_written_with_a_single_update(client, db, publication_ids, count_queries):
+    pending, sending, _, _ = publication_ids
+    with count_queries() as statements:
+        report(client, [{'id': pending, 'status': 'sent'}, {'id': sending, 'status': 'sent'}])
+
+    updates = [statement for statement in statements if statement.startswith('UPDATE publications')]
+    assert len(updates) == 1
+    assert publication(db, pending).status == publication(db, sending).status == 'sent'
+
+
+@pytest.mark.parametrize('body', [
+    {'id': 1, 'status': 'sent'},
+    [{'id': '1', 'status': 'sent'}],
+    [{'id': True, 'status': 'sent'}],
+    [{'id': 1, 'status': 'pending'}],
+    ['sent'],
+])
+def test_invalid_reports_are_rejected_before_writing(client, db, publication_ids, body):
+    # Um resultado válido antes do inválido também não é gravado
+    body = [{'id': publication_ids[0], 'status': 'sent'}] + body if isinstance(body, list) else body
+    response = report(client, body)
+
+    assert response.status_code == 400
+    assert publication(db, publication_ids[0]).status == 'pending'
@@ -0,0 +1,49 @@
+import pytest
+
+from src.models.content import ClickTracking
+from src.services.link_cache import link_cache
+from src.services.tracking_links import BASE62, MAX_CODE_LENGTH, decode_code, encode_code
+
+
+@pytest.mark.parametrize('number', [1, 9, 10, 61, 62, 3843, 3844, 10 ** 6, 2 ** 63 - 1])
+def test_round_trip(number):
+    code = encode_code(number)
+    assert len(code) <= MAX_CODE_LENGTH
+    assert set(code) <= set(BASE62)
+    assert decode_code(code) == number
+
+
+def test_codes_are_short():
+    assert encode_code(61) == 'z'
+    assert encode_code(62) == '10'
+    assert len(encode_code(10 ** 9)) == 6
+
+
+@pytest.mark.parametrize('number', [0, -1])
+def test_only_positive_ids(number):
+    with pytest.raises(ValueError):
+        encode_code(number)
+
+
+@pytest.mark.parametrize('code', [
+    '',
+    '0',
+    '01',                                       # apelido de '1'
+    '0z',
+    'a' * (MAX_CODE_LENGTH + 1),
+    '3f2b8c1e-5d4a-4c3b-9a8f-1e2d3c4b5a69',    # UUID antigo
+    'ab_c'
+])
+def test_not_a_code(code):
+    assert decode_code(code) is None
+
+
+def test_leading_zero_does_not_alias_a_link(client, db):
+    db.session.add(ClickTracking(id=1, tracking_id='1', original_url='https://example.com/vaga'))
+    db.session.commit()
+    link_cache.clear()
+
+    assert link_cache.resolve('1').id == 1
+    assert link_cache.resolve('01') is None
+    assert client.get('/track/01').status_code == 404
+    assert link_cache.stats()['size'] == 1